@@ -9,6 +9,11 @@
 #    python /path/to_this_script/color_growth.py
 # To see available parameters, run this script with the --help switch:
 #    python /path/to_this_script/ --help
+# Or import it as a module and render from Python, which avoids starting Python and importing NumPy and PIL for every render, e.g.:
+#    import color_growth
+#    image_array = color_growth.render(color_growth.ColorGrowthConfig(WIDTH=800, HEIGHT=600, RANDOM_SEED=7))
+#    image_array = color_growth.render(color_growth.parse_args(['--LOAD_PRESET', 'preset.cgp']), frame_callback=my_function)
+# -- where my_function is called with every animation frame (a uint8 RGB array) and its frame number. ColorGrowthConfig fields have the same names and defaults as the switches of this script (see --help).
 # NOTES
 # - GitHub user `scribblemaniac` sped up this script (with a submitted pull request) by orders of magnitute vs. an earlier version of the script. An image that took seven minutes to render took 5 seconds after speedup.
 # - Output file names are based on the date and time and random characters. Inspired and drastically evolved from `color_fibers.py`, which was horked and adapted from:
@@ -29,11 +34,57 @@
 # - make it properly use negative or > 8 growth-clip values again? Since the color_growth_fast.py fork it isn't.
 
 # VERSION HISTORY
-# v2.8.7:
-# Edit speedup credit comment.
+# v2.31.1:
+# Render target files of presets are named after the preset file name without its extension; names ending with ., c, g or p before .cgp (e.g. stamp.cgp, which rendered to stam.png) lost those characters.
+# v2.31.0:
+# Add --CANVAS_DTYPE int16: the canvas stores colors as integers in half steps (6 bytes per coordinate instead of 12), with saturating mutations made in place; renders look the same as float32 renders of the same seed (identical without --BORDER_BLEND). Classic engine mutations no longer make new arrays for every coordinate, with either dtype; float32 renders are unchanged.
+# v2.30.0:
+# Animation frames are made from an image buffer kept from one frame to the next, which only the coordinates that changed since the last frame are converted to (see update_image_buffer()), instead of converting the whole canvas for every frame. Frames are the same as before; early frames of large renders, where few coordinates change, take much less time.
+# v2.29.0:
+# Add --VARIANTS, --VARIANT_SEEDS and --VARIANT_JOBS: render variants of a preset with many seeds, several at a time, from one run of the script (see render_variants()), each named after the preset and its seed, and with a preset of its own. color_growth_1cgp_many_variants.sh uses it.
+# v2.28.0:
+# Add --SAVE_PAINT_LOG: save every coordinate painted, in order, with its color, to a .cgl paint log, and color_growth_paint_log_frames.py, which makes animation frames from it with any frame schedule (the same as the render's for the same schedule) without rendering again. Delta frame files are compressed faster.
+# v2.27.0:
+# Add --ANIM_OUTPUT delta: animation frames are saved as only the coordinates which changed since the last frame and their colors, in compressed chunks appended to one .cgd file, which is far smaller than png frames and quicker to write. Add color_growth_delta_frames.py, which replays any range of frames of it to png frames or a raw video stream.
+# v2.26.0:
+# Add --MEMMAP_FOLDER: keep the canvas, allocation mask, coordinate queue and final image in memory-mapped temporary files, for canvases bigger than memory, and save the image strip by strip from them. Add --IMAGE_FORMAT tiff (deflate-compressed strips; BigTIFF over 4 GB). The batched engine compacts its orphan candidates as it goes, so that they don't grow with the canvas. Renders are the same.
+# v2.25.0:
+# Add --PREVIEW_SCALE: render a quick preview of a preset at a fraction of its size, with --RSHIFT scaled so that it looks like the full size render, and --PREVIEW_SEED_AT_PERCENT: save the preview part way, scaled up to full size, with a preset that continues it at full size (through --SEED_IMAGE). Add recipe color_growth_previews.py, which renders contact sheets of previews of every preset in a folder.
+# v2.24.0:
+# Add --SEED_IMAGE, --SEED_MASK and --SEED_STRATIFY: seed growth from the pixels of an image (those a mask image selects, or if there is no mask, its opaque pixels, optionally thinned to one random pixel per square of the canvas), with their colors, at full resolution, in one pass; --WIDTH and --HEIGHT default to the size of the image.
+# v2.23.0:
+# Add --CUSTOM_COORDS_AND_COLORS_FILE: custom start coordinates and colors from a memory-mapped NumPy .npy file of x, y, r, g, b rows, for thousands of them (which as a --CUSTOM_COORDS_AND_COLORS literal make command lines too long and are slow to parse). Renders the same as the same coordinates and colors passed with --CUSTOM_COORDS_AND_COLORS. get_img_RND_CCC_for_color_growth.py can save these files.
+# v2.22.0:
+# Presets are read in one pass, without the argument parser: a switch's value is everything up to the next switch (so values may have spaces in them, not only tuples of two numbers as before), converted and checked once, and literal values are cached, so that loading many presets is about four times faster. Add load_preset(file_name) and load_presets(folder) for scripts which import this one, and which return ColorGrowthConfigs. A preset saved from a ColorGrowthConfig loads as an equal one, and saves the same again: --TILE_SIZE is saved for other growth engines if it isn't the default, and --START_COORDS_N and --COLOR_MUTATION_BASE with --CUSTOM_COORDS_AND_COLORS if they were given (they have no effect then).
+# v2.21.0:
+# Start faster: NumPy, PIL and other modules only rendering needs are imported when a render starts, so that --VERSION and --help no longer wait for them (less than half the startup time). Add --VALIDATE_PRESETS, which checks any number of presets in one process without rendering them, and reports the errors of invalid ones. Colors, --GROWTH_CLIP, --START_COORDS_RANGE, --WIDTH, --HEIGHT and --STOP_AT_PERCENT values are now checked before rendering, and invalid Python literal values and unreadable or malformed presets are reported without a traceback.
+# v2.20.0:
+# Add --PROFILE json|csv, which saves a _profile sidecar file next to the render with the seconds spent in each phase of the render (setup, mutation, neighbor selection, border blend, tile growth, frame encode, orphan reclaim, checkpoint, image save), and samples at every progress report of painted coordinates, pixels per second, frontier size and peak memory use. Renders without it are unchanged.
+# v2.19.0:
+# The classic engine finds neighbors with lookup tables instead of a 3x3 loop of bounds and wrap checks per coordinate: flat canvas index offsets for coordinates off the canvas edge, a table of (wrapped, if --TILEABLE) neighbors for those on it, and an 8-bit mask per coordinate of its unallocated neighbors, which is updated as coordinates are allocated. Picking neighbors to grow into is a lookup of the set bits of a mask and a random choice among them. Output is unchanged; classic renders are about a third faster.
+# v2.18.0:
+# This script can be imported as a module and render in-process: parse_args() makes a ColorGrowthConfig (a frozen dataclass of every setting) from command line arguments and presets, and render(config, frame_callback) renders it and returns the image as an array, and may be called for any number of renders in one process. Nothing runs on import; run as a script, it does parse_args() and render(). Add --ANIM_OUTPUT none (frames only go to the frame callback). Presets no longer save a --START_COORDS_RANGE that was used to choose --START_COORDS_N.
+# v2.17.0:
+# Add --GROWTH_ENGINE tiled, with --TILE_SIZE and --TILED_WORKERS: the canvas (in shared memory) is split into tiles, each with its own frontier and random number stream, which worker processes grow by batched engine generations. Tiles are grown in four checkerboard phases, so that tiles grown at the same time never touch the same coordinates, and coordinates claimed across tile borders are exchanged between workers after each phase. Output does not depend on the number of workers.
+# v2.16.0:
+# The coordinate queue is now a Frontier: flat canvas indices in preallocated integer arrays with a position map, so random coordinates are taken out of it in O(1) time (singly or in batches) without allocating tuples, and it never holds duplicates. Classic engine output is unchanged (duplicate --CUSTOM_COORDS_AND_COLORS coordinates are now only grown from once). The batched engine now grows from a random BATCHED_GROWTH_FRACTION of the frontier taken out with one batch pop, so its renders differ from v2.15.0's.
+# v2.15.0:
+# --RECLAIM_ORPHANS no longer scans the whole canvas every time the coordinate queue runs out: coordinates which may become orphans are tracked as painting proceeds, and only those are checked (with the same results as a whole-canvas scan).
+# v2.14.0:
+# Add --CHECKPOINT_EVERY_N and --RESUME: periodically save the complete render state (canvas, allocation mask, coordinate queue, counters, animation frame schedule position and random number generator state) to a checkpoint folder of .npy files, and resume an interrupted render from it.
+# v2.13.0:
+# Add --ANIM_OUTPUT ffmpeg (stream animation frames as raw RGB through a pipe to ffmpeg, which encodes one video file) and --ANIM_OUTPUT raw (write one raw RGB video stream file), with --ANIM_FRAME_RATE and --FFMPEG_ARGS. Either skips per-frame PNG encoding and frame files, and keeps the same frame schedule.
+# v2.12.0:
+# Add --FRAME_WRITER_THREADS: animation frames are PNG encoded and written by background threads (from a bounded queue of canvas snapshots), so the render no longer stalls while every frame is encoded.
+# v2.11.0:
+# Add --RNG_STREAM_VERSION. Stream version 1 (the default for new renders) draws every random number the render uses from a numpy.random.Generator (PCG64) owned by the render, in pre-drawn blocks: faster, and the same preset renders identically on any Python version or platform. Version 0 is the legacy stream, used for presets which do not specify a version.
+# v2.10.0:
+# Add --GROWTH_ENGINE batched, which grows the whole frontier of coordinates at once per "generation" with vectorized NumPy operations (mutations, neighbor selection, claim conflicts, border blend and orphan reclamation), for very much faster renders of large canvases. The default (classic) engine is unchanged.
+# v2.9.0:
+# Store the canvas as one contiguous (HEIGHT, WIDTH, 3) float32 NumPy array with a separate boolean "allocated" mask, instead of a list of lists of per-pixel arrays. Image export no longer rebuilds a nested list every save. Also pass tuples instead of sets to random.sample (Python 3.11 removed set support; tuple() is what older Pythons did internally, so output is unchanged).
 
 # START IMPORTS AND GLOBALS
-ColorGrowthPyVersionString = 'v2.8.7'
+ColorGrowthPyVersionString = 'v2.31.1'
 
 import datetime
 import random
@@ -43,11 +94,42 @@ import os.path
 import sys
 import re
 import queue
-from more_itertools import unique_everseen
+import threading
+import shlex
+import shutil
+import pickle
+import dataclasses
+import heapq
+import time
+import json
+import csv
+import multiprocessing
+import multiprocessing.connection
 import platform
-# I'm also using another psuedorandom number generator built into numpy as np:
-import numpy as np
-from PIL import Image
+import glob
+import numbers
+import functools
+import struct
+import tempfile
+import zlib
+# For peak memory use in --PROFILE output; not on Windows:
+try:
+    import resource
+except ImportError:
+    resource = None
+# NumPy, PIL and the other modules only rendering needs are imported by import_render_modules() (see), so that --VERSION, --help and --VALIDATE_PRESETS start quickly.
+
+def import_render_modules():
+    """Imports the modules only rendering needs, as globals (NumPy and PIL take most of the time this script takes to start, which batch renders with a process per render pay for every render). render() calls this first."""
+    global np, Image, subprocess, shared_memory, unique_everseen, NEIGHBOR_DY, NEIGHBOR_DX
+    # I'm also using another psuedorandom number generator built into numpy as np:
+    import numpy as np
+    from PIL import Image
+    import subprocess
+    from multiprocessing import shared_memory
+    from more_itertools import unique_everseen
+    # Neighbor offsets (in the same order the classic engine's nested loops check them) for the batched engine:
+    NEIGHBOR_DY, NEIGHBOR_DX = np.array(NEIGHBOR_OFFSETS).T
 
 # Defaults which will be overridden if arguments of the same name are provided to the script:
 WIDTH = 400
@@ -72,7 +154,40 @@ BG_COLOR = "[255,63,52]"        # Scarlet-scarlet-orange
 RECLAIM_ORPHANS = True
 BORDER_BLEND = True
 TILEABLE = False
+GROWTH_ENGINE = 'classic'
+TILE_SIZE = 1024
+TILED_WORKERS = os.cpu_count()
+CANVAS_DTYPE = 'float32'
+RNG_STREAM_VERSION = 1
+FRAME_WRITER_THREADS = 4
+ANIM_OUTPUT = 'png'
+ANIM_FRAME_RATE = 29.97
+FFMPEG_ARGS = '-c:v libx264 -crf 13 -pix_fmt yuv420p -vf pad=ceil(iw/2)*2:ceil(ih/2)*2'
+SAVE_PAINT_LOG = False
+CHECKPOINT_EVERY_N = 0
+RESUME = False
+PROFILE = None
+PREVIEW_SCALE = None
+PREVIEW_SEED_AT_PERCENT = None
+MEMMAP_FOLDER = None
+IMAGE_FORMAT = 'png'
+VARIANTS = None
+VARIANT_SEEDS = None
+VARIANT_JOBS = None
 SCRIPT_ARGS_STR = ''
+# Called with every animation frame by render() (see there):
+render_frame_callback = None
+# The RenderProfiler of the render, if --PROFILE is given:
+profiler = None
+# The ChangedCoords of the render, if it saves animation frames or --SAVE_PAINT_LOG is True, and of animation frames (the same one, unless both):
+changed_coords = None
+frame_changed_coords = None
+# The image of the last animation frame, kept up to date by update_image_buffer():
+image_buffer = None
+# Canvas values per color value: 2 with --CANVAS_DTYPE int16 (which stores colors in half steps), else 1:
+canvas_color_scale = 1
+# The PaintLogWriter of the render, if --SAVE_PAINT_LOG is True:
+paint_log_writer = None
 # END GLOBALS
 
 
@@ -84,7 +199,29 @@ class versionStringPrintAction(argparse.Action):
         print('color_growth.py', ColorGrowthPyVersionString)
         parser.exit()
 
-PARSER = argparse.ArgumentParser(description=
+# Checks presets without rendering, and exits; see --VALIDATE_PRESETS:
+class validatePresetsAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        presets = sorted(set(preset for pattern in shlex.split(values) for preset in (glob.glob(pattern) or [pattern])))
+        errors_n = 0
+        for preset in presets:
+            try:
+                load_preset(preset)
+            except ValueError as e:
+                print(preset + ': ' + str(e))
+                errors_n += 1
+        print('Validated', len(presets), 'presets;', errors_n, 'invalid.')
+        parser.exit(1 if errors_n else 0)
+
+class ColorGrowthArgumentParser(argparse.ArgumentParser):
+    """An ArgumentParser which raises ValueError for invalid arguments while raise_errors is True (see parse_args), instead of printing usage and exiting."""
+    raise_errors = False
+    def error(self, message):
+        if self.raise_errors:
+            raise ValueError(message)
+        super().error(message)
+
+PARSER = ColorGrowthArgumentParser(description=
 'Renders a PNG image like bacteria that produce random color mutations \
 as they grow over a surface. Output file names are named after the date \
 and time. Inspired by and drastically evolved from colorFibers.py, which \
@@ -96,7 +233,16 @@ NOTE: by default the --RAMP_UP_SAVE_EVERY_N switch has a False value, but \
 you probably want it True if you save animation frames (--SAVE_EVERY_N).'
 )
 PARSER.register('action', 'versionStringPrint', versionStringPrintAction)
+PARSER.register('action', 'validatePresets', validatePresetsAction)
 PARSER.add_argument('-v', '--VERSION', nargs=0, action='versionStringPrint', help='Print version number and exit.')
+PARSER.add_argument('--VALIDATE_PRESETS', type=str, action='validatePresets', help=
+'Check presets (see --LOAD_PRESET) without rendering them, print the \
+errors of any which are invalid (unknown switches, switches without \
+values, values which are not valid for their switches), and exit (with \
+exit code 1 if any were invalid). Takes file names or wildcard patterns \
+in one string, for example --VALIDATE_PRESETS \'*.cgp\'. This checks \
+hundreds of presets in the time it takes to start this script once.'
+)
 PARSER.add_argument('--WIDTH', type=int, help=
 'WIDTH of output image(s). Default ' + str(WIDTH) + '.')
 PARSER.add_argument('--HEIGHT', type=int, help=
@@ -133,6 +279,46 @@ PARSER.add_argument('--TILEABLE', type=str, help=
 the edge when they encounter it. Disabled by default. Enable with \
 --TILEABLE True or --TILEABLE 1.'
 )
+PARSER.add_argument('--GROWTH_ENGINE', type=str, choices=['classic', 'batched', 'tiled'], help=
+'Which algorithm grows color. classic (the default) mutates and grows from \
+one randomly chosen coordinate at a time. batched mutates and grows every \
+coordinate at the growth frontier at once, in "generations," with \
+vectorized NumPy operations: where several frontier coordinates pick the \
+same neighbor, a random one of them wins it. batched is much faster for \
+large canvases (an 8K canvas can render in seconds instead of hours) and \
+honors --GROWTH_CLIP, --RSHIFT, --TILEABLE, --BORDER_BLEND, \
+--RECLAIM_ORPHANS and animation frame saving, so presets render \
+recognizably, but not identically, vs. classic: growth spreads a bit more \
+evenly in all directions. tiled is batched, split across --TILED_WORKERS \
+(see) processes: the canvas is split into tiles (see --TILE_SIZE), and \
+each generation, every tile grows its part of the frontier in its own \
+process, in four checkerboard phases (so that tiles growing at the same \
+time never touch the same coordinates). For very large canvases on \
+machines with many cores; with few cores, batched is faster. Requires an OS that can fork processes (not \
+Windows). Default ' + GROWTH_ENGINE + '.'
+)
+PARSER.add_argument('--TILE_SIZE', type=int, help=
+'For --GROWTH_ENGINE tiled, the minimum width and height of the tiles the \
+canvas is split into (the canvas is split evenly; with --TILEABLE True \
+into an even number of tiles across and down, or one). At least 4. \
+Saved to presets if --GROWTH_ENGINE is tiled, as it changes output. \
+Default ' + str(TILE_SIZE) + '.'
+)
+PARSER.add_argument('--TILED_WORKERS', type=int, help=
+'For --GROWTH_ENGINE tiled, how many worker processes grow tiles. Does \
+not affect output, and is not saved to presets. Default the number of \
+CPU cores (here, ' + str(TILED_WORKERS) + ').'
+)
+PARSER.add_argument('--CANVAS_DTYPE', type=str, choices=['float32', 'int16'], help=
+'How the canvas stores colors. float32 (the default): 12 bytes per \
+coordinate. int16: 6 bytes per coordinate, as integers in half steps (the \
+steps mutations are made in), with in-place saturating mutations. int16 \
+renders look the same as float32 renders of the same seed, but aren\'t \
+identical where --BORDER_BLEND is on: blended colors are rounded to the \
+nearest half step, where float32 keeps quarter steps and finer. --RSHIFT \
+must be at most 32257 with it. Saved to presets if int16, as it changes \
+output. Default ' + CANVAS_DTYPE + '.'
+)
 PARSER.add_argument('--STOP_AT_PERCENT', type=float, help=
 'What percent canvas fill to stop painting at. To paint until the canvas \
 is filled (which can take extremely long for higher resolutions), pass 1 \
@@ -158,6 +344,49 @@ will override to True, as it is strongly suggested you want that if \
 you render an animation. If that is not what you want, manually set \
 --RAMP_UP_SAVE_EVERY_N False.'
 )
+PARSER.add_argument('--FRAME_WRITER_THREADS', type=int, help=
+'How many background threads PNG encode and write animation frames (if \
+[-a | --SAVE_EVERY_N] is nonzero) while painting continues. Frames wait \
+to be written in a queue no longer than twice this, so if the threads \
+fall behind, painting waits for them (and memory use stays bounded). 0 \
+writes every frame before painting continues, as versions before v2.12.0 \
+did. Does not affect output, and is not saved to presets. Default ' + \
+str(FRAME_WRITER_THREADS) + '.'
+)
+PARSER.add_argument('--ANIM_OUTPUT', type=str, choices=['png', 'ffmpeg', 'raw', 'delta', 'none'], help=
+'Where animation frames (if [-a | --SAVE_EVERY_N] is nonzero) go. png \
+(the default): numbered PNG files in a subfolder named after the render \
+target file. ffmpeg: raw RGB frames are streamed through a pipe to an \
+ffmpeg process (which must be in your PATH), which encodes them to one \
+video file named after the render target file, with the extension .mp4. \
+raw: frames are written one after another to one uncompressed RGB (rgb24) \
+video stream file named after the render target file, with the extension \
+.rgb (the ffmpeg command to encode that is printed when the render is \
+done). delta: only the coordinates which changed since the last frame, \
+and their colors, are written, compressed, to one delta frame file named \
+after the render target file, with the extension .cgd, which is many \
+times smaller than the frames, and takes time to write in proportion to \
+the coordinates painted, not the size of the canvas; \
+color_growth_delta_frames.py makes PNG frames or a raw video stream of \
+any range of frames of it. ffmpeg, raw and delta skip PNG encoding and \
+writing many files, and use the same frame schedule as png. none: frames are not written anywhere, \
+only passed to the frame callback of render() (for use of this script \
+as a module; see USAGE in the comments at the start of it). Resuming \
+renders by skipping existing frame files only works with png. Not saved to presets. Default ' + \
+ANIM_OUTPUT + '.'
+)
+PARSER.add_argument('--ANIM_FRAME_RATE', type=float, help=
+'Frame rate of video made by --ANIM_OUTPUT ffmpeg (or of the printed \
+command to encode --ANIM_OUTPUT raw). Not saved to presets. Default ' + \
+str(ANIM_FRAME_RATE) + '.'
+)
+PARSER.add_argument('--FFMPEG_ARGS', type=str, help=
+'Output (encoding) options for ffmpeg with --ANIM_OUTPUT ffmpeg, as one \
+string. Because this begins with a dash, pass it with an equals sign and \
+surrounded by quote marks, like: --FFMPEG_ARGS="-c:v libx264 -crf 18". \
+Not saved to presets. Default "' + FFMPEG_ARGS + '" (the pad filter \
+makes odd canvas dimensions even, which yuv420p requires).'
+)
 PARSER.add_argument('--RAMP_UP_SAVE_EVERY_N', type=str, help=
 'Increase the value of --SAVE_EVERY_N over time. Without this, the \
 animation may seem to slow toward the middle and end, because the \
@@ -178,13 +407,25 @@ over time. 3) To re-render animations created prior to v2.6.6 the same \
 as at their creation --RAMP_UP_SAVE_EVERY_N must be False (as this feature \
 was introduced in v2.6.6). 4) See related NOTE for --SAVE_EVERY_N.'
 )
+PARSER.add_argument('--SAVE_PAINT_LOG', type=str, help=
+'Save a paint log: every coordinate painted, in the order it was painted \
+(with its color), to one compressed file named after the render target \
+file, with the extension .cgl. color_growth_paint_log_frames.py makes \
+animation frames from it with any frame schedule (any --SAVE_EVERY_N and \
+--RAMP_UP_SAVE_EVERY_N, or any number of frames), which is much quicker \
+than rendering again to try another pacing of an animation; its frames \
+for the --SAVE_EVERY_N and --RAMP_UP_SAVE_EVERY_N of the render are the \
+same as the render\'s. Works with or without [-a | --SAVE_EVERY_N]. Not \
+saved to presets. Default ' + str(SAVE_PAINT_LOG) + '.'
+)
 PARSER.add_argument('-s', '--RANDOM_SEED', type=int, help=
 'Seed for random number generators (random and numpy.random are used). \
 Default generated by random library itself and added to render file name \
 for reference. Can be any integer in the range 0 to 4294967296 (2^32). \
 If not provided, it will be randomly chosen from that range (meta!). If \
 --SAVE_PRESET is used, the chosen seed will be saved with the preset \
-.cgp file. KNOWN ISSUE: functional differences between random generators \
+.cgp file. NOTE: the following KNOWN ISSUE applies only to \
+--RNG_STREAM_VERSION 0 (see). KNOWN ISSUE: functional differences between random generators \
 of different versions of Python and/or Python, maybe on different platforms, \
 produce different output from the same random seed. ALSO, some versions of \
 this script had code that accidentally altered the pseudorandom number \
@@ -194,6 +435,18 @@ different output than before from the same --RANDOM_SEED, search for and \
 examine the VESTIGAL CODE comment(s!), and try uncommenting the line of code \
 they detail.'
 )
+PARSER.add_argument('--RNG_STREAM_VERSION', type=int, choices=[0, 1], help=
+'Which pseudorandom number stream --RANDOM_SEED seeds. 1 (the default for \
+new renders): a generator owned by the render (numpy.random.Generator with \
+PCG64), from which random mutations, neighbor counts and other values are \
+drawn in large blocks. This is faster, and a preset renders identically \
+on any Python version or platform, and with any version of this script \
+that supports stream version 1. 0: the legacy stream (the Python random \
+and numpy.random module functions), which renders presets made before \
+this option existed as they were, subject to the KNOWN ISSUE described \
+for --RANDOM_SEED. If --LOAD_PRESET is used and the preset does not \
+specify this, 0 is used. Saved with presets.'
+)
 PARSER.add_argument('-q', '--START_COORDS_N', type=int, help=
 'How many origin coordinates to begin coordinate and color mutation \
 from. Default randomly chosen from range in --START_COORDS_RANGE (see). \
@@ -236,6 +489,40 @@ humans, so in this parameter coordinate are represented as (x,y) (or \
 (across,down), and the code swaps them before assignment to real, \
 internal tuples. You\'re welcome.'
 )
+PARSER.add_argument('--CUSTOM_COORDS_AND_COLORS_FILE', type=str, help=
+'A NumPy .npy file of custom coordinate locations and colors, to use \
+instead of --CUSTOM_COORDS_AND_COLORS (which see) for many of them \
+(thousands of them, for example from a source image, make a command line \
+too long, and are slow to parse): a (number of coordinates, 5) integer \
+array, each row of which is x, y, r, g, b, with x and y counting from 1, \
+as for --CUSTOM_COORDS_AND_COLORS. The file is memory-mapped, not parsed. \
+get_img_RND_CCC_for_color_growth.py can make these files. Presets save \
+the file name, not the coordinates and colors in it, so keep the file \
+with them. Default none.'
+)
+PARSER.add_argument('--SEED_IMAGE', type=str, help=
+'An image file to seed growth from, instead of random start coordinates \
+(or --CUSTOM_COORDS_AND_COLORS): pixels of it (see --SEED_MASK and \
+--SEED_STRATIFY) are start coordinates, with their colors from the image, \
+and growth fills in the rest of the canvas (a \'grown out\' photograph, for \
+example). The canvas must be the size of the image; --WIDTH and --HEIGHT \
+default to its size. Presets save the file name, so keep the file with \
+them. Default none.'
+)
+PARSER.add_argument('--SEED_MASK', type=str, help=
+'An image file (the size of --SEED_IMAGE) of which pixels of --SEED_IMAGE \
+are start coordinates: those where it is light (more than 50 percent \
+gray). If not given, the pixels of --SEED_IMAGE which are more than 50 \
+percent opaque are, if it has transparency, or else all of them (which \
+leaves nothing to grow, unless with --SEED_STRATIFY). Default none.'
+)
+PARSER.add_argument('--SEED_STRATIFY', type=int, help=
+'Use only a stratified random sample of the start coordinates from \
+--SEED_IMAGE: split the canvas into squares this many pixels across, and \
+take one random start coordinate (of those --SEED_MASK selects) from each \
+square. The sample is the same for the same --RANDOM_SEED. Default none \
+(all of the start coordinates).'
+)
 PARSER.add_argument('--GROWTH_CLIP', type=str, help=
 'Affects seeming "thickness" (or viscosity) of growth. A Python tuple \
 expressed as a string (must be surrounded by double quote marks for \
@@ -285,13 +572,129 @@ generated [-q | --START_COORDS_N] is saved instead. 2) You may add \
 arbitrary text (such as notes) to the second and subsequent lines of a \
 saved preset, as only the first line is used.'
 )
+PARSER.add_argument('--CHECKPOINT_EVERY_N', type=int, help=
+'Every N painted coordinates, save the complete state of the render to a \
+checkpoint folder named after the render target file (with _checkpoint \
+appended), which --RESUME (see) can continue the render from. The canvas \
+and other large state are saved as uncompressed (memory-mappable) .npy \
+files; the previous checkpoint is replaced only after a new one is \
+completely written. The folder is deleted when the render completes. 0 \
+(the default) saves no checkpoints. Not saved to presets.'
+)
+PARSER.add_argument('--RESUME', type=str, help=
+'If True (or 1) and a checkpoint (see --CHECKPOINT_EVERY_N) for the render \
+target file exists, continue the render from it instead of starting \
+over. The result is identical to an uninterrupted render. Requires \
+--LOAD_PRESET (so that the render target file name, and the checkpoint \
+folder name, are the same every run), and the same switches as the \
+interrupted run. Resumed --ANIM_OUTPUT ffmpeg video continues in a new \
+video file named for the first frame in it; png frames, raw video and \
+delta frames continue where they left off. Not saved to presets. Default ' + \
+str(RESUME) + '.'
+)
+PARSER.add_argument('--PROFILE', type=str, choices=['json', 'csv'], help=
+'Record how long the render takes in each of its phases (setup, mutation, \
+neighbor selection, border blend, tile growth (by the tiled engine\'s \
+worker processes, which does all of the former for it), frame encode, \
+orphan reclaim, checkpoint, image save and other), and take samples of \
+its progress at every progress report (seconds since the render began, \
+painted coordinates, painted coordinates per second since the last \
+sample, coordinate queue size, peak memory use of the render and its \
+worker processes so far (where the OS reports it), and the seconds spent \
+in each phase so far), and save them to a file named after the render \
+target file with _profile.json or _profile.csv, in JSON (with a summary) \
+or CSV (one row per sample, the last one at the end of the render). \
+Frame encode is the time the render waits for frames to be written, \
+which with --FRAME_WRITER_THREADS is less than the time it takes to \
+encode them. For a resumed render (see --RESUME), only the resumed part \
+is recorded. Slows renders a little. Not saved to presets. Default none.'
+)
+PARSER.add_argument('--PREVIEW_SCALE', type=float, help=
+'Render a quick preview instead: at this fraction of --WIDTH and --HEIGHT \
+(more than 0 and at most 1; for example 0.125 renders an 8000x8000 preset \
+at 1000x1000, 64 times faster), saved to a file named after the render \
+target file with __preview. So that the preview looks like the full size \
+render, --RSHIFT is scaled: the color of growth drifts by mutations \
+adding up at random along the way it grows, which is by the square root \
+of how many coordinates it crosses, so the preview, in which growth \
+crosses this fraction of the coordinates to go as far across the canvas, \
+mutates by RSHIFT divided by the square root of this (rounded). \
+--GROWTH_CLIP is a number of the 8 neighbors of a coordinate, which is \
+the same at any size, so it is not scaled. --CUSTOM_COORDS_AND_COLORS(_FILE) \
+coordinates, --SEED_IMAGE, --SEED_MASK and --SEED_STRATIFY are scaled to \
+the preview, and there are no animation frames or checkpoints. Any preset \
+saved is of the full size render. Previews of the same switches (with \
+the same --RANDOM_SEED) are the same, so a preview may be rendered again \
+with --PREVIEW_SEED_AT_PERCENT to continue it at full size. See also \
+color_growth_previews.py, which renders contact sheets of previews of \
+every preset in a folder. Not saved to presets. Default none.'
+)
+PARSER.add_argument('--PREVIEW_SEED_AT_PERCENT', type=float, help=
+'With --PREVIEW_SCALE, when the preview has painted this fraction of its \
+canvas (like --STOP_AT_PERCENT), save it scaled up to the full size as an \
+image named after the preview with _upscale_seed.png, in which the \
+painted (and allocated) coordinates are opaque and the rest transparent, \
+and a preset named after the preview with _upscale.cgp, which is the same \
+as the previewed one but grows from that image (see --SEED_IMAGE) instead \
+of any other start coordinates. Rendering that preset continues the \
+preview at full size: the layout of the preview so far, with full size \
+detail grown from there. Lower values leave more of the render to full \
+size growth, higher values keep more of the look of the preview. Not saved \
+to presets. Default none.'
+)
+PARSER.add_argument('--MEMMAP_FOLDER', type=str, help=
+'A folder (on a disk with room for it) to keep the canvas in, instead of \
+memory, for canvases too big for memory (gigapixel murals, for example): \
+the canvas (12 bytes per coordinate, or 6 with --CANVAS_DTYPE int16), the allocation mask (1 byte per \
+coordinate), the coordinate queue (8 or 16 bytes per coordinate) and the \
+final image (3 bytes per coordinate, which render() returns) are \
+memory-mapped temporary files in it, which the OS pages to and from disk \
+as needed, and the image is saved strip by strip from them. The files are \
+deleted as they are made, so their disk space is freed when the render \
+ends, even if it is killed. Use --GROWTH_ENGINE batched or tiled with this \
+(the classic engine keeps a table of 1 byte per coordinate, and growth \
+bookkeeping, in memory, and is too slow for such canvases anyway), and \
+no animation frames (every frame is a whole image in memory). Renders \
+are the same as without it, if slower. Not saved to presets. Default \
+none (the canvas is in memory).'
+)
+PARSER.add_argument('--IMAGE_FORMAT', type=str, choices=['png', 'tiff'], help=
+'The file format of the rendered image (animation frames are always PNG). \
+TIFF files are compressed (deflate, with horizontal differencing) strip \
+by strip, and are BigTIFF files if they may be too big (over 4 GB) for \
+TIFF. Not saved to presets. Default ' + IMAGE_FORMAT + '.'
+)
+PARSER.add_argument('--VARIANTS', type=int, help=
+'Instead of one render, render this many variants of the preset loaded \
+with --LOAD_PRESET (which this requires), each with a new random \
+--RANDOM_SEED (any --RANDOM_SEED given is not used), several at a time \
+(see --VARIANT_JOBS), in processes forked from this one where the OS can, \
+so that this script and the modules it uses are loaded and the switches \
+parsed only once. Every variant is named after the preset with \
+__variant_<seed> (e.g. preset__variant_1234567.png), and with \
+--SAVE_PRESET saves a preset of that name with its seed. The output of \
+every variant goes to a .log file named after it, which is deleted if it \
+renders. Not saved to presets. Default none.'
+)
+PARSER.add_argument('--VARIANT_SEEDS', type=str, help=
+'Like --VARIANTS, but render a variant for every --RANDOM_SEED in this \
+list, for example --VARIANT_SEEDS [3,1415,92653]. Not saved to presets. \
+Default none.'
+)
+PARSER.add_argument('--VARIANT_JOBS', type=int, help=
+'With --VARIANTS or --VARIANT_SEEDS, how many variants to render at a \
+time. --TILED_WORKERS is divided among them. Not saved to presets. Default \
+the number of CPU cores this script may use.'
+)
 PARSER.add_argument('--LOAD_PRESET', type=str, help=
 'A preset file (as first created by --SAVE_PRESET) to use. Empty (none \
 used) by default. Not saved to any preset. At this writing only a single \
 file name is handled, not a path, and it is assumed the file is in the \
 current directory. A .cgp preset file is a plain text file on one line, \
 which is a collection of SWITCHES to be passed to this script, written \
-literally the way you would pass them to this script. NOTE: you may load \
+literally the way you would pass them to this script (any lines after \
+the first are comments). A switch\'s value is everything up to the next \
+switch, so values may have spaces in them, like (1, 13). NOTE: you may load \
 a preset and override any switches in the preset by using the override \
 after --LOAD_PRESET. For example, if a preset contains --RANDOM SEED \
 98765 but you want to override it with 12345, pass --LOAD_PRESET \
@@ -299,316 +702,1090 @@ after --LOAD_PRESET. For example, if a preset contains --RANDOM SEED \
 )
 
 
-# START ARGUMENT PARSING
-# DEVELOPER NOTE: Throughout the below argument checks, wherever a user does not specify an argument and I use a default (as defaults are defined near the start of working code in this script), add that default switch and switch value pair argsparse, for use by the --SAVE_PRESET feature (which saves everything except for the script path ([0]) to a preset). I take this approach because I can't check if a default value was supplied if I do that in the PARSER.add_argument function --
-# http://python.6.x6.nabble.com/argparse-tell-if-arg-was-defaulted-td1528162.html
-# -- so what I do is check for None (and then supply a default and add to argsparse if None is found). The check for None isn't literal: it's in the else clause after an if (value) check (if the if check fails, that means the value is None, and else: is used) :
-print('')
-print('Processing any arguments to script . . .')
+# START CONFIGURATION
+def to_tuples(value):
+    """Returns value with any lists in it (at any depth) converted to tuples, so that a ColorGrowthConfig made from parsed literals is hashable."""
+    if isinstance(value, (list, tuple)):
+        return tuple(to_tuples(element) for element in value)
+    return value
+
+@dataclasses.dataclass(frozen=True)
+class ColorGrowthConfig:
+    """Everything a render by render() depends on. Fields are named after (and do what is described for) the switches of this script, and default to the same defaults; values are Python values, not strings (e.g. BG_COLOR=(255, 63, 52), TILEABLE=True, GROWTH_CLIP=(0, 5)). Fields the script works out if not given: COLOR_MUTATION_BASE None is BG_COLOR, RAMP_UP_SAVE_EVERY_N None is True if SAVE_EVERY_N is nonzero, and RANDOM_SEED or START_COORDS_N None are chosen at random by render() (see --RANDOM_SEED and --START_COORDS_N). LOAD_PRESET is only used to name the render target file (after the preset), for --RESUME and to note in saved presets; parse_args() and load_preset() load presets. RENDER_NAME, which has no switch, is the base name (without extension) to give the render target file and the files named after it instead (e.g. by render_variants()). Raises ValueError for invalid combinations of values. Fields whose metadata has preset False aren't saved to presets."""
+    WIDTH: int = WIDTH
+    HEIGHT: int = HEIGHT
+    RSHIFT: int = RSHIFT
+    BG_COLOR: tuple = to_tuples(ast.literal_eval(BG_COLOR))
+    COLOR_MUTATION_BASE: object = None
+    BORDER_BLEND: bool = BORDER_BLEND
+    TILEABLE: bool = TILEABLE
+    GROWTH_ENGINE: str = GROWTH_ENGINE
+    TILE_SIZE: int = TILE_SIZE
+    TILED_WORKERS: int = dataclasses.field(default=TILED_WORKERS, metadata={'preset': False})
+    CANVAS_DTYPE: str = CANVAS_DTYPE
+    STOP_AT_PERCENT: float = STOP_AT_PERCENT
+    SAVE_EVERY_N: int = SAVE_EVERY_N
+    FRAME_WRITER_THREADS: int = dataclasses.field(default=FRAME_WRITER_THREADS, metadata={'preset': False})
+    ANIM_OUTPUT: str = dataclasses.field(default=ANIM_OUTPUT, metadata={'preset': False})
+    ANIM_FRAME_RATE: float = dataclasses.field(default=ANIM_FRAME_RATE, metadata={'preset': False})
+    FFMPEG_ARGS: str = dataclasses.field(default=FFMPEG_ARGS, metadata={'preset': False})
+    RAMP_UP_SAVE_EVERY_N: bool = None
+    SAVE_PAINT_LOG: bool = dataclasses.field(default=SAVE_PAINT_LOG, metadata={'preset': False})
+    RANDOM_SEED: int = None
+    RNG_STREAM_VERSION: int = RNG_STREAM_VERSION
+    START_COORDS_N: int = None
+    START_COORDS_RANGE: tuple = dataclasses.field(default=START_COORDS_RANGE, metadata={'preset': False})
+    CUSTOM_COORDS_AND_COLORS: tuple = None
+    CUSTOM_COORDS_AND_COLORS_FILE: str = None
+    SEED_IMAGE: str = None
+    SEED_MASK: str = None
+    SEED_STRATIFY: int = None
+    GROWTH_CLIP: tuple = GROWTH_CLIP
+    RECLAIM_ORPHANS: bool = RECLAIM_ORPHANS
+    SAVE_PRESET: bool = SAVE_PRESET
+    CHECKPOINT_EVERY_N: int = dataclasses.field(default=CHECKPOINT_EVERY_N, metadata={'preset': False})
+    RESUME: bool = dataclasses.field(default=RESUME, metadata={'preset': False})
+    PROFILE: str = dataclasses.field(default=PROFILE, metadata={'preset': False})
+    PREVIEW_SCALE: float = dataclasses.field(default=PREVIEW_SCALE, metadata={'preset': False})
+    PREVIEW_SEED_AT_PERCENT: float = dataclasses.field(default=PREVIEW_SEED_AT_PERCENT, metadata={'preset': False})
+    MEMMAP_FOLDER: str = dataclasses.field(default=MEMMAP_FOLDER, metadata={'preset': False})
+    IMAGE_FORMAT: str = dataclasses.field(default=IMAGE_FORMAT, metadata={'preset': False})
+    VARIANTS: int = dataclasses.field(default=VARIANTS, metadata={'preset': False})
+    VARIANT_SEEDS: tuple = dataclasses.field(default=VARIANT_SEEDS, metadata={'preset': False})
+    VARIANT_JOBS: int = dataclasses.field(default=VARIANT_JOBS, metadata={'preset': False})
+    LOAD_PRESET: str = dataclasses.field(default=None, metadata={'preset': False})
+    RENDER_NAME: str = dataclasses.field(default=None, metadata={'preset': False})
+
+    def __post_init__(self):
+        # Frozen, so values are normalized with object.__setattr__:
+        for name in ['BG_COLOR', 'COLOR_MUTATION_BASE', 'START_COORDS_RANGE', 'CUSTOM_COORDS_AND_COLORS', 'GROWTH_CLIP', 'VARIANT_SEEDS']:
+            object.__setattr__(self, name, to_tuples(getattr(self, name)))
+        if isinstance(self.VARIANT_SEEDS, numbers.Integral):
+            object.__setattr__(self, 'VARIANT_SEEDS', (self.VARIANT_SEEDS,))
+        # So that it is written the same (e.g. 1.0, not 1) whether it was given or is the default:
+        object.__setattr__(self, 'STOP_AT_PERCENT', float(self.STOP_AT_PERCENT))
+        if self.COLOR_MUTATION_BASE is None and not self.has_custom_coords():
+            object.__setattr__(self, 'COLOR_MUTATION_BASE', self.BG_COLOR)
+        if self.RAMP_UP_SAVE_EVERY_N is None:
+            object.__setattr__(self, 'RAMP_UP_SAVE_EVERY_N', self.SAVE_EVERY_N != 0)
+        if self.WIDTH < 1 or self.HEIGHT < 1:
+            raise ValueError('--WIDTH and --HEIGHT must be at least 1.')
+        if not 0 < self.STOP_AT_PERCENT <= 1:
+            raise ValueError('--STOP_AT_PERCENT must be more than 0 and at most 1.')
+        for name in ['BG_COLOR', 'COLOR_MUTATION_BASE']:
+            color = getattr(self, name)
+            if color != 'random' and color is not None and not (isinstance(color, tuple) and len(color) == 3 and all(isinstance(value, numbers.Real) for value in color)):
+                raise ValueError('--' + name + ' must be a list of three numbers, like [255,63,52].')
+        for name in ['START_COORDS_RANGE', 'GROWTH_CLIP']:
+            low_high = getattr(self, name)
+            if not (isinstance(low_high, tuple) and len(low_high) == 2 and all(isinstance(value, numbers.Integral) for value in low_high) and low_high[0] <= low_high[1]):
+                raise ValueError('--' + name + ' must be a tuple of two integers, the first no more than the second, like (1,5).')
+        if sum(1 for value in (self.CUSTOM_COORDS_AND_COLORS, self.CUSTOM_COORDS_AND_COLORS_FILE, self.SEED_IMAGE) if value) > 1:
+            raise ValueError('Pass only one of --CUSTOM_COORDS_AND_COLORS, --CUSTOM_COORDS_AND_COLORS_FILE and --SEED_IMAGE.')
+        for name in ['CUSTOM_COORDS_AND_COLORS_FILE', 'SEED_IMAGE', 'SEED_MASK']:
+            if getattr(self, name) and not os.path.isfile(getattr(self, name)):
+                raise ValueError('--' + name + ' ' + getattr(self, name) + ' not found.')
+        if (self.SEED_MASK or self.SEED_STRATIFY is not None) and not self.SEED_IMAGE:
+            raise ValueError('--SEED_MASK and --SEED_STRATIFY require --SEED_IMAGE.')
+        if self.SEED_STRATIFY is not None and self.SEED_STRATIFY < 1:
+            raise ValueError('--SEED_STRATIFY must be at least 1.')
+        if self.GROWTH_ENGINE not in ('classic', 'batched', 'tiled'):
+            raise ValueError('GROWTH_ENGINE must be classic, batched or tiled.')
+        if self.ANIM_OUTPUT not in ('png', 'ffmpeg', 'raw', 'delta', 'none'):
+            raise ValueError('ANIM_OUTPUT must be png, ffmpeg, raw, delta or none.')
+        if self.PROFILE not in (None, 'json', 'csv'):
+            raise ValueError('PROFILE must be None, json or csv.')
+        if self.PREVIEW_SCALE is not None and not 0 < self.PREVIEW_SCALE <= 1:
+            raise ValueError('--PREVIEW_SCALE must be more than 0 and at most 1.')
+        if self.PREVIEW_SEED_AT_PERCENT is not None and not (self.PREVIEW_SCALE and 0 < self.PREVIEW_SEED_AT_PERCENT <= 1):
+            raise ValueError('--PREVIEW_SEED_AT_PERCENT requires --PREVIEW_SCALE, and must be more than 0 and at most 1.')
+        if self.MEMMAP_FOLDER and not os.path.isdir(self.MEMMAP_FOLDER):
+            raise ValueError('--MEMMAP_FOLDER ' + self.MEMMAP_FOLDER + ' is not a folder.')
+        if self.IMAGE_FORMAT not in ('png', 'tiff'):
+            raise ValueError('IMAGE_FORMAT must be png or tiff.')
+        if self.TILE_SIZE < 4:
+            raise ValueError('--TILE_SIZE must be at least 4.')
+        if self.CANVAS_DTYPE not in ('float32', 'int16'):
+            raise ValueError('CANVAS_DTYPE must be float32 or int16.')
+        # So that a color (at most 510 half steps) plus a mutation can't overflow int16 before it is saturated:
+        if self.CANVAS_DTYPE == 'int16' and self.RSHIFT > 32257:
+            raise ValueError('--RSHIFT must be at most 32257 with --CANVAS_DTYPE int16.')
+        if self.GROWTH_ENGINE == 'tiled' and 'fork' not in multiprocessing.get_all_start_methods():
+            raise ValueError('--GROWTH_ENGINE tiled needs to fork worker processes, which this OS can\'t do. Use --GROWTH_ENGINE batched.')
+        if self.RESUME and not self.LOAD_PRESET:
+            raise ValueError('--RESUME requires --LOAD_PRESET (the checkpoint to resume from is named after the preset).')
+        if self.VARIANTS is not None and self.VARIANTS < 1:
+            raise ValueError('--VARIANTS must be at least 1.')
+        if self.VARIANT_SEEDS is not None and not (isinstance(self.VARIANT_SEEDS, tuple) and self.VARIANT_SEEDS and all(isinstance(seed, numbers.Integral) and seed >= 0 for seed in self.VARIANT_SEEDS)):
+            raise ValueError('--VARIANT_SEEDS must be a list of integers of at least 0, like [3,1415,92653].')
+        if self.VARIANTS and self.VARIANT_SEEDS:
+            raise ValueError('Pass only one of --VARIANTS and --VARIANT_SEEDS.')
+        if (self.VARIANTS or self.VARIANT_SEEDS) and not self.LOAD_PRESET:
+            raise ValueError('--VARIANTS and --VARIANT_SEEDS require --LOAD_PRESET (variants are named after the preset).')
+        if self.VARIANT_JOBS is not None and self.VARIANT_JOBS < 1:
+            raise ValueError('--VARIANT_JOBS must be at least 1.')
+        if self.ANIM_OUTPUT == 'ffmpeg' and self.SAVE_EVERY_N and shutil.which('ffmpeg') is None:
+            raise ValueError('--ANIM_OUTPUT is ffmpeg, but ffmpeg was not found in your PATH. Install it, or use --ANIM_OUTPUT png or raw.')
+        if self.SAVE_EVERY_N == 0 and self.RAMP_UP_SAVE_EVERY_N == True:
+            raise ValueError('--RAMP_UP_SAVE_EVERY_N is True, but --SAVE_EVERY_N is 0. --SAVE_EVERY_N must be nonzero if --RAMP_UP_SAVE_EVERY_N is True. Either set --SAVE_EVERY_N to something other than 0, or set RAMP_UP_SAVE_EVERY_N to False.')
+
+    def has_custom_coords(self):
+        """Returns True if start coordinates and colors are given (by CUSTOM_COORDS_AND_COLORS, CUSTOM_COORDS_AND_COLORS_FILE or SEED_IMAGE), not chosen at random."""
+        return bool(self.CUSTOM_COORDS_AND_COLORS or self.CUSTOM_COORDS_AND_COLORS_FILE or self.SEED_IMAGE)
+
+    def to_switches_str(self):
+        """Returns the switches of this script (as saved to presets) which make this configuration, in one string. Values in it have no spaces, so that it can be split on spaces, and a preset of it loads as an equal configuration (see load_preset), which gives the same string again. Omits values which are None (worked out at render time), TILE_SIZE if it is the default and the growth engine isn't tiled, and CANVAS_DTYPE if it is the default."""
+        switches = []
+        for field in dataclasses.fields(self):
+            value = getattr(self, field.name)
+            if not field.metadata.get('preset', True) or value is None:
+                continue
+            if field.name == 'TILE_SIZE' and self.GROWTH_ENGINE != 'tiled' and value == field.default:
+                continue
+            if field.name == 'CANVAS_DTYPE' and value == field.default:
+                continue
+            # Colors are written as lists, as in presets of prior versions of this script:
+            if field.name in ('BG_COLOR', 'COLOR_MUTATION_BASE') and value != 'random':
+                value = list(value)
+            elif field.name == 'CUSTOM_COORDS_AND_COLORS':
+                value = [[coord, list(color)] for coord, color in value]
+            switches.append('--' + field.name + ' ' + format_switch_value(value))
+        return ' '.join(switches)
+# END CONFIGURATION
+
 
+# START ARGUMENT PARSING
 # allows me to override parser arguments declared in this namespace:
 class ARGUMENTS_NAMESPACE:
     pass
 
-argumentsNamespace = ARGUMENTS_NAMESPACE()
-
-    # Weirdly, for the behavior I want, I must call parse_args a few times:
-    # - first to get the --LOAD_PRESET CLI argument if there is any
-    # - then potentially many times to iterate over arguments got from the
-    # .cgp config file specified
-    # - then again to override any of those with options passed via CLI
-    # which I want to override those.
-# DEPRECATED: call parse_args with default no parameters (except it is done before the above of necessity):
-# ARGS = PARSER.parse_args()
-# NOW, create a namespace that allows loaded .cgp file parameters to overwrite values in:
-# re: https://docs.python.org/3/library/argparse.html#argparse.Namespace
-# re: https://docs.python.org/3/library/argparse.html#argparse.ArgumentParser.parse_args
-ARGS = PARSER.parse_args(args=sys.argv[1:], namespace=argumentsNamespace)
-# Build dictionary from ARGS and use it to build global SCRIPT_ARGS_STR;
-# clean it up later (we don't want elements in it with value "None":
-argsDict = vars(ARGS)
-# modify like this:
-# argsDict['COLOR_MUTATION_BASE'] = '[0,0,0]'
-
-# IF A PRESET file is given, load its contents and make its parameters override anything else that was just parsed through the argument parser:
-if ARGS.LOAD_PRESET:
-    LOAD_PRESET = ARGS.LOAD_PRESET
-    with open(LOAD_PRESET) as f:
-        SWITCHES = f.readline()
-    # Remove spaces from parameters in tuples like (1, 13), because it
-    # mucks up this parsing:
-    SWITCHES = re.sub('(\([0-9]*),\s*([0-9]*\))', r'\1,\2', SWITCHES)
-    # removes any start and end whitespace that can throw off
-    # the following parsing:
-    SWITCHES = SWITCHES.strip()
-    SWITCHES = SWITCHES.split(' ')
-    for i in range(0, len(SWITCHES), 2):
-        ARGS = PARSER.parse_args(args=[SWITCHES[i], SWITCHES[i+1]], namespace=argumentsNamespace)
-
-# Doing this again here so that anything in the command line overrides:
-ARGS = PARSER.parse_args(args=sys.argv[1:], namespace=argumentsNamespace)      # When this 
-
-# If a user supplied an argument (so that WIDTH has a value (is not None), use that:
-if ARGS.WIDTH:
-    # It is in argsparse already, so it will be used by --WIDTH:
-    WIDTH = ARGS.WIDTH
-else:
-    # If not, leave the default as it was defined globally, and add to argsDict
-    # so it can be saved in a .cfg preset:
-    argsDict['WIDTH'] = WIDTH
-
-if ARGS.HEIGHT:
-    HEIGHT = ARGS.HEIGHT
-else:
-    argsDict['HEIGHT'] = HEIGHT
-
-if ARGS.RSHIFT:
-    RSHIFT = ARGS.RSHIFT
-else:
-    argsDict['RSHIFT'] = RSHIFT
-
-if ARGS.BG_COLOR:
-    # For preset saving, remove spaces and write back to argsparse,
-    # OR ADD IT (if it was gotten through argparse), so a preset saved by
-    # --SAVE_PRESET won't cause errors:
-    BG_COLOR = ARGS.BG_COLOR
-    BG_COLOR = re.sub(' ', '', BG_COLOR)
-    argsDict['BG_COLOR'] = BG_COLOR
-else:
-    argsDict['BG_COLOR'] = BG_COLOR
-
-# Convert BG_COLOR (as set from ARGS.BG_COLOR or default) string to python list for use
-# by this script, re: https://stackoverflow.com/a/1894296/1397555
-BG_COLOR = ast.literal_eval(BG_COLOR)
-
-# See comments in ARGS.BG_COLOR handling; handled the same:
-if not ARGS.CUSTOM_COORDS_AND_COLORS:
-    if ARGS.COLOR_MUTATION_BASE:
-        COLOR_MUTATION_BASE = ARGS.COLOR_MUTATION_BASE
-        COLOR_MUTATION_BASE = re.sub(' ', '', COLOR_MUTATION_BASE)
-        argsDict['COLOR_MUTATION_BASE'] = COLOR_MUTATION_BASE
-        if ARGS.COLOR_MUTATION_BASE.lower() == 'random':
-            COLOR_MUTATION_BASE = 'random'
-        else:
-            COLOR_MUTATION_BASE = ast.literal_eval(COLOR_MUTATION_BASE)
-    else:       # Write same string as BG_COLOR, after the same silly string manipulation as
-                # for COLOR_MUTATION_BASE, but more ridiculously now _back_ from that to
-                # a string again:
-        BG_COLOR_TMP_STR = str(BG_COLOR)
-        BG_COLOR_TMP_STR = re.sub(' ', '', BG_COLOR_TMP_STR)
-        argsDict['COLOR_MUTATION_BASE'] = BG_COLOR_TMP_STR
-        # In this case we're using a list as already assigned to BG_COLOR:
-        COLOR_MUTATION_BASE = list(BG_COLOR)
-        # If I hadn't used list(), COLOR_MUTATION_BASE would be a reference to BG_COLOR (which
-        # is default Python list handling behavior with the = operator), and when I changed either,
-        # "both" would change (but they would really just be different names for the same list).
-        # I want them to be different.
-
-# purple = [255, 0, 255]    # Purple. In prior commits of this script, this has been defined
-# and unused, just like in real life. Now, it is commented out or not even defined, just
-# like it is in real life.
-
-if ARGS.RECLAIM_ORPHANS:
-    RECLAIM_ORPHANS = ast.literal_eval(ARGS.RECLAIM_ORPHANS)
-else:
-    argsDict['RECLAIM_ORPHANS'] = RECLAIM_ORPHANS
-
-if ARGS.BORDER_BLEND:
-    BORDER_BLEND = ast.literal_eval(ARGS.BORDER_BLEND)
-else:
-    argsDict['BORDER_BLEND'] = BORDER_BLEND
-
-if ARGS.TILEABLE:
-    TILEABLE = ast.literal_eval(ARGS.TILEABLE)
-else:
-    argsDict['TILEABLE'] = TILEABLE
-
-if ARGS.STOP_AT_PERCENT:
-    STOP_AT_PERCENT = ARGS.STOP_AT_PERCENT
-else:
-    argsDict['STOP_AT_PERCENT'] = STOP_AT_PERCENT
-
-if ARGS.SAVE_EVERY_N:
-    SAVE_EVERY_N = ARGS.SAVE_EVERY_N
-else:
-    argsDict['SAVE_EVERY_N'] = SAVE_EVERY_N
-
-# Conditional override:
-if ARGS.SAVE_EVERY_N and not ARGS.RAMP_UP_SAVE_EVERY_N:
-    RAMP_UP_SAVE_EVERY_N = True
-    argsDict['RAMP_UP_SAVE_EVERY_N'] = 'True'
-
-if ARGS.RAMP_UP_SAVE_EVERY_N:
-    RAMP_UP_SAVE_EVERY_N = ast.literal_eval(ARGS.RAMP_UP_SAVE_EVERY_N)
-    if SAVE_EVERY_N == 0 and RAMP_UP_SAVE_EVERY_N == True:
-        print('--RAMP_UP_SAVE_EVERY_N is True, but --SAVE_EVERY_N is 0. --SAVE_EVERY_N must be nonzero if --RAMP_UP_SAVE_EVERY_N is True. Either set --SAVE_EVERY_N to something other than 0, or set RAMP_UP_SAVE_EVERY_N to False. Exiting script.')
+def parse_args(argv, exit_on_error=True):
+    """Returns a ColorGrowthConfig from command line arguments to this script (a list, without the script path), with the switches of any preset they load (--LOAD_PRESET) used for any switches not in argv. Prints why and exits if they are invalid, or if exit_on_error is False, raises ValueError (and prints nothing)."""
+    if not exit_on_error:
+        PARSER.raise_errors = True
+        try:
+            return make_config(argv, False)
+        finally:
+            PARSER.raise_errors = False
+    print('')
+    print('Processing any arguments to script . . .')
+    try:
+        return make_config(argv, True)
+    except ValueError as e:
+        print(str(e) + ' Exiting script.')
         sys.exit(2)
-else:
-    argsDict['RAMP_UP_SAVE_EVERY_N'] = RAMP_UP_SAVE_EVERY_N
-
-if ARGS.RANDOM_SEED:
-    RANDOM_SEED = ARGS.RANDOM_SEED
-else:
-    RANDOM_SEED = random.randint(0, 4294967296)
-    argsDict['RANDOM_SEED'] = RANDOM_SEED
-
-# Use that seed straightway:
-random.seed(RANDOM_SEED)
-np.random.seed(RANDOM_SEED)
-
-    # BEGIN STATE MACHINE "Megergeberg 5,000."
-    # DOCUMENTATION.
-    # Possible combinations of these variables to handle; "coords" means START_COORDS_N, RNDcoords means START_COORDS_RANGE:
-    # --
-    # ('coords', 'RNDcoords') : use coords, delete any RNDcoords
-    # ('coords', 'noRNDcoords') : use coords, no need to delete any RNDcoords. These two:
-    # if coords if RNDcoords.
-    # ('noCoords', 'RNDcoords') : assign user-provided RNDcoords for use (overwrite defaults).
-    # ('noCoords', 'noRNDcoords') : continue with RNDcoords defaults (don't overwrite defaults).
-    # These two: else if RNDcoords else. Also these two: generate coords independent of (outside) that last if else (by using whatever RNDcoords ends up being (user-provided
-    # or default).
-    # --
-    # I COULD just have four different, independent "if" checks explicitly for those four pairs and work from that, but this is more compact logic (fewer checks).
-# If --START_COORDS_N is provided by the user, use it, unless there is overriding CUSTOM_COORDS_AND_COLORS:
-if not ARGS.CUSTOM_COORDS_AND_COLORS:
-    if ARGS.START_COORDS_N:
-        START_COORDS_N = ARGS.START_COORDS_N
-        print('Will use the provided --START_COORDS_N, ', START_COORDS_N)
-        if ARGS.START_COORDS_RANGE:
-            # .. and delete any --START_COORDS_RANGE and its value from argsparse (as it will not be used and would best not be stored in the .cgp config file via --SAVE_PRESET:
-            argsDict.pop('START_COORDS_RANGE', None)
+
+def make_config(argv, verbose):
+    """Does the work of parse_args(): returns a ColorGrowthConfig from argv and any preset it loads, or raises ValueError if they are invalid. If verbose, prints notes about the arguments."""
+    ARGS = PARSER.parse_args(args=argv, namespace=ARGUMENTS_NAMESPACE())
+    # IF A PRESET file is given, load its switches, and make anything in the command line override them:
+    config_values = read_preset(ARGS.LOAD_PRESET) if ARGS.LOAD_PRESET else {}
+    for key, value in vars(ARGS).items():
+        if value is None or key in ('VERSION', 'VALIDATE_PRESETS'):
+            continue
+        config_values[key] = get_literal_switch_value(key, value)
+    set_seed_image_size(config_values)
+    if verbose and config_values.get('START_COORDS_N') and not (config_values.get('CUSTOM_COORDS_AND_COLORS') or config_values.get('CUSTOM_COORDS_AND_COLORS_FILE') or config_values.get('SEED_IMAGE')):
+        print('Will use the provided --START_COORDS_N, ', config_values['START_COORDS_N'])
+        if 'START_COORDS_RANGE' in config_values:
             print(
     '** NOTE: ** You provided both [-q | --START_COORDS_N] and --START_COORDS_RANGE, \
     but the former overrides the latter (the latter will not be used). This program \
     disregards the latter from the parameters list.'
     )
-    else:        # If --START_COORDS_N is _not_ provided by the user..
-        if ARGS.START_COORDS_RANGE:
-            # .. but if --START_COORDS_RANGE _is_ provided, assign from that:
-            START_COORDS_RANGE = ast.literal_eval(ARGS.START_COORDS_RANGE)
-            STR_PART = 'from user-supplied range ' + str(START_COORDS_RANGE)
-        else:        # .. otherwise use the default START_COORDS_RANGE:
-            STR_PART = 'from default range ' + str(START_COORDS_RANGE)
-        START_COORDS_N = random.randint(START_COORDS_RANGE[0], START_COORDS_RANGE[1])
-        argsDict['START_COORDS_N'] = START_COORDS_N
-        print('Using', START_COORDS_N, 'start coordinates, by random selection ' + STR_PART)
-        # END STATE MACHINE "Megergeberg 5,000."
-
-if ARGS.CUSTOM_COORDS_AND_COLORS:
-    CUSTOM_COORDS_AND_COLORS = ARGS.CUSTOM_COORDS_AND_COLORS
-    CUSTOM_COORDS_AND_COLORS = re.sub(' ', '', CUSTOM_COORDS_AND_COLORS)
-    argsDict['CUSTOM_COORDS_AND_COLORS'] = CUSTOM_COORDS_AND_COLORS
-    CUSTOM_COORDS_AND_COLORS = ast.literal_eval(ARGS.CUSTOM_COORDS_AND_COLORS)
-
-if ARGS.GROWTH_CLIP:        # See comments in ARGS.BG_COLOR handling. Handled the same.
-    GROWTH_CLIP = ARGS.GROWTH_CLIP
-    GROWTH_CLIP = re.sub(' ', '', GROWTH_CLIP)
-    argsDict['GROWTH_CLIP'] = GROWTH_CLIP
-    GROWTH_CLIP = ast.literal_eval(GROWTH_CLIP)
-# NOTE: VESTIGAL CODE HERE that will alter pseudorandom determinism if commented vs. not commented out; if render from a preset doesn't produce the same result as it once did, try uncommenting the next line! :
-    # zax_blor = ('%03x' % random.randrange(16**6))
-else:
-    temp_str = str(GROWTH_CLIP)
-    temp_str = re.sub(' ', '', temp_str)
-    argsDict['GROWTH_CLIP'] = GROWTH_CLIP
-
-if ARGS.SAVE_PRESET:
-    SAVE_PRESET = ast.literal_eval(ARGS.SAVE_PRESET)
-else:
-    argsDict['SAVE_PRESET'] = SAVE_PRESET
+    return ColorGrowthConfig(**config_values)
 # END ARGUMENT PARSING
 
-# Remove arguments from argsDict whose values are 'None' from that (they cause problems when doing things with the arguments list via CLI, as intended) :
-for key in argsDict:
-    # if the key value is 'None', don't bother saving it; otherwise save it:
-    if argsDict[key] != None:
-        keyValStr = '--' + key + ' ' + str(argsDict[key])
-        SCRIPT_ARGS_STR += keyValStr + ' '
-# removes whitespace from start and end that would mess up parse code earlier in the script (if I didn't do this there also) :
-SCRIPT_ARGS_STR = SCRIPT_ARGS_STR.strip()
-
-# ADDITIONAL GLOBALS defined here:
-allPixelsN = WIDTH * HEIGHT
-stopRenderAtPixelsN = int(allPixelsN * STOP_AT_PERCENT)
-# If RAMP_UP_SAVE_EVERY_N is True, create list saveFramesAtCoordsPaintedArray with increasing values for when to save N evolved coordinates to animation frames:
-saveFramesAtCoordsPaintedArray = []
-if SAVE_EVERY_N != 0 and RAMP_UP_SAVE_EVERY_N == True:
-    allPixelsNdividedBy_SAVE_EVERY_N = allPixelsN / SAVE_EVERY_N
-    divisor = 1 / allPixelsNdividedBy_SAVE_EVERY_N
-    saveFramesAtCoordsPaintedMultipliers = [x * divisor for x in range(0, int(allPixelsNdividedBy_SAVE_EVERY_N)+1)]
-    for multiplier in saveFramesAtCoordsPaintedMultipliers:
-        mod_w = WIDTH * multiplier
-        mod_h = HEIGHT * multiplier
-        mod_area = mod_w * mod_h
-        saveFramesAtCoordsPaintedArray.append(int(mod_area))
-    # Deduplicate elements in the list but maintain order:
-    saveFramesAtCoordsPaintedArray = list(unique_everseen(saveFramesAtCoordsPaintedArray))
-    # Because that resulting list doesn't include the ending number, add it:
-    saveFramesAtCoordsPaintedArray.append(stopRenderAtPixelsN)
-# If RAMP_UP_SAVE_EVERY_N is False, create list saveFramesAtCoordsPaintedArray with values at constant intervals for when to save animation frames:
-if SAVE_EVERY_N != 0 and RAMP_UP_SAVE_EVERY_N == False:
-    saveFramesAtCoordsPaintedArray = [x * SAVE_EVERY_N for x in range(0, int(stopRenderAtPixelsN/SAVE_EVERY_N)+1 )]
-    # Because that range doesn't include the end of the range:
-    saveFramesAtCoordsPaintedArray.append(stopRenderAtPixelsN)
-    # Because that resulting list doesn't include the ending number, add it:
-    saveFramesAtCoordsPaintedArray.append(stopRenderAtPixelsN)
-# Values of these used elsewhere:
-saveFramesAtCoordsPaintedArrayIDX = 0
-saveFramesAtCoordsPaintedArrayMaxIDX = (len(saveFramesAtCoordsPaintedArray) - 1)
+
+# START PRESET FILES
+# A .cgp preset's first line is switches of this script and their values, as they would be passed to it (see --LOAD_PRESET); any further lines are comments. Switches whose values are strings the script reads as Python literals:
+LITERAL_SWITCHES = ('BG_COLOR', 'COLOR_MUTATION_BASE', 'BORDER_BLEND', 'TILEABLE', 'RAMP_UP_SAVE_EVERY_N', 'SAVE_PAINT_LOG', 'START_COORDS_RANGE', 'CUSTOM_COORDS_AND_COLORS', 'GROWTH_CLIP', 'RECLAIM_ORPHANS', 'SAVE_PRESET', 'RESUME', 'VARIANT_SEEDS')
+# What the argument parser takes for a negative number (a value), not a switch:
+NEGATIVE_NUMBER_REGEX = re.compile(r'^-\d+$|^-\d*\.\d+$')
+# The switches which may be in presets, by every option string (e.g. -b and --BG_COLOR) of them:
+PRESET_SWITCH_ACTIONS = {option_string: action for action in PARSER._actions if action.nargs != 0 and action.dest != 'VALIDATE_PRESETS' for option_string in action.option_strings}
+
+def get_literal_switch_value(key, value):
+    """Returns the value of switch key (a ColorGrowthConfig field name): value itself, unless key is in LITERAL_SWITCHES, in which case value is a string of a Python literal (or for COLOR_MUTATION_BASE, random), and the Python value of it. Raises ValueError if it isn't a valid literal."""
+    if key not in LITERAL_SWITCHES:
+        return value
+    if key == 'COLOR_MUTATION_BASE' and value.lower() == 'random':
+        return 'random'
+    try:
+        return parse_literal(re.sub(r'\s', '', value))
+    except (ValueError, SyntaxError):
+        raise ValueError('--' + key + ' ' + value + ' is not a valid Python literal.')
+
+# Presets of a batch mostly have the same few colors, tuples and booleans, which are much slower to parse than to look up:
+@functools.lru_cache(maxsize=4096)
+def parse_literal(literal):
+    """Returns the Python value of a literal, with any lists in it made tuples (so that it is immutable, as it is cached)."""
+    return to_tuples(ast.literal_eval(literal))
+
+def get_preset_switch_action(option_string):
+    """Returns the PARSER action of a switch in a preset, by its option string or an unambiguous abbreviation of it (as the argument parser allows), or None if it isn't a preset switch."""
+    if option_string in PRESET_SWITCH_ACTIONS:
+        return PRESET_SWITCH_ACTIONS[option_string]
+    if option_string.startswith('--'):
+        actions = set(action for known_option_string, action in PRESET_SWITCH_ACTIONS.items() if known_option_string.startswith(option_string))
+        if len(actions) == 1:
+            return actions.pop()
+    return None
+
+def parse_preset_switches(switches_str):
+    """Returns the switches in switches_str (the first line of a preset) as a dict of ColorGrowthConfig field names and values, in one pass: a switch's value is everything up to the next switch (so values may have spaces in them, as in tuples like (1, 13) in presets of prior versions of this script), converted and checked as the argument parser would. Switches given more than once have the last value given. Raises ValueError if any switch or value is invalid."""
+    config_values = {}
+    action = None
+    value_tokens = []
+    # Followed by a None token, which ends the last switch:
+    for token in switches_str.split() + [None]:
+        # As for the argument parser, anything starting with - but a negative number is a switch:
+        token_action = None
+        if token is not None and token.startswith('-') and not NEGATIVE_NUMBER_REGEX.match(token):
+            token_action = get_preset_switch_action(token)
+            if token_action is None:
+                raise ValueError('unrecognized arguments: ' + token)
+        if token is not None and token_action is None:
+            if action is None:
+                raise ValueError('unrecognized arguments: ' + token)
+            value_tokens.append(token)
+            continue
+        if action is not None:
+            if not value_tokens:
+                raise ValueError('argument ' + '/'.join(action.option_strings) + ': expected one argument')
+            value = ' '.join(value_tokens)
+            try:
+                value = action.type(value) if action.type else value
+            except ValueError:
+                raise ValueError('argument ' + '/'.join(action.option_strings) + ': invalid ' + action.type.__name__ + ' value: ' + repr(value))
+            if action.choices is not None and value not in action.choices:
+                raise ValueError('argument ' + '/'.join(action.option_strings) + ': invalid choice: ' + repr(value) + ' (choose from ' + ', '.join(repr(choice) for choice in action.choices) + ')')
+            config_values[action.dest] = get_literal_switch_value(action.dest, value)
+        action = token_action
+        value_tokens = []
+    return config_values
+
+def read_preset(file_name):
+    """Returns the switches of a preset file as a dict of ColorGrowthConfig field names and values (see parse_preset_switches), or raises ValueError if it can't be read or is invalid."""
+    try:
+        with open(file_name) as f:
+            switches_str = f.readline()
+    except OSError as e:
+        raise ValueError('Could not read preset ' + file_name + ': ' + str(e) + '.')
+    config_values = parse_preset_switches(switches_str)
+    # Presets saved before --RNG_STREAM_VERSION existed were rendered with the legacy stream:
+    config_values.setdefault('RNG_STREAM_VERSION', 0)
+    return config_values
+
+def set_seed_image_size(config_values):
+    """If config_values (a dict of ColorGrowthConfig field names and values) have a SEED_IMAGE but no WIDTH or HEIGHT, sets them to the size of the image."""
+    if config_values.get('SEED_IMAGE') and not ('WIDTH' in config_values and 'HEIGHT' in config_values) and os.path.isfile(config_values['SEED_IMAGE']):
+        from PIL import Image
+        try:
+            with Image.open(config_values['SEED_IMAGE']) as image:
+                config_values.setdefault('WIDTH', image.width)
+                config_values.setdefault('HEIGHT', image.height)
+        except OSError as e:
+            raise ValueError('Could not read --SEED_IMAGE ' + config_values['SEED_IMAGE'] + ': ' + str(e))
+
+def load_preset(file_name):
+    """Returns the ColorGrowthConfig of a preset file (the same as parse_args(['--LOAD_PRESET', file_name]) does, but without the argument parser), or raises ValueError if it can't be read or is invalid."""
+    config_values = read_preset(file_name)
+    config_values['LOAD_PRESET'] = file_name
+    set_seed_image_size(config_values)
+    return ColorGrowthConfig(**config_values)
+
+def load_presets(folder, errors=None):
+    """Returns a dict of the ColorGrowthConfig of every .cgp preset in folder, by file path, sorted by file path. Raises ValueError (naming the preset) for the first invalid preset, unless errors is a dict, in which case invalid presets are left out, and their ValueErrors put in errors, by file path."""
+    configs = {}
+    for file_name in sorted(glob.glob(os.path.join(glob.escape(folder), '*.cgp'))):
+        try:
+            configs[file_name] = load_preset(file_name)
+        except ValueError as e:
+            if errors is None:
+                raise ValueError(file_name + ': ' + str(e))
+            errors[file_name] = e
+    return configs
+
+def format_switch_value(value):
+    """Returns a ColorGrowthConfig value as it is written in presets: as str() does, but without spaces between the elements of tuples and lists (so that switches may be split on spaces)."""
+    if isinstance(value, list):
+        return '[' + ','.join(format_switch_value(element) for element in value) + ']'
+    if isinstance(value, tuple):
+        return '(' + ','.join(format_switch_value(element) for element in value) + (',)' if len(value) == 1 else ')')
+    return str(value)
+
+def save_preset(file_name, switches_str):
+    """Saves switches_str (from ColorGrowthConfig.to_switches_str()) as a preset file, with comments about the render it is for."""
+    with open(file_name, 'w') as file:
+        file.write(switches_str + '\n\n')
+        if LOAD_PRESET:
+            file.write('# Derived of preset: ' + LOAD_PRESET + '\n')
+        file.write('# Created with color_growth.py ' + ColorGrowthPyVersionString + '\n')
+        file.write('# Python version: ' + sys.version + '\n')
+        file.write('# Platform: ' + platform.platform() + '\n')
+# END PRESET FILES
+
 
 def is_coord_in_bounds(y, x):
     return y >= 0 and y < HEIGHT and x >= 0 and x < WIDTH
 
-def is_color_valid(y, x, canvas):
-    return canvas[y][x][0] >= 0 # Negative number used for invalid color
-
-def get_rnd_unallocd_neighbors(y, x, canvas):
-    """Returns both a set() of randomly selected empty neighbor coordinates to use
-    immediately, and a set() of neighbors to use later."""
-    # init an empty set we'll populate with neighbors (int tuples) and return:
-    rnd_neighbors_to_ret = []
-    unallocd_neighbors = set()
-    for i in range(-1, 2):
-        for j in range(-1, 2):
-            if TILEABLE:
-                if not (i == 0 and j == 0) and not is_color_valid((y+i) % HEIGHT, (x+j) % WIDTH, canvas):
-                    unallocd_neighbors.add(((y+i) % HEIGHT, (x+j) % WIDTH))
-            else:
-                if not (i == 0 and j == 0) and is_coord_in_bounds(y+i, x+j) and not is_color_valid(y+i, x+j, canvas):
-                    unallocd_neighbors.add((y+i, x+j))
-    if unallocd_neighbors:        # If there is anything left in unallocd_neighbors:
-        # START GROWTH_CLIP (VISCOSITY) CONTROL.
-        # Decide how many to pick:
-        n_neighbors_to_ret = np.clip(np.random.randint(GROWTH_CLIP[0], GROWTH_CLIP[1] + 1), 0, len(unallocd_neighbors))
-        # END GROWTH_CLIP (VISCOSITY) CONTROL.
-        rnd_neighbors_to_ret = random.sample(unallocd_neighbors, n_neighbors_to_ret)
-        for neighbor in rnd_neighbors_to_ret:
-            unallocd_neighbors.remove(neighbor)
-    return rnd_neighbors_to_ret, unallocd_neighbors
-
-def find_adjacent_color(y, x, canvas):
-    allocd_neighbors = []
-    for i in range(-1, 2):
-        for j in range(-1, 2):
+def is_color_valid(y, x):
+    return canvas_allocd[y, x]      # False in the allocation mask means no color yet
+
+# The classic engine's neighbor tables (see init_neighbor_tables). Bit b of a neighbor mask is the neighbor at NEIGHBOR_OFFSETS[b]; the neighbor at the opposite offset is bit 7 - b:
+NEIGHBOR_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+# The bits set in every possible neighbor mask, in order, so that len() of an element is the popcount of its mask:
+MASK_BITS = [tuple(bit for bit in range(8) if mask >> bit & 1) for mask in range(256)]
+
+def init_neighbor_tables():
+    """Classic engine: makes the tables get_rnd_unallocd_neighbors and the other classic engine functions find neighbors with, from canvas_allocd. The neighbors of coordinate (flat canvas index) c not on the canvas edge are c + neighbor_flat_offsets[b]; edge_neighbors maps every coordinate on the edge to its 8 neighbors (wrapped around the canvas if TILEABLE, otherwise -1 for neighbors off the canvas). free_neighbors (a bytearray) has the mask of the unallocated neighbors of every coordinate, which allocate() keeps up to date. If TILEABLE and the canvas is less than 3 coordinates wide or high, neighbors at more than one offset can be the same coordinate; only the first of those in bit order is ever in a mask (as prior versions of this script picked neighbors)."""
+    global neighbor_flat_offsets, neighbor_clear_masks, edge_neighbors, free_neighbors, canvas_allocd_flat
+    neighbor_flat_offsets = [dy * WIDTH + dx for dy, dx in NEIGHBOR_OFFSETS]
+    # What to AND the mask of a neighbor at offset bit b with, to clear the coordinate in it:
+    neighbor_clear_masks = [255 ^ (1 << (7 - bit)) for bit in range(8)]
+    canvas_allocd_flat = canvas_allocd.reshape(-1)
+    edge_neighbors = {}
+    for y in range(HEIGHT):
+        for x in ([0, WIDTH - 1] if 0 < y < HEIGHT - 1 else range(WIDTH)):
             if TILEABLE:
-                if not (i == 0 and j == 0) and is_color_valid((y+i) % HEIGHT, (x+j) % WIDTH, canvas):
-                        allocd_neighbors.append(((y+i) % HEIGHT, (x+j) % WIDTH))
+                edge_neighbors[y * WIDTH + x] = tuple((y + dy) % HEIGHT * WIDTH + (x + dx) % WIDTH for dy, dx in NEIGHBOR_OFFSETS)
             else:
-                if not (i == 0 and j == 0) and is_coord_in_bounds(y+i, x+j) and is_color_valid(y+i, x+j, canvas):
-                    allocd_neighbors.append((y+i, x+j))
+                edge_neighbors[y * WIDTH + x] = tuple((y + dy) * WIDTH + x + dx if is_coord_in_bounds(y + dy, x + dx) else -1 for dy, dx in NEIGHBOR_OFFSETS)
+    # Build the masks from shifted copies of the unallocated mask, padded with wrapped coordinates or coordinates that are never free:
+    unallocd = np.pad(~canvas_allocd, 1, mode='wrap' if TILEABLE else 'constant')
+    masks = np.zeros((HEIGHT, WIDTH), dtype=np.uint8)
+    for bit, (dy, dx) in enumerate(NEIGHBOR_OFFSETS):
+        masks |= unallocd[1 + dy:1 + dy + HEIGHT, 1 + dx:1 + dx + WIDTH].astype(np.uint8) << bit
+    free_neighbors = bytearray(masks.tobytes())
+    # The padding is only right for big enough canvases; the edge coordinates are redone without duplicates:
+    for flat_coord, neighbors in edge_neighbors.items():
+        mask = 0
+        for bit, neighbor in enumerate(neighbors):
+            if neighbor != -1 and neighbor not in neighbors[:bit] and not canvas_allocd_flat[neighbor]:
+                mask |= 1 << bit
+        free_neighbors[flat_coord] = mask
+
+def get_neighbor_flat_coords(flat_coord):
+    """Classic engine: returns a list of the neighbors of a coordinate (flat canvas indices), in bit order (see NEIGHBOR_OFFSETS). If TILEABLE and the canvas is tiny, a neighbor may be in it more than once."""
+    neighbors = edge_neighbors.get(flat_coord)
+    if neighbors is None:
+        return [flat_coord + offset for offset in neighbor_flat_offsets]
+    return [neighbor for neighbor in neighbors if neighbor != -1]
+
+def allocate(flat_coord):
+    """Classic engine: marks a coordinate allocated, in canvas_allocd and in the free_neighbors masks of its neighbors."""
+    canvas_allocd_flat[flat_coord] = True
+    neighbors = edge_neighbors.get(flat_coord)
+    if neighbors is None:
+        for offset, clear_mask in zip(neighbor_flat_offsets, neighbor_clear_masks):
+            free_neighbors[flat_coord + offset] &= clear_mask
+    else:
+        for neighbor, clear_mask in zip(neighbors, neighbor_clear_masks):
+            if neighbor != -1:
+                free_neighbors[neighbor] &= clear_mask
+
+def get_rnd_unallocd_neighbors(flat_coord):
+    """Returns both a list of randomly selected unallocated neighbor coordinates (flat canvas indices) to use
+    immediately, and a list of the other unallocated neighbors to use later. Neighbors are looked up in free_neighbors (see init_neighbor_tables)."""
+    free_bits = MASK_BITS[free_neighbors[flat_coord]]
+    if not free_bits:
+        return [], []
+    neighbors = edge_neighbors.get(flat_coord)
+    if neighbors is None:
+        unallocd_neighbors = [flat_coord + neighbor_flat_offsets[bit] for bit in free_bits]
+    else:
+        unallocd_neighbors = [neighbors[bit] for bit in free_bits]
+    # START GROWTH_CLIP (VISCOSITY) CONTROL.
+    # Decide how many to pick:
+    n_neighbors_to_ret = max(0, min(rng.neighbor_count(), len(free_bits)))
+    # END GROWTH_CLIP (VISCOSITY) CONTROL.
+    rnd_neighbors_to_ret = rng.sample_coords(unallocd_neighbors, n_neighbors_to_ret)
+    return rnd_neighbors_to_ret, [neighbor for neighbor in unallocd_neighbors if neighbor not in rnd_neighbors_to_ret]
+
+def find_adjacent_color(flat_coord):
+    """Returns the color of a random allocated neighbor of a coordinate (flat canvas index), or None if it has none."""
+    allocd_neighbors = [neighbor for neighbor in get_neighbor_flat_coords(flat_coord) if canvas_allocd_flat[neighbor]]
     if not allocd_neighbors:
         return None
     else:
-        y, x = random.choice(allocd_neighbors)
-        return canvas[y][x]
-
-def coords_set_to_image(canvas, render_target_file_name):
-    """Creates and saves image from dict of Coordinate objects, HEIGHT and WIDTH definitions,
-    and a filename string."""
-    tmp_array = [[BG_COLOR if x[0] < 0 else x for x in row] for row in canvas]
-    tmp_array = np.asarray(tmp_array)
-    image_to_save = Image.fromarray(tmp_array.astype(np.uint8)).convert('RGB')
-    image_to_save.save(render_target_file_name)
+        y, x = divmod(rng.choice(allocd_neighbors), WIDTH)
+        return canvas[y, x]
+
+class RNGStream:
+    """The source of every random number a render uses after start-up. Version 0 is the legacy stream: it calls the random and numpy.random module functions exactly as prior versions of this script did. Version 1 owns a numpy.random.Generator (PCG64) seeded by --RANDOM_SEED, and draws mutation deltas, neighbor counts and uniform floats from it in blocks, so that per-coordinate draws are cheap, and so that nothing outside the render (or the Python version) can change what a seed renders. If integer_mutations (for --CANVAS_DTYPE int16), mutations are the same draws, as integers in half steps instead of halved."""
+    BLOCK_SIZE = 65536
+    # (For streams pickled in checkpoints of versions without it:)
+    integer_mutations = False
+
+    def __init__(self, seed, version, rshift, growth_clip, integer_mutations=False):
+        self.version = version
+        self.rshift = rshift
+        self.growth_clip = growth_clip
+        self.integer_mutations = integer_mutations
+        if version == 1:
+            self.generator = np.random.Generator(np.random.PCG64(seed))
+            self.mutation_block_idx = self.BLOCK_SIZE
+            self.neighbor_count_block_idx = self.BLOCK_SIZE
+            self.uniform_block_idx = self.BLOCK_SIZE
+
+    def to_mutations(self, half_steps):
+        """Returns half_steps (random integers from -RSHIFT to RSHIFT) as mutations: halved, or if integer_mutations, as int16 (the dtype of the canvas they are added to, so that adding them needs no casting)."""
+        return half_steps.astype(np.int16) if self.integer_mutations else half_steps / 2
+
+    def mutation(self):
+        """Returns a random RGB mutation (an array of three values from -RSHIFT/2 to RSHIFT/2 in half steps, or if integer_mutations, of three integers from -RSHIFT to RSHIFT)."""
+        if self.version == 0:
+            return self.to_mutations(np.random.randint(-self.rshift, self.rshift + 1, size=3))
+        if self.mutation_block_idx == self.BLOCK_SIZE:
+            self.mutation_block = self.to_mutations(self.generator.integers(-self.rshift, self.rshift + 1, size=(self.BLOCK_SIZE, 3)))
+            self.mutation_block_idx = 0
+        self.mutation_block_idx += 1
+        return self.mutation_block[self.mutation_block_idx - 1]
+
+    def neighbor_count(self):
+        """Returns a random number of neighbors to grow into, in the (unclipped) GROWTH_CLIP range."""
+        if self.version == 0:
+            return np.random.randint(self.growth_clip[0], self.growth_clip[1] + 1)
+        if self.neighbor_count_block_idx == self.BLOCK_SIZE:
+            self.neighbor_count_block = self.generator.integers(self.growth_clip[0], self.growth_clip[1] + 1, size=self.BLOCK_SIZE).tolist()
+            self.neighbor_count_block_idx = 0
+        self.neighbor_count_block_idx += 1
+        return self.neighbor_count_block[self.neighbor_count_block_idx - 1]
+
+    def uniform(self):
+        """Version 1 only: returns a random float in [0, 1)."""
+        if self.uniform_block_idx == self.BLOCK_SIZE:
+            self.uniform_block = self.generator.random(self.BLOCK_SIZE).tolist()
+            self.uniform_block_idx = 0
+        self.uniform_block_idx += 1
+        return self.uniform_block[self.uniform_block_idx - 1]
+
+    def queue_index(self, queue_len):
+        """Returns a random index into a queue of length queue_len."""
+        if self.version == 0:
+            return np.random.randint(0, queue_len)
+        return int(self.uniform() * queue_len)
+
+    def sample_coords(self, flat_coords, k):
+        """Returns a list of k randomly chosen, unique elements of the list flat_coords (flat canvas indices)."""
+        if self.version == 0:
+            # As a set of (y, x) tuples, then a tuple, because that is what prior versions of this script (and of random.sample) did with them; that keeps legacy --RANDOM_SEED output identical:
+            return [y * WIDTH + x for y, x in random.sample(tuple(set(divmod(flat_coord, WIDTH) for flat_coord in flat_coords)), k)]
+        # Partial Fisher-Yates shuffle:
+        pool = list(flat_coords)
+        for i in range(k):
+            j = i + int(self.uniform() * (len(pool) - i))
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
+
+    def choice(self, population):
+        """Returns a random element of the list population."""
+        if self.version == 0:
+            return random.choice(population)
+        return population[int(self.uniform() * len(population))]
+
+    def start_coords(self, n):
+        """Returns a list of n unique random (y, x) canvas coordinates."""
+        if self.version == 0:
+            # Building a set of all coordinates in this (row by row) order and sampling from it as a tuple keeps start coordinates the same as prior versions of this script:
+            unallocd_coords = set()
+            for y in range(0, HEIGHT):
+                for x in range(0, WIDTH):
+                    unallocd_coords.add((y, x))
+            return random.sample(tuple(unallocd_coords), n)
+        return [divmod(flat_coord, WIDTH) for flat_coord in self.generator.choice(WIDTH * HEIGHT, size=n, replace=False).tolist()]
+
+    def color(self):
+        """Returns a random RGB color."""
+        if self.version == 0:
+            return np.random.randint(0, 255, 3)
+        return self.generator.integers(0, 255, size=3)
+
+    # Vectorized versions of the above, for the batched engine:
+    def mutations(self, n):
+        if self.version == 0:
+            return self.to_mutations(np.random.randint(-self.rshift, self.rshift + 1, size=(n, 3)))
+        return self.to_mutations(self.generator.integers(-self.rshift, self.rshift + 1, size=(n, 3)))
+
+    def neighbor_counts(self, n):
+        if self.version == 0:
+            return np.random.randint(self.growth_clip[0], self.growth_clip[1] + 1, size=n)
+        return self.generator.integers(self.growth_clip[0], self.growth_clip[1] + 1, size=n)
+
+    def random(self, shape):
+        if self.version == 0:
+            return np.random.random(shape)
+        return self.generator.random(shape)
+
+    def indices(self, n, k):
+        """Returns k unique random indices into a sequence of length n, in random order."""
+        if self.version == 0:
+            return np.random.choice(n, k, replace=False)
+        return self.generator.choice(n, k, replace=False)
+
+def make_memmap(shape, dtype):
+    """Returns a new zeroed array memory-mapped to a temporary file in MEMMAP_FOLDER (see --MEMMAP_FOLDER). The file is deleted as soon as it is mapped, so its disk space is freed when the array is, or when the process ends however it ends. The mapping is shared, so processes forked after it is made (the tiled engine's workers) write to the same array."""
+    with tempfile.TemporaryFile(dir=MEMMAP_FOLDER) as file:
+        return np.memmap(file, dtype=dtype, mode='w+', shape=shape)
+
+class Frontier:
+    """The coordinates (as flat canvas indices) to grow from. Backed by two preallocated integer arrays (memory-mapped, with --MEMMAP_FOLDER): items, which holds the coordinates in its first len() elements, and positions, which maps every canvas coordinate to its index in items (or -1 if it isn't in the frontier). Random coordinates are taken out by swapping the last item into their place, which with the position map makes push() and pop_random() O(1), and pushing a coordinate which is already in the frontier does nothing. If changed is set to a ChangedCoords, every coordinate pushed or popped is added to it."""
+    def __init__(self, size):
+        dtype = np.int32 if size <= np.iinfo(np.int32).max else np.int64
+        if MEMMAP_FOLDER:
+            self.items = make_memmap(size, dtype)
+            self.positions = make_memmap(size, dtype)
+            self.positions.fill(-1)
+        else:
+            self.items = np.empty(size, dtype=dtype)
+            self.positions = np.full(size, -1, dtype=dtype)
+        self.n = 0
+        self.changed = None
+
+    def __len__(self):
+        return self.n
+
+    def push(self, flat_coord):
+        if self.changed is not None:
+            self.changed.add(flat_coord)
+        if self.positions[flat_coord] == -1:
+            self.items[self.n] = flat_coord
+            self.positions[flat_coord] = self.n
+            self.n += 1
+
+    def push_batch(self, flat_coords):
+        """Pushes an array of flat canvas indices, in order, skipping any already in the frontier (or repeated)."""
+        if self.changed is not None:
+            self.changed.add_batch(flat_coords)
+        flat_coords = flat_coords[self.positions[flat_coords] == -1]
+        flat_coords = flat_coords[np.sort(np.unique(flat_coords, return_index=True)[1])]
+        self.items[self.n:self.n + len(flat_coords)] = flat_coords
+        self.positions[flat_coords] = np.arange(self.n, self.n + len(flat_coords))
+        self.n += len(flat_coords)
+
+    def pop_random(self):
+        """Takes a random coordinate out of the frontier and returns it (a flat canvas index). The index comes from rng.queue_index, and the last item is swapped into its place, as prior versions of this script did with a list; that keeps classic engine output the same."""
+        index = rng.queue_index(self.n)
+        flat_coord = int(self.items[index])
+        self.n -= 1
+        last_flat_coord = self.items[self.n]
+        self.items[index] = last_flat_coord
+        self.positions[last_flat_coord] = index
+        self.positions[flat_coord] = -1
+        if self.changed is not None:
+            self.changed.add(flat_coord)
+        return flat_coord
+
+    def pop_random_batch(self, k):
+        """Takes k (or all, if fewer) random coordinates out of the frontier and returns them (an array of flat canvas indices, in random order)."""
+        k = min(k, self.n)
+        popped_positions = rng.indices(self.n, k)
+        popped = self.items[popped_positions].copy()
+        self.positions[popped] = -1
+        # Fill the popped positions before the new end with the items left after it:
+        self.n -= k
+        holes = popped_positions[popped_positions < self.n]
+        tail = self.items[self.n:self.n + k]
+        fillers = tail[self.positions[tail] != -1]
+        self.items[holes] = fillers
+        self.positions[fillers] = holes
+        if self.changed is not None:
+            self.changed.add_batch(popped)
+        return popped.astype(np.intp)
+
+    def to_array(self):
+        """Returns a copy of the coordinates in the frontier (flat canvas indices), in frontier order."""
+        return self.items[:self.n].astype(np.int64)
+
+class ChangedCoords:
+    """For animation frames (see update_image_buffer) and --SAVE_PAINT_LOG: collects the coordinates (flat canvas indices) which may have changed color since the last animation frame (or paint log step). Every coordinate which is painted is pushed to coord_queue, and changes again only when it is popped from it, so it adds those (see Frontier); the tiled engine, which grows from frontiers of its own, adds the coordinates it grows from and paints itself. All of them are allocated."""
+    def __init__(self):
+        self.flat_coords = []
+        self.arrays = []
+
+    def add(self, flat_coord):
+        self.flat_coords.append(flat_coord)
+
+    def add_batch(self, flat_coords):
+        self.arrays.append(flat_coords)
+
+    def take(self):
+        """Returns the coordinates added since this was last called, sorted and without repeats, and forgets them."""
+        if self.arrays or len(self.flat_coords) > 64:
+            # Sorting and dropping repeats is much quicker than np.unique, which may hash:
+            flat_coords = np.sort(np.concatenate(self.arrays + [np.array(self.flat_coords, dtype=np.intp)]).astype(np.intp))
+            is_first = np.ones(len(flat_coords), dtype=bool)
+            is_first[1:] = flat_coords[1:] != flat_coords[:-1]
+            flat_coords = flat_coords[is_first]
+        else:
+            # The classic engine's few coordinates of every paint log step are much quicker to sort in Python:
+            flat_coords = np.array(sorted(set(self.flat_coords)), dtype=np.intp)
+        self.flat_coords = []
+        self.arrays = []
+        return flat_coords
+
+    def to_array(self):
+        """Returns the coordinates added since take() was last called, as take() does, but doesn't forget them (for checkpoints)."""
+        flat_coords = self.take()
+        self.arrays.append(flat_coords)
+        return flat_coords.astype(np.int64)
+
+def get_changed_pixels(changed):
+    """For animation frames and --SAVE_PAINT_LOG: returns the coordinates (flat canvas indices) which may have changed since changed (a ChangedCoords) was last taken from, and their colors as in animation frames (a uint8 (number of coordinates, 3) array, as canvas_to_image_array() makes them)."""
+    flat_coords = changed.take()
+    # They are all allocated (see ChangedCoords), so they are never BG_COLOR:
+    return flat_coords, to_uint8_colors(canvas.reshape(-1, 3)[flat_coords])
+
+def to_canvas_colors(colors):
+    """Returns colors (color values from 0 to 255, e.g. of start coordinates) as canvas values (see canvas_color_scale)."""
+    if canvas_color_scale == 1:
+        return colors
+    return np.asarray(colors, dtype=np.float64) * canvas_color_scale
+
+def to_uint8_colors(canvas_colors):
+    """Returns canvas_colors (canvas values) as uint8 color values, rounded down (as half steps always were)."""
+    if canvas_color_scale != 1:
+        canvas_colors = canvas_colors // canvas_color_scale
+    return canvas_colors.astype(np.uint8)
+
+def mutate_color(color, mutation):
+    """Classic engine: adds mutation (from rng.mutation()) to color (a view of the color of a canvas coordinate) in place, saturating at 0 and 255 (in canvas values). Unlike np.clip(color + mutation, 0, 255), it makes no new arrays, which for one coordinate take longer than the arithmetic."""
+    color += mutation
+    np.maximum(color, 0, out=color)
+    np.minimum(color, 255 * canvas_color_scale, out=color)
+
+def blend_colors(colors, beyond_colors):
+    """For --BORDER_BLEND: returns the average of colors and beyond_colors (canvas values). With --CANVAS_DTYPE int16 it is rounded to the nearest half step, halves to even, so that blends don't drift darker over generations, as always rounding down would."""
+    if canvas_color_scale == 1:
+        return (colors + beyond_colors) / 2
+    return np.rint((colors + beyond_colors) / 2)
+
+def update_image_buffer():
+    """Brings image_buffer (the image of the canvas as canvas_to_image_array() makes it, kept from one animation frame to the next) up to date by converting only the coordinates which changed since the last frame, and returns those and their colors. Early in a render few coordinates change between frames, so this takes a small fraction of the time of converting the whole canvas."""
+    flat_coords, colors = get_changed_pixels(frame_changed_coords)
+    image_buffer.reshape(-1, 3)[flat_coords] = colors
+    return flat_coords, colors
+
+def canvas_to_image_array(rows=slice(None)):
+    """Returns a new uint8 (HEIGHT, WIDTH, 3) RGB array of the canvas (unallocated coordinates get BG_COLOR), or of only the rows of it in the slice rows."""
+    return np.where(canvas_allocd[rows, :, np.newaxis], to_uint8_colors(canvas[rows]), np.asarray(BG_COLOR, dtype=canvas.dtype).astype(np.uint8))
+
+# About how many bytes of image each strip of it saved by save_image_in_strips is:
+IMAGE_STRIP_BYTES = 2 ** 24
+
+def get_image_strips(height, width):
+    """Returns a list of slices of the rows of a (height, width) image, in strips of about IMAGE_STRIP_BYTES."""
+    strip_rows = max(1, IMAGE_STRIP_BYTES // (width * 3))
+    return [slice(y, min(y + strip_rows, height)) for y in range(0, height, strip_rows)]
+
+def difference_rows(rows):
+    """Returns a copy of uint8 RGB rows with every pixel (but the first of every row) minus the pixel before it, modulo 256: PNG's Sub filter, and TIFF's horizontal differencing predictor, which make images of smooth color compress much better."""
+    differenced = rows.copy()
+    differenced[:, 1:] -= rows[:, :-1]
+    return differenced
+
+def write_png_chunk(file, chunk_type, data):
+    file.write(struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data)))
+
+def save_png_in_strips(image_array, file_name):
+    """Saves a uint8 (height, width, 3) RGB array (e.g. a memory-mapped one) as a PNG file, compressing it one strip of rows at a time, so that no more than a strip of it is in memory at once."""
+    height, width = image_array.shape[:2]
+    with open(file_name, 'wb') as file:
+        file.write(b'\x89PNG\r\n\x1a\n')
+        # 8 bits per channel, RGB, no interlacing:
+        write_png_chunk(file, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        compressor = zlib.compressobj(6)
+        for rows in get_image_strips(height, width):
+            strip = difference_rows(image_array[rows])
+            # Every row starts with the filter type of it, 1 (Sub):
+            filtered = np.empty((len(strip), 1 + width * 3), dtype=np.uint8)
+            filtered[:, 0] = 1
+            filtered[:, 1:] = strip.reshape(len(strip), -1)
+            compressed = compressor.compress(filtered.tobytes())
+            if compressed:
+                write_png_chunk(file, b'IDAT', compressed)
+        write_png_chunk(file, b'IDAT', compressor.flush())
+        write_png_chunk(file, b'IEND', b'')
+
+def save_tiff_in_strips(image_array, file_name):
+    """Saves a uint8 (height, width, 3) RGB array (e.g. a memory-mapped one) as a TIFF file of strips compressed with deflate and horizontal differencing, one strip at a time, so that no more than a strip of it is in memory at once. The file is a BigTIFF if it may be too big (4 GB) for a TIFF."""
+    height, width = image_array.shape[:2]
+    strips = get_image_strips(height, width)
+    # The most the strips could compress to is a little over their size:
+    bigtiff = width * height * 3 > 0xF0000000
+    # The struct formats of the number of IFD entries and of offsets (and of the counts and values of IFD entries, which are the same size), and the TIFF type of strip offsets:
+    entries_n_format, offset_format, offset_type = ('Q', 'Q', 16) if bigtiff else ('H', 'I', 4)
+    value_field_size = struct.calcsize(offset_format)
+    strip_offsets = []
+    strip_byte_counts = []
+    with open(file_name, 'wb') as file:
+        # The header; the offset of the IFD, which is written after the strips, is filled in at the end:
+        file.write(b'II' + (struct.pack('<HHHQ', 43, 8, 0, 0) if bigtiff else struct.pack('<HI', 42, 0)))
+        for rows in strips:
+            compressed = zlib.compress(difference_rows(image_array[rows]).tobytes(), 6)
+            strip_offsets.append(file.tell())
+            strip_byte_counts.append(len(compressed))
+            file.write(compressed)
+        if file.tell() % 2:
+            file.write(b'\0')
+        ifd_offset = file.tell()
+        # The IFD's entries, as (tag, type (3 is SHORT, 4 LONG and 16 LONG8), values), in tag order: width, height, bits per sample, compression (deflate), photometric interpretation (RGB), strip offsets, samples per pixel, rows per strip, strip byte counts, planar configuration (RGBRGB...) and predictor (horizontal differencing):
+        entries = [(256, 4, [width]), (257, 4, [height]), (258, 3, [8, 8, 8]), (259, 3, [8]), (262, 3, [2]), (273, offset_type, strip_offsets), (277, 3, [3]), (278, 4, [strips[0].stop]), (279, offset_type, strip_byte_counts), (284, 3, [1]), (317, 3, [2])]
+        # Values which don't fit in their entry go after the IFD:
+        extra_data_offset = ifd_offset + struct.calcsize(entries_n_format) + len(entries) * (4 + 2 * value_field_size) + value_field_size
+        ifd = struct.pack('<' + entries_n_format, len(entries))
+        extra_data = b''
+        for tag, value_type, values in entries:
+            data = struct.pack('<' + {3: 'H', 4: 'I', 16: 'Q'}[value_type] * len(values), *values)
+            if len(data) <= value_field_size:
+                value_field = data.ljust(value_field_size, b'\0')
+            else:
+                value_field = struct.pack('<' + offset_format, extra_data_offset + len(extra_data))
+                extra_data += data + b'\0' * (len(data) % 2)
+            ifd += struct.pack('<HH' + offset_format, tag, value_type, len(values)) + value_field
+        # No next IFD:
+        ifd += struct.pack('<' + offset_format, 0)
+        file.write(ifd + extra_data)
+        file.seek(8 if bigtiff else 4)
+        file.write(struct.pack('<' + offset_format, ifd_offset))
+
+def save_image_in_strips(image_array, file_name):
+    """Saves a uint8 (height, width, 3) RGB array as an IMAGE_FORMAT file, one strip at a time (see save_png_in_strips and save_tiff_in_strips)."""
+    if IMAGE_FORMAT == 'tiff':
+        save_tiff_in_strips(image_array, file_name)
+    else:
+        save_png_in_strips(image_array, file_name)
+
+def reclaim_orphans():
+    """Classic engine: revives orphan coordinates (unallocated coordinates with an allocated neighbor) with the mutated color of a random allocated neighbor, and pushes them to coord_queue. Only coordinates in potential_orphan_coords_two (unallocated neighbors left over from growth) are checked, in row by row order; as a revived coordinate may revive its neighbors after it in that order, those are checked too. This finds the same orphans, in the same order, as checking every coordinate of the canvas row by row, but takes time proportional to the number of orphans."""
+    global orphans_to_reclaim_n
+    # If painting was stopped (by --STOP_AT_PERCENT) with coordinates still in coord_queue, their neighbors weren't tracked yet:
+    for flat_coord in coord_queue.to_array().tolist():
+        potential_orphan_coords_two.update(get_neighbor_flat_coords(flat_coord))
+    candidates = list(potential_orphan_coords_two)
+    potential_orphan_coords_two.clear()
+    checked = set(candidates)
+    heapq.heapify(candidates)
+    while candidates:
+        flat_coord = heapq.heappop(candidates)
+        if canvas_allocd_flat[flat_coord]:
+            continue
+        adj_color = find_adjacent_color(flat_coord)
+        if adj_color is not None:
+            coord_queue.push(flat_coord)
+            y, x = divmod(flat_coord, WIDTH)
+            canvas[y, x] = adj_color
+            mutate_color(canvas[y, x], rng.mutation())
+            allocate(flat_coord)
+            orphans_to_reclaim_n += 1
+            for neighbor_flat_coord in get_neighbor_flat_coords(flat_coord):
+                if neighbor_flat_coord > flat_coord and neighbor_flat_coord not in checked and not canvas_allocd_flat[neighbor_flat_coord]:
+                    checked.add(neighbor_flat_coord)
+                    heapq.heappush(candidates, neighbor_flat_coord)
+
+class FrameWriter:
+    """Saves animation frames (uint8 RGB arrays) to image files from n_threads background threads, taking them from a queue at most 2 * n_threads frames long; write() waits while the queue is full. With n_threads 0, write() saves frames itself."""
+    def __init__(self, n_threads):
+        self.frames = queue.Queue(maxsize=n_threads * 2)
+        self.error = None
+        self.threads = [threading.Thread(target=self.write_frames, daemon=True) for i in range(n_threads)]
+        for thread in self.threads:
+            thread.start()
+
+    def write(self, image_array, file_name):
+        if self.error:
+            raise self.error
+        if self.threads:
+            self.frames.put((image_array, file_name))
+        else:
+            Image.fromarray(image_array).save(file_name)
+
+    def write_frames(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                self.frames.task_done()
+                break
+            try:
+                Image.fromarray(frame[0]).save(frame[1])
+            except Exception as e:
+                self.error = e
+            self.frames.task_done()
+
+    def flush(self):
+        """Waits for all queued frames to be written."""
+        self.frames.join()
+        if self.error:
+            raise self.error
+
+    def close(self):
+        """Waits for all queued frames to be written, and stops the threads."""
+        for thread in self.threads:
+            self.frames.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.error:
+            raise self.error
+
+class FFmpegFrameWriter:
+    """Streams animation frames (uint8 RGB arrays) as raw video through a pipe to an ffmpeg process, which encodes them to video_file_name with the output options in the string ffmpeg_args. write() waits while ffmpeg is behind (the pipe is full). Has the same interface as FrameWriter; frame file names are ignored."""
+    def __init__(self, video_file_name, frame_rate, ffmpeg_args):
+        self.video_file_name = video_file_name
+        command = ['ffmpeg', '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', str(WIDTH) + 'x' + str(HEIGHT), '-framerate', str(frame_rate), '-i', '-']
+        command += shlex.split(ffmpeg_args) + [video_file_name]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, image_array, file_name):
+        try:
+            self.process.stdin.write(image_array.tobytes())
+        except OSError:
+            self.raise_exit_error()
+
+    def flush(self):
+        try:
+            self.process.stdin.flush()
+        except OSError:
+            self.raise_exit_error()
+
+    def close(self):
+        """Ends the stream and waits for ffmpeg to finish the video."""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        if self.process.wait() != 0:
+            self.raise_exit_error()
+
+    def raise_exit_error(self):
+        """Raises an error saying ffmpeg exited, and with which code, once it has. Writing to ffmpeg after it exits early (e.g. over bad --FFMPEG_ARGS) fails with BrokenPipeError, which doesn't say that."""
+        try:
+            # (Closes the stream, even though what is left of it can't be written:)
+            self.process.stdin.close()
+        except OSError:
+            pass
+        raise RuntimeError('ffmpeg exited with code ' + str(self.process.wait()) + ' encoding ' + self.video_file_name) from None
+
+class RawFrameWriter:
+    """Appends animation frames (uint8 RGB arrays) to one raw rgb24 video stream file; if resume_at_frame is nonzero, to the first that many frames of an existing file. Has the same interface as FrameWriter; frame file names are ignored."""
+    def __init__(self, raw_file_name, resume_at_frame=0):
+        if resume_at_frame and os.path.exists(raw_file_name):
+            self.file = open(raw_file_name, 'r+b')
+            self.file.truncate(resume_at_frame * WIDTH * HEIGHT * 3)
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.file = open(raw_file_name, 'wb')
+
+    def write(self, image_array, file_name):
+        self.file.write(image_array.tobytes())
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+# A delta frame file (--ANIM_OUTPUT delta) starts with a header of DELTA_FRAMES_MAGIC, the width and height of the canvas, and the background color, followed by chunks of frames, each a chunk header of the number of its first frame (from 1), how many frames it has, and how many bytes of data follow, then that data, compressed with zlib: the number of changed coordinates in every frame (uint64), then the changed coordinates (flat canvas indices, sorted) of every frame, each as its difference from the one before it in its frame (from 0 for the first), as uint32 (uint64 if the canvas has more than 2^32 coordinates), then their colors (uint8 RGB). All numbers are little-endian.
+DELTA_FRAMES_MAGIC = b'CGDELTA1'
+PAINT_LOG_MAGIC = b'CGPAINT1'
+DELTA_FRAMES_HEADER_FORMAT = '<8sQQ3B5x'
+DELTA_FRAMES_CHUNK_HEADER_FORMAT = '<QQQ'
+
+def get_delta_frames_index_dtype(width, height):
+    return np.dtype('<u4') if width * height <= 2 ** 32 else np.dtype('<u8')
+
+class DeltaFrameWriter:
+    """Appends animation frames, as the coordinates which changed since the last frame and their colors (from get_changed_pixels()), to a delta frame file (see DELTA_FRAMES_MAGIC). Frames are collected into chunks of about CHUNK_PIXELS changed coordinates, which are compressed and appended to the file, so it is only ever appended to, and a render that is killed loses only the chunk it was collecting; flush() ends the chunk early. If resume_at_frame is nonzero, keeps the chunks of the first that many frames of an existing file (checkpoints flush, so there is a chunk that ends there). Has the same interface as FrameWriter, but frames are written with write_changes(flat_coords, colors)."""
+    MAGIC = DELTA_FRAMES_MAGIC
+    CHUNK_PIXELS = 2 ** 20
+
+    def __init__(self, delta_file_name, resume_at_frame=0):
+        self.index_dtype = get_delta_frames_index_dtype(WIDTH, HEIGHT)
+        self.frames = []
+        self.pixels_n = 0
+        self.next_frame_number = resume_at_frame + 1
+        if resume_at_frame and os.path.exists(delta_file_name):
+            chunks_end = DeltaFrameReader(delta_file_name).get_chunks_end(resume_at_frame)
+            self.file = open(delta_file_name, 'r+b')
+            self.file.truncate(chunks_end)
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.file = open(delta_file_name, 'wb')
+            self.file.write(struct.pack(DELTA_FRAMES_HEADER_FORMAT, self.MAGIC, WIDTH, HEIGHT, *(int(value) for value in BG_COLOR)))
+
+    def write_changes(self, flat_coords, colors, step=None):
+        self.frames.append((flat_coords, colors, step))
+        self.pixels_n += len(flat_coords)
+        if self.pixels_n >= self.CHUNK_PIXELS:
+            self.write_chunk()
+
+    def write_chunk(self):
+        if not self.frames:
+            return
+        counts = np.array([len(flat_coords) for flat_coords, colors, step in self.frames], dtype='<u8')
+        # Sorted coordinates are mostly close together, so the differences between them (from 0 for the first of every frame) are small numbers, which compress much better:
+        flat_coords = np.concatenate([flat_coords for flat_coords, colors, step in self.frames])
+        index_deltas = np.diff(flat_coords, prepend=0)
+        frame_starts = (np.cumsum(counts) - counts)[counts > 0].astype(np.intp)
+        index_deltas[frame_starts] = flat_coords[frame_starts]
+        index_deltas = index_deltas.astype(self.index_dtype)
+        colors = np.concatenate([colors for flat_coords, colors, step in self.frames])
+        # Level 1 makes files only a little bigger than higher levels, and is several times quicker:
+        data = zlib.compress(counts.tobytes() + self.get_steps_data() + index_deltas.tobytes() + colors.tobytes(), 1)
+        self.file.write(struct.pack(DELTA_FRAMES_CHUNK_HEADER_FORMAT, self.next_frame_number, len(self.frames), len(data)) + data)
+        self.next_frame_number += len(self.frames)
+        self.frames = []
+        self.pixels_n = 0
+
+    def get_steps_data(self):
+        return b''
+
+    def flush(self):
+        self.write_chunk()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+class PaintLogWriter(DeltaFrameWriter):
+    """Appends steps of the render to a paint log (see --SAVE_PAINT_LOG), which is a delta frame file with PAINT_LOG_MAGIC, in which every frame (a step) also has the number of painted coordinates at its end (which its chunk has after the counts, as uint64): write_changes(flat_coords, colors, painted_coordinates)."""
+    MAGIC = PAINT_LOG_MAGIC
+
+    def get_steps_data(self):
+        return np.array([step for flat_coords, colors, step in self.frames], dtype='<u8').tobytes()
+
+class DeltaFrameReader:
+    """Reads a delta frame file (see DELTA_FRAMES_MAGIC) or paint log (see PaintLogWriter; is_paint_log is True): width, height and bg_color are those of the canvas, and frames() replays its frames. A chunk cut short at the end of the file (by a render that was killed) is ignored. Raises ValueError if the file is neither."""
+    def __init__(self, delta_file_name):
+        self.delta_file_name = delta_file_name
+        with open(delta_file_name, 'rb') as file:
+            header = file.read(struct.calcsize(DELTA_FRAMES_HEADER_FORMAT))
+        if len(header) < struct.calcsize(DELTA_FRAMES_HEADER_FORMAT) or header[:8] not in (DELTA_FRAMES_MAGIC, PAINT_LOG_MAGIC):
+            raise ValueError(delta_file_name + ' is not a color_growth.py delta frame file or paint log.')
+        magic, self.width, self.height, *self.bg_color = struct.unpack(DELTA_FRAMES_HEADER_FORMAT, header)
+        self.is_paint_log = magic == PAINT_LOG_MAGIC
+        self.index_dtype = get_delta_frames_index_dtype(self.width, self.height)
+
+    def chunks(self):
+        """Yields (first frame number, number of frames, file offset of the compressed data, its size in bytes) of every whole chunk, in order."""
+        chunk_header_size = struct.calcsize(DELTA_FRAMES_CHUNK_HEADER_FORMAT)
+        file_size = os.path.getsize(self.delta_file_name)
+        with open(self.delta_file_name, 'rb') as file:
+            offset = file.seek(struct.calcsize(DELTA_FRAMES_HEADER_FORMAT))
+            while offset + chunk_header_size <= file_size:
+                first_frame_number, frames_n, data_size = struct.unpack(DELTA_FRAMES_CHUNK_HEADER_FORMAT, file.read(chunk_header_size))
+                offset += chunk_header_size
+                if offset + data_size > file_size:
+                    break
+                yield first_frame_number, frames_n, offset, data_size
+                offset = file.seek(offset + data_size)
+
+    def get_frames_n(self):
+        return sum(chunk[1] for chunk in self.chunks())
+
+    def get_chunks_end(self, frames_n):
+        """Returns the file offset of the end of the chunks of the first frames_n frames."""
+        chunks_end = struct.calcsize(DELTA_FRAMES_HEADER_FORMAT)
+        for first_frame_number, chunk_frames_n, offset, data_size in self.chunks():
+            if first_frame_number + chunk_frames_n - 1 > frames_n:
+                break
+            chunks_end = offset + data_size
+        return chunks_end
+
+    def chunk_arrays(self, last_frame_number=None):
+        """Yields (first frame number, number of changed coordinates in every frame, number of painted coordinates at the end of every frame (None if this isn't a paint log), changed coordinates (flat canvas indices) of every frame one after another, their colors (a uint8 (number of coordinates, 3) array)) of every chunk, or every chunk up to the one with last_frame_number, in order."""
+        with open(self.delta_file_name, 'rb') as file:
+            for first_frame_number, frames_n, offset, data_size in self.chunks():
+                if last_frame_number is not None and first_frame_number > last_frame_number:
+                    return
+                file.seek(offset)
+                data = zlib.decompress(file.read(data_size))
+                counts = np.frombuffer(data, dtype='<u8', count=frames_n).astype(np.intp)
+                offset = counts.nbytes
+                steps = None
+                if self.is_paint_log:
+                    steps = np.frombuffer(data, dtype='<u8', count=frames_n, offset=offset).astype(np.int64)
+                    offset += steps.nbytes
+                index_deltas = np.frombuffer(data, dtype=self.index_dtype, count=int(counts.sum()), offset=offset).astype(np.intp)
+                colors = np.frombuffer(data, dtype=np.uint8, offset=offset + index_deltas.size * self.index_dtype.itemsize).reshape(-1, 3)
+                # Every frame's differences start from 0, so subtract the sum of the differences of the frames before it:
+                index_sums = np.cumsum(index_deltas)
+                frame_starts = np.concatenate(([0], np.cumsum(counts)))
+                flat_coords = index_sums - np.repeat(np.concatenate(([0], index_sums))[frame_starts[:-1]], counts)
+                yield first_frame_number, counts, steps, flat_coords, colors
+
+    def frames(self, last_frame_number=None):
+        """Yields (frame number, changed coordinates (flat canvas indices), their colors (a uint8 (number of coordinates, 3) array)) of every frame, or every frame up to last_frame_number, in order. Applying them in order to an image of bg_color replays the animation."""
+        for first_frame_number, counts, steps, flat_coords, colors in self.chunk_arrays(last_frame_number):
+            starts = np.concatenate(([0], np.cumsum(counts)))
+            for i in range(len(counts)):
+                frame_number = first_frame_number + i
+                if last_frame_number is not None and frame_number > last_frame_number:
+                    return
+                yield frame_number, flat_coords[starts[i]:starts[i + 1]], colors[starts[i]:starts[i + 1]]
+
+def get_peak_rss_bytes():
+    """Returns the peak resident memory use in bytes of this process or its biggest (finished) child process, whichever is more, or None if the OS doesn't report it."""
+    if resource is None:
+        return None
+    # Linux reports kilobytes, macOS bytes:
+    units = 1 if sys.platform == 'darwin' else 1024
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) * units
+
+class RenderProfiler:
+    """Records the seconds a render spends in each of its phases, and samples of its progress, for --PROFILE. lap(phase) adds the time since the last lap (or since the profiler was made) to the time of phase, so that the engines only need to call it at the end of every phase; sample(queue_size) records a sample."""
+    PHASES = ['setup', 'mutation', 'neighbor selection', 'border blend', 'tile growth', 'frame encode', 'orphan reclaim', 'checkpoint', 'image save', 'other']
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.lap_time = self.start_time
+        self.phase_seconds = dict.fromkeys(self.PHASES, 0.0)
+        self.samples = []
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.phase_seconds[phase] += now - self.lap_time
+        self.lap_time = now
+
+    def sample(self, queue_size):
+        now = time.perf_counter()
+        pixels_per_second = None
+        if self.samples and now > self.samples[-1]['seconds'] + self.start_time:
+            pixels_per_second = (painted_coordinates - self.samples[-1]['painted_coordinates']) / (now - self.start_time - self.samples[-1]['seconds'])
+        self.samples.append({
+            'seconds': now - self.start_time,
+            'painted_coordinates': painted_coordinates,
+            'pixels_per_second': pixels_per_second,
+            'queue_size': queue_size,
+            'peak_rss_bytes': get_peak_rss_bytes(),
+            'phase_seconds': dict(self.phase_seconds)
+        })
+
+    def write(self, file_base_name, file_format):
+        """Writes the samples (and for json, a summary) to file_base_name + '_profile.' + file_format, and returns that file name."""
+        file_name = file_base_name + '_profile.' + file_format
+        with open(file_name, 'w', newline='') as f:
+            if file_format == 'json':
+                first, last = self.samples[0], self.samples[-1]
+                growth_seconds = last['seconds'] - first['seconds']
+                json.dump({
+                    'color_growth_version': ColorGrowthPyVersionString,
+                    'switches': SCRIPT_ARGS_STR,
+                    'growth_engine': GROWTH_ENGINE,
+                    'canvas_size': allPixelsN,
+                    'painted_coordinates': last['painted_coordinates'] - first['painted_coordinates'],
+                    'seconds': last['seconds'],
+                    'pixels_per_second': (last['painted_coordinates'] - first['painted_coordinates']) / growth_seconds if growth_seconds else None,
+                    'peak_rss_bytes': last['peak_rss_bytes'],
+                    'phase_seconds': last['phase_seconds'],
+                    'samples': self.samples
+                }, f, indent=1)
+            else:
+                writer = csv.writer(f)
+                writer.writerow(['seconds', 'painted_coordinates', 'pixels_per_second', 'queue_size', 'peak_rss_bytes'] + [phase + ' seconds' for phase in self.PHASES])
+                for sample in self.samples:
+                    writer.writerow([sample['seconds'], sample['painted_coordinates'], sample['pixels_per_second'], sample['queue_size'], sample['peak_rss_bytes']] + [sample['phase_seconds'][phase] for phase in self.PHASES])
+        return file_name
 
 def print_progress(newly_painted_coords):
     """Prints coordinate plotting statistics (progress report)."""
@@ -616,6 +1793,36 @@ def print_progress(newly_painted_coords):
     print(newly_painted_coords, ':', painted_coordinates, ':', \
     stopRenderAtPixelsN, ':', allPixelsN, ':', orphans_to_reclaim_n)
 
+def get_frame_schedule(save_every_n, ramp_up_save_every_n, width, height, stop_at_pixels_n):
+    """Returns the list of painted coordinate counts to save animation frames at (as saveFramesAtCoordsPaintedArray), for a canvas of width and height which stops at stop_at_pixels_n painted coordinates (see --SAVE_EVERY_N and --RAMP_UP_SAVE_EVERY_N). Empty if save_every_n is 0."""
+    frame_schedule = []
+    # If ramp_up_save_every_n is True, increasing values for when to save N evolved coordinates to animation frames:
+    if save_every_n != 0 and ramp_up_save_every_n == True:
+        allPixelsNdividedBy_SAVE_EVERY_N = width * height / save_every_n
+        divisor = 1 / allPixelsNdividedBy_SAVE_EVERY_N
+        saveFramesAtCoordsPaintedMultipliers = [x * divisor for x in range(0, int(allPixelsNdividedBy_SAVE_EVERY_N)+1)]
+        for multiplier in saveFramesAtCoordsPaintedMultipliers:
+            mod_w = width * multiplier
+            mod_h = height * multiplier
+            mod_area = mod_w * mod_h
+            frame_schedule.append(int(mod_area))
+        # Deduplicate elements in the list but maintain order:
+        frame_schedule = list(unique_everseen(frame_schedule))
+        # Because that resulting list doesn't include the ending number, add it:
+        frame_schedule.append(stop_at_pixels_n)
+    # If ramp_up_save_every_n is False, values at constant intervals for when to save animation frames:
+    if save_every_n != 0 and ramp_up_save_every_n == False:
+        frame_schedule = [x * save_every_n for x in range(0, int(stop_at_pixels_n/save_every_n)+1 )]
+        # Because that range doesn't include the end of the range:
+        frame_schedule.append(stop_at_pixels_n)
+        # Because that resulting list doesn't include the ending number, add it:
+        frame_schedule.append(stop_at_pixels_n)
+    return frame_schedule
+
+def get_frame_number_digits(stop_at_pixels_n):
+    """Returns how many digits png animation frame file numbers are zero-padded to, for a render which stops at stop_at_pixels_n painted coordinates: as many as that has, which is at least as many as the number of frames has."""
+    return len(str(stop_at_pixels_n))
+
 def set_img_frame_file_name():
     global padFileNameNumbersDigitsWidth
     global renderedFrameCounter
@@ -638,203 +1845,1025 @@ def save_animation_frame():
                 saveFramesAtCoordsPaintedArrayIDX += 1
                 saveNextFrameNumber = saveFramesAtCoordsPaintedArray[saveFramesAtCoordsPaintedArrayIDX]
             set_img_frame_file_name()
-            # Only write frame if it does not already exist (allows resume of suspended / crashed renders) :
-            if os.path.exists(imageFrameFileName) == False:
-                # print("Animation render frame file does not exist; writing frame.")
-                coords_set_to_image(canvas, imageFrameFileName)
+            write_animation_frame()
         animationFrameCounter += 1
+
+def write_animation_frame():
+    """Writes the canvas as animation frame number renderedFrameCounter (to imageFrameFileName, or the video stream; see --ANIM_OUTPUT), and passes it to the frame callback of render() if there is one."""
+    # Only write frame if it does not already exist (allows resume of suspended / crashed renders); video streams get every frame, and so do frames after a checkpoint being resumed from (an interrupted render may have left them partly written):
+    write_frame = ANIM_OUTPUT in ('ffmpeg', 'raw') or (ANIM_OUTPUT == 'png' and (os.path.exists(imageFrameFileName) == False or renderedFrameCounter > checkpoint_frames_written))
+    flat_coords, colors = update_image_buffer()
+    # Delta frames are only the coordinates which changed since the last frame, so they take no more work than there are of those:
+    if isinstance(frame_writer, DeltaFrameWriter):
+        frame_writer.write_changes(flat_coords, colors)
+    if write_frame or render_frame_callback:
+        # Frame writer threads and the frame callback may keep it after the buffer changes:
+        image_array = image_buffer.copy()
+        if write_frame:
+            # print("Animation render frame file does not exist; writing frame.")
+            frame_writer.write(image_array, imageFrameFileName)
+        if render_frame_callback:
+            render_frame_callback(image_array, renderedFrameCounter)
+
+def save_paint_log_step():
+    """For --SAVE_PAINT_LOG: appends the coordinates which changed since the last step, and their colors, to the paint log as a step ending at painted_coordinates. Called wherever the engines check whether to save animation frames, and frames to be saved there (at counter values less than painted_coordinates) have every step up to the first which ends past their counter value; so frames made from the paint log for the render's frame schedule are the same as the render's."""
+    flat_coords, colors = get_changed_pixels(changed_coords)
+    if len(flat_coords):
+        paint_log_writer.write_changes(flat_coords, colors, painted_coordinates)
+        # Animation frames take what changed from the steps between them:
+        if frame_changed_coords and frame_changed_coords is not changed_coords:
+            frame_changed_coords.add_batch(flat_coords)
+
+def save_animation_frames_until(frame_counter_end):
+    """Does what calling save_animation_frame() once for every animation frame counter value up to (not including) frame_counter_end would, but skips straight to the counter values that save a frame. For engines that paint many coordinates between checks."""
+    global animationFrameCounter
+    if paint_log_writer:
+        save_paint_log_step()
+    if SAVE_EVERY_N != 0:
+        while animationFrameCounter <= saveNextFrameNumber < frame_counter_end:
+            animationFrameCounter = saveNextFrameNumber
+            save_animation_frame()
+        animationFrameCounter = max(animationFrameCounter, frame_counter_end)
+
+class CheckpointUnpickler(pickle.Unpickler):
+    """Loads state.pickle of a checkpoint with the classes of this script (e.g. RNGStream) whether it was saved with this script run as a script (the classes are in module __main__) or imported as module color_growth."""
+    def find_class(self, module, name):
+        if module in ('__main__', 'color_growth') and name in globals():
+            return globals()[name]
+        return super().find_class(module, name)
+
+def save_checkpoint():
+    """Saves everything needed to resume the render from this point (see --RESUME) to checkpoint_folder_name: the canvas, allocation mask and coordinate queue (as flat canvas indices, in queue order), and the coordinates changed since the last animation frame and paint log step, as .npy files, and counters and random number generator state in state.pickle. Writes to a temporary folder first, and replaces any prior checkpoint only when that is done."""
+    global next_checkpoint_at
+    # A preview saves its seed to continue from at full size here instead, once:
+    if PREVIEW_SCALE:
+        save_preview_seed()
+        next_checkpoint_at = float('inf')
+        return
+    # Frames up to this point must be on disk before the checkpoint claims they are:
+    frame_writer.flush()
+    if paint_log_writer:
+        paint_log_writer.flush()
+    tmp_folder_name = checkpoint_folder_name + '_tmp'
+    if os.path.exists(tmp_folder_name):
+        shutil.rmtree(tmp_folder_name)
+    os.mkdir(tmp_folder_name)
+    np.save(tmp_folder_name + '/canvas.npy', canvas)
+    np.save(tmp_folder_name + '/canvas_allocd.npy', canvas_allocd)
+    np.save(tmp_folder_name + '/coord_queue.npy', coord_queue.to_array())
+    if changed_coords:
+        # The coordinates changed since the last paint log step (or animation frame), which the next one records:
+        np.save(tmp_folder_name + '/changed_coords.npy', changed_coords.to_array())
+    if frame_changed_coords and frame_changed_coords is not changed_coords:
+        # The coordinates paint log steps recorded since the last animation frame, which the next one converts:
+        np.save(tmp_folder_name + '/frame_changed_coords.npy', frame_changed_coords.to_array())
+    orphan_candidates = [np.array(list(potential_orphan_coords_two), dtype=np.int64)] + potential_orphan_flat_coords
+    np.save(tmp_folder_name + '/orphan_candidates.npy', np.unique(np.concatenate(orphan_candidates)).astype(np.int64))
+    state = {
+        'SCRIPT_ARGS_STR': SCRIPT_ARGS_STR,
+        'painted_coordinates': painted_coordinates,
+        'newly_painted_coords': newly_painted_coords,
+        'coords_painted_since_reclaim': coords_painted_since_reclaim,
+        'orphans_to_reclaim_n': orphans_to_reclaim_n,
+        'report_stats_nth_counter': report_stats_nth_counter,
+        'animationFrameCounter': animationFrameCounter,
+        'renderedFrameCounter': renderedFrameCounter,
+        'saveNextFrameNumber': saveNextFrameNumber,
+        'saveFramesAtCoordsPaintedArrayIDX': saveFramesAtCoordsPaintedArrayIDX,
+        'paint_log_steps_n': paint_log_writer.next_frame_number - 1 if paint_log_writer else 0,
+        'tile_rngs': tile_rngs,
+        'rng': rng
+    }
+    if rng.version == 0:
+        state['random_state'] = random.getstate()
+        state['np_random_state'] = np.random.get_state()
+    with open(tmp_folder_name + '/state.pickle', 'wb') as f:
+        pickle.dump(state, f)
+    if os.path.exists(checkpoint_folder_name):
+        shutil.rmtree(checkpoint_folder_name)
+    os.rename(tmp_folder_name, checkpoint_folder_name)
+    next_checkpoint_at = (painted_coordinates // CHECKPOINT_EVERY_N + 1) * CHECKPOINT_EVERY_N
+    print('Saved checkpoint', checkpoint_folder_name, 'at', painted_coordinates, 'painted coordinates.')
+
+# What fraction of the frontier the batched engine grows from in each generation:
+BATCHED_GROWTH_FRACTION = 0.25
+# The batched engine's neighbor offsets, NEIGHBOR_DY and NEIGHBOR_DX, are NumPy arrays of NEIGHBOR_OFFSETS made by import_render_modules().
+
+def get_neighbor_flat_indices(flat_coords):
+    """For an array of flat (y * WIDTH + x) canvas indices, returns two (len(flat_coords), 8) arrays: the flat indices of each coordinate's neighbors, and whether each neighbor is on the canvas (always True if TILEABLE, as neighbors wrap around the edges)."""
+    ys, xs = np.divmod(flat_coords, WIDTH)
+    neighbor_ys = ys[:, np.newaxis] + NEIGHBOR_DY
+    neighbor_xs = xs[:, np.newaxis] + NEIGHBOR_DX
+    if TILEABLE:
+        neighbor_ys %= HEIGHT
+        neighbor_xs %= WIDTH
+        in_bounds = np.ones(neighbor_ys.shape, dtype=bool)
+    else:
+        in_bounds = (neighbor_ys >= 0) & (neighbor_ys < HEIGHT) & (neighbor_xs >= 0) & (neighbor_xs < WIDTH)
+        np.clip(neighbor_ys, 0, HEIGHT - 1, out=neighbor_ys)
+        np.clip(neighbor_xs, 0, WIDTH - 1, out=neighbor_xs)
+    return neighbor_ys * WIDTH + neighbor_xs, in_bounds
+
+def grow_batched_generation(frontier):
+    """Batched engine: mutates the color of every coordinate in frontier (an array of flat canvas indices, in random order) at once, has each of them claim a random GROWTH_CLIP-clipped number of its unallocated neighbors, resolves coordinates claimed by more than one frontier coordinate in favor of the earliest in frontier, and returns the claimed coordinates (the next frontier)."""
+    canvas_flat = canvas.reshape(-1, 3)
+    allocd_flat = canvas_allocd.reshape(-1)
+    colors = canvas_flat[frontier] + rng.mutations(len(frontier))
+    np.clip(colors, 0, 255 * canvas_color_scale, out=colors)
+    canvas_flat[frontier] = colors
+    if profiler:
+        profiler.lap('mutation')
+    neighbors, in_bounds = get_neighbor_flat_indices(frontier)
+    unallocd = in_bounds & ~allocd_flat[neighbors]
+    # START GROWTH_CLIP (VISCOSITY) CONTROL, for every frontier coordinate at once.
+    n_neighbors_to_claim = np.clip(rng.neighbor_counts(len(frontier)), 0, unallocd.sum(axis=1))
+    # Random ranks of unallocated neighbors (allocated ones rank last); claim the n lowest-ranked:
+    sort_keys = rng.random(unallocd.shape)
+    sort_keys[~unallocd] = 2
+    claimed = np.zeros(unallocd.shape, dtype=bool)
+    np.put_along_axis(claimed, sort_keys.argsort(axis=1), np.arange(8) < n_neighbors_to_claim[:, np.newaxis], axis=1)
+    # END GROWTH_CLIP (VISCOSITY) CONTROL.
+    # Unallocated neighbors left unclaimed may become orphans:
+    potential_orphan_flat_coords.append(neighbors[unallocd & ~claimed])
+    claimant_rows, claimed_directions = np.nonzero(claimed)
+    new_coords, first_claims = np.unique(neighbors[claimant_rows, claimed_directions], return_index=True)
+    claimant_rows = claimant_rows[first_claims]
+    claimed_directions = claimed_directions[first_claims]
+    new_colors = colors[claimant_rows]
+    if profiler:
+        profiler.lap('neighbor selection')
+    if BORDER_BLEND:
+        # Blend with the color of the coordinate beyond the new one (on the opposite side from the claimant), as the classic engine does:
+        beyond_ys = frontier[claimant_rows] // WIDTH + 2 * NEIGHBOR_DY[claimed_directions]
+        beyond_xs = frontier[claimant_rows] % WIDTH + 2 * NEIGHBOR_DX[claimed_directions]
+        beyond_in_bounds = (beyond_ys >= 0) & (beyond_ys < HEIGHT) & (beyond_xs >= 0) & (beyond_xs < WIDTH)
+        beyond_flat = np.where(beyond_in_bounds, beyond_ys * WIDTH + beyond_xs, 0)
+        blend = beyond_in_bounds & allocd_flat[beyond_flat]
+        new_colors[blend] = blend_colors(new_colors[blend], canvas_flat[beyond_flat[blend]])
+    canvas_flat[new_coords] = new_colors
+    allocd_flat[new_coords] = True
+    if profiler:
+        profiler.lap('border blend')
+    return new_coords
+
+# How many arrays of potential orphans the batched engine collects before compacting them (see compact_potential_orphans):
+POTENTIAL_ORPHAN_ARRAYS_MAX = 256
+
+def compact_potential_orphans():
+    """Batched engine: replaces the arrays in potential_orphan_flat_coords with one array of the coordinates in them which are still unallocated, sorted and without repeats, and returns it. That is all reclaim_orphans_batched uses of them, so doing this every so often keeps them from growing with the canvas without changing the render."""
+    orphans = np.unique(np.concatenate(potential_orphan_flat_coords + [np.empty(0, dtype=np.intp)]))
+    orphans = orphans[~canvas_allocd.reshape(-1)[orphans]]
+    potential_orphan_flat_coords[:] = [orphans]
+    return orphans
+
+def reclaim_orphans_batched():
+    """Batched engine: gives every unallocated coordinate which has an allocated neighbor the mutated color of a random one of those neighbors, and returns those coordinates (as flat canvas indices) to grow from. Only coordinates in potential_orphan_flat_coords (unclaimed neighbors left over from growth) are checked."""
+    canvas_flat = canvas.reshape(-1, 3)
+    allocd_flat = canvas_allocd.reshape(-1)
+    orphans = compact_potential_orphans()
+    potential_orphan_flat_coords.clear()
+    neighbors, in_bounds = get_neighbor_flat_indices(orphans)
+    allocd_neighbors = in_bounds & allocd_flat[neighbors]
+    has_allocd_neighbor = allocd_neighbors.any(axis=1)
+    orphans = orphans[has_allocd_neighbor]
+    neighbors = neighbors[has_allocd_neighbor]
+    allocd_neighbors = allocd_neighbors[has_allocd_neighbor]
+    # Pick a random allocated neighbor for each orphan:
+    sort_keys = rng.random(allocd_neighbors.shape)
+    sort_keys[~allocd_neighbors] = -1
+    adj_colors = canvas_flat[neighbors[np.arange(len(orphans)), sort_keys.argmax(axis=1)]]
+    adj_colors += rng.mutations(len(orphans))
+    np.clip(adj_colors, 0, 255 * canvas_color_scale, out=adj_colors)
+    canvas_flat[orphans] = adj_colors
+    allocd_flat[orphans] = True
+    return orphans
+
+def grow_batched():
+    """Batched engine main loop: grows from coord_queue by generations until nothing is left to grow (or the --STOP_AT_PERCENT target is reached), saving animation frames and printing progress along the way."""
+    global painted_coordinates
+    global orphans_to_reclaim_n
+    global newly_painted_coords
+    while len(coord_queue) > 0:
+        # Grow from a random fraction of the frontier and leave the rest for later (like the classic engine's random picks from its queue do), which makes growth less uniform; but paint no more than would exceed the termination count (as the classic engine does):
+        n_to_grow = min(int(np.ceil(len(coord_queue) * BATCHED_GROWTH_FRACTION)), stopRenderAtPixelsN - painted_coordinates + 1)
+        frontier = coord_queue.pop_random_batch(n_to_grow)
+        coord_queue.push_batch(grow_batched_generation(frontier))
+        if len(potential_orphan_flat_coords) > POTENTIAL_ORPHAN_ARRAYS_MAX:
+            compact_potential_orphans()
+        painted_coordinates += len(frontier)
+        newly_painted_coords += len(frontier)
+        if profiler:
+            profiler.lap('neighbor selection')
+        save_animation_frames_until(painted_coordinates)
+        if profiler:
+            profiler.lap('frame encode')
+        if newly_painted_coords >= report_stats_every_n:
+            print_progress(newly_painted_coords)
+            newly_painted_coords = 0
+            if profiler:
+                profiler.sample(len(coord_queue))
+        if profiler:
+            profiler.lap('other')
+        if painted_coordinates > stopRenderAtPixelsN:
+            print('Painted coordinate termination count', painted_coordinates, 'exceeded. Ending paint algorithm.')
+            break
+        if len(coord_queue) == 0 and RECLAIM_ORPHANS:
+            orphans = reclaim_orphans_batched()
+            coord_queue.push_batch(orphans)
+            orphans_to_reclaim_n += len(orphans)
+            if profiler:
+                profiler.lap('orphan reclaim')
+        if CHECKPOINT_EVERY_N and painted_coordinates >= next_checkpoint_at:
+            save_checkpoint()
+            if profiler:
+                profiler.lap('checkpoint')
+
+def get_tile_count(length):
+    """Tiled engine: returns how many tiles to split a canvas dimension of this length into. Tiles are at least TILE_SIZE long, and if TILEABLE there is an even number of them (or one), so that tiles grown in the same checkerboard phase are never next to each other, even across the wrapped canvas edge."""
+    n_tiles = max(1, length // TILE_SIZE)
+    if TILEABLE and n_tiles > 1 and n_tiles % 2 == 1:
+        n_tiles -= 1
+    return n_tiles
+
+def get_tile_bounds(tile_id):
+    """Tiled engine: returns the first row, last row + 1, first column and last column + 1 of a tile. Tile IDs go row by row, from 0 at the top left."""
+    tile_row, tile_col = divmod(tile_id, n_tile_cols)
+    return -(-tile_row * HEIGHT // n_tile_rows), -(-(tile_row + 1) * HEIGHT // n_tile_rows), -(-tile_col * WIDTH // n_tile_cols), -(-(tile_col + 1) * WIDTH // n_tile_cols)
+
+def get_tiles(flat_coords):
+    """Tiled engine: returns the tile IDs of an array of flat canvas indices."""
+    return flat_coords // WIDTH * n_tile_rows // HEIGHT * n_tile_cols + flat_coords % WIDTH * n_tile_cols // WIDTH
+
+def get_tile_phase(tile_id):
+    """Tiled engine: returns which of the four checkerboard phases (0-3) a tile is grown in."""
+    tile_row, tile_col = divmod(tile_id, n_tile_cols)
+    return tile_row % 2 * 2 + tile_col % 2
+
+class TileRNGStreams:
+    """Tiled engine: stands in for rng in grow_batched_generation when it grows the frontiers of several tiles (of counts coordinates each) at once. Every draw is made of each tile's draws from its own random number stream, so that what a tile draws doesn't depend on which other tiles it is grown with."""
+    def __init__(self, rngs, counts):
+        self.rngs = rngs
+        self.counts = counts
+
+    def mutations(self, n):
+        return np.concatenate([rng.mutations(count) for rng, count in zip(self.rngs, self.counts)])
+
+    def neighbor_counts(self, n):
+        return np.concatenate([rng.neighbor_counts(count) for rng, count in zip(self.rngs, self.counts)])
+
+    def random(self, shape):
+        return np.concatenate([rng.random((count,) + shape[1:]) for rng, count in zip(self.rngs, self.counts)])
+
+def tile_worker(connection, tile_ids, tile_rngs):
+    """Tiled engine worker process: keeps the frontier (a Frontier of indices into the tile) and random number stream of every tile in tile_ids, and grows them on the shared canvas when the main process asks (see grow_tiled), until it sends None."""
+    global rng
+    global profiler
+    # Workers time nothing; their time is tile growth to the main process:
+    profiler = None
+    potential_orphan_flat_coords.clear()
+    tile_bounds = {tile_id: get_tile_bounds(tile_id) for tile_id in tile_ids}
+    frontiers = {tile_id: Frontier((y1 - y0) * (x1 - x0)) for tile_id, (y0, y1, x0, x1) in tile_bounds.items()}
+    def to_tile_coords(tile_id, flat_coords):
+        y0, y1, x0, x1 = tile_bounds[tile_id]
+        return (flat_coords // WIDTH - y0) * (x1 - x0) + flat_coords % WIDTH - x0
+    def to_flat_coords(tile_id, tile_coords):
+        y0, y1, x0, x1 = tile_bounds[tile_id]
+        return (tile_coords // (x1 - x0) + y0) * WIDTH + tile_coords % (x1 - x0) + x0
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        elif message[0] == 'grow':
+            # ('grow', phase, pushes): push coordinates (from other tiles, start coordinates or reclaimed orphans) to the frontiers of tiles, then grow every tile in the phase by one generation:
+            phase, pushes = message[1:]
+            for tile_id in sorted(pushes):
+                frontiers[tile_id].push_batch(to_tile_coords(tile_id, pushes[tile_id]))
+            growing_tile_ids = [tile_id for tile_id in tile_ids if get_tile_phase(tile_id) == phase and len(frontiers[tile_id]) > 0]
+            tile_frontiers = []
+            for tile_id in growing_tile_ids:
+                rng = tile_rngs[tile_id]
+                tile_frontiers.append(to_flat_coords(tile_id, frontiers[tile_id].pop_random_batch(int(np.ceil(len(frontiers[tile_id]) * BATCHED_GROWTH_FRACTION)))))
+            new_coords = np.empty(0, dtype=np.intp)
+            if growing_tile_ids:
+                # Tiles in the same phase never claim the same coordinates, so they can all be grown in one go:
+                rng = TileRNGStreams([tile_rngs[tile_id] for tile_id in growing_tile_ids], [len(tile_frontier) for tile_frontier in tile_frontiers])
+                new_coords = grow_batched_generation(np.concatenate(tile_frontiers))
+            # Claimed coordinates in a growing tile were claimed by that tile; push those to its frontier, and send the rest (in tiles of other phases) back:
+            new_tiles = get_tiles(new_coords)
+            is_outbound = np.ones(len(new_coords), dtype=bool)
+            for tile_id in growing_tile_ids:
+                in_tile = new_tiles == tile_id
+                frontiers[tile_id].push_batch(to_tile_coords(tile_id, new_coords[in_tile]))
+                is_outbound &= ~in_tile
+            # For delta frames, also send back every coordinate painted (see ChangedCoords):
+            changed = np.concatenate(tile_frontiers + [new_coords]) if changed_coords else None
+            connection.send((sum(len(tile_frontier) for tile_frontier in tile_frontiers), new_coords[is_outbound], sum(len(frontier) for frontier in frontiers.values()), changed))
+        elif message[0] == 'orphans':
+            connection.send(list(potential_orphan_flat_coords))
+            potential_orphan_flat_coords.clear()
+        elif message[0] == 'state':
+            connection.send({tile_id: (to_flat_coords(tile_id, frontiers[tile_id].to_array()), tile_rngs[tile_id]) for tile_id in tile_ids})
+
+def grow_tiled():
+    """Tiled engine main loop: like grow_batched, but the canvas is split into tiles, each with its own frontier and random number stream (seeded by RANDOM_SEED and the tile), which tile_worker processes grow on the shared canvas. Every generation, tiles in alternate rows and columns are grown in four phases, one after another. A tile only writes coordinates in it or one coordinate beyond it, and only reads those or one more coordinate beyond, so tiles grown in the same phase (which have a tile of at least TILE_SIZE between them) never touch the same coordinates. Coordinates claimed beyond a tile come back here after each phase, and are pushed to the frontiers of their tiles before the next phase. Output is the same for any number of workers."""
+    global painted_coordinates
+    global orphans_to_reclaim_n
+    global newly_painted_coords
+    global tile_rngs
+    global coord_queue
+    n_tiles = n_tile_rows * n_tile_cols
+    if tile_rngs is None:
+        tile_rngs = {tile_id: RNGStream([RANDOM_SEED, tile_id], 1, RSHIFT, GROWTH_CLIP, canvas_color_scale == 2) for tile_id in range(n_tiles)}
+    # Deal out the tiles of each phase to the workers in turn, so that every worker has (about) as many tiles to grow in every phase:
+    n_workers = min(TILED_WORKERS, n_tiles)
+    tile_ids_by_phase = sorted(range(n_tiles), key=get_tile_phase)
+    worker_tile_ids = [tile_ids_by_phase[i::n_workers] for i in range(n_workers)]
+    print('Growing', n_tile_rows, 'x', n_tile_cols, 'tiles with', n_workers, 'worker processes . . .')
+    # Forked workers have the same canvas and canvas_allocd (in shared memory) and globals as this process:
+    context = multiprocessing.get_context('fork')
+    connections = []
+    workers = []
+    for tile_ids in worker_tile_ids:
+        connection, worker_connection = context.Pipe()
+        workers.append(context.Process(target=tile_worker, args=(worker_connection, tile_ids, tile_rngs), daemon=True))
+        workers[-1].start()
+        worker_connection.close()
+        connections.append(connection)
+    # Coordinates to push to the frontiers of tiles before they next grow, as lists of arrays (in order) by tile ID:
+    pending_pushes = {}
+    def add_pending_pushes(flat_coords):
+        tiles = get_tiles(flat_coords)
+        order = np.argsort(tiles, kind='stable')
+        tile_ids, tile_starts = np.unique(tiles[order], return_index=True)
+        for tile_id, tile_flat_coords in zip(tile_ids.tolist(), np.split(flat_coords[order], tile_starts[1:])):
+            pending_pushes.setdefault(tile_id, []).append(tile_flat_coords)
+    add_pending_pushes(coord_queue.to_array())
+    frontier_len = len(coord_queue)
+    while frontier_len > 0:
+        for phase in range(4):
+            for connection, tile_ids in zip(connections, worker_tile_ids):
+                connection.send(('grow', phase, {tile_id: np.concatenate(pending_pushes.pop(tile_id)) for tile_id in tile_ids if tile_id in pending_pushes}))
+            results = [connection.recv() for connection in connections]
+            # Sorted, so that the order they are pushed in doesn't depend on which worker grew which tile:
+            add_pending_pushes(np.sort(np.concatenate([result[1] for result in results])))
+            if changed_coords:
+                for result in results:
+                    changed_coords.add_batch(result[3])
+            n_painted = sum(result[0] for result in results)
+            painted_coordinates += n_painted
+            newly_painted_coords += n_painted
+            frontier_len = sum(result[2] for result in results) + sum(len(flat_coords) for tile_pushes in pending_pushes.values() for flat_coords in tile_pushes)
+            if painted_coordinates > stopRenderAtPixelsN:
+                break
+        if profiler:
+            profiler.lap('tile growth')
+        save_animation_frames_until(painted_coordinates)
+        if profiler:
+            profiler.lap('frame encode')
+        if newly_painted_coords >= report_stats_every_n:
+            print_progress(newly_painted_coords)
+            newly_painted_coords = 0
+            if profiler:
+                profiler.sample(frontier_len)
+        if profiler:
+            profiler.lap('other')
+        if painted_coordinates > stopRenderAtPixelsN:
+            print('Painted coordinate termination count', painted_coordinates, 'exceeded. Ending paint algorithm.')
+            break
+        if frontier_len == 0 and RECLAIM_ORPHANS:
+            for connection in connections:
+                connection.send(('orphans',))
+                potential_orphan_flat_coords.extend(connection.recv())
+            orphans = reclaim_orphans_batched()
+            add_pending_pushes(orphans)
+            if changed_coords:
+                changed_coords.add_batch(orphans)
+            orphans_to_reclaim_n += len(orphans)
+            frontier_len = len(orphans)
+            if profiler:
+                profiler.lap('orphan reclaim')
+        if CHECKPOINT_EVERY_N and painted_coordinates >= next_checkpoint_at:
+            # Gather the tile frontiers (followed by their pending pushes) into coord_queue, and the tile random number streams and orphan candidates, for save_checkpoint:
+            tile_states = {}
+            for connection in connections:
+                connection.send(('state',))
+                tile_states.update(connection.recv())
+                connection.send(('orphans',))
+                potential_orphan_flat_coords.extend(connection.recv())
+            coord_queue = Frontier(HEIGHT * WIDTH)
+            for tile_id in range(n_tiles):
+                coord_queue.push_batch(np.concatenate([tile_states[tile_id][0].astype(np.intp)] + pending_pushes.get(tile_id, [])))
+                tile_rngs[tile_id] = tile_states[tile_id][1]
+            save_checkpoint()
+            if profiler:
+                profiler.lap('checkpoint')
+    for connection, worker in zip(connections, workers):
+        connection.send(None)
+        worker.join()
 # END GLOBAL FUNCTIONS
 # END OPTIONS AND GLOBALS
 
 
-"""START MAIN FUNCTIONALITY."""
-print('Initializing render script..')
-
-# A dict of Coordinate objects which is used with tracking sets to fill a "canvas:"
-canvas = []
-# A set of coordinates (tuples, not Coordinate objects) which are free for the taking:
-unallocd_coords = set()
-# A set of coordinates (again tuples) which are set aside (allocated) for use:
-allocd_coords = set()
-# A set of coordinates (again tuples) which have been color mutated and may no longer
-# coordinate mutate:
-filled_coords = set()
-
-coord_queue = []
-
-# Initialize canvas dict and unallocd_coords set (canvas being a dict of Coordinates with
-# tuple coordinates as keys:
-for y in range(0, HEIGHT):        # for columns (x) in row)
-    canvas.append([])
-    for x in range(0, WIDTH):        # over the columns, prep and add:
-        unallocd_coords.add((y, x))
-        canvas[y].append([-1,-1,-1])
-
-# If ARGS.CUSTOM_COORDS_AND_COLORS was not passed to script, initialize allocd_coords set by random selection from unallocd_coords (and remove from unallocd_coords); structure of coords is (y,x)
-if not ARGS.CUSTOM_COORDS_AND_COLORS:
-    print('no --CUSTOM_COORDS_AND_COLORS argument passed to script, so initializing coordinate locations randomly . . .')
-    RNDcoord = random.sample(unallocd_coords, START_COORDS_N)
-    for coord in RNDcoord:
-        coord_queue.append(coord)
-        if COLOR_MUTATION_BASE == "random":
-            canvas[coord[0]][coord[1]] = np.random.randint(0, 255, 3)
+# START RENDER FUNCTION
+def load_custom_coords_and_colors_file(file_name):
+    """Returns the coordinates and colors of a --CUSTOM_COORDS_AND_COLORS_FILE .npy file, memory-mapped: a (number of coordinates, 5) integer array of rows of x, y, r, g, b (x and y from 1). Raises ValueError if it isn't such an array, or has coordinates off the canvas or colors out of the range 0-255."""
+    try:
+        custom_coords_and_colors = np.load(file_name, mmap_mode='r')
+    except (OSError, ValueError) as e:
+        raise ValueError('Could not load --CUSTOM_COORDS_AND_COLORS_FILE ' + file_name + ': ' + str(e))
+    if custom_coords_and_colors.ndim != 2 or custom_coords_and_colors.shape[1] != 5 or not np.issubdtype(custom_coords_and_colors.dtype, np.integer):
+        raise ValueError('--CUSTOM_COORDS_AND_COLORS_FILE ' + file_name + ' must be a (number of coordinates, 5) integer array; it is a ' + str(custom_coords_and_colors.shape) + ' ' + str(custom_coords_and_colors.dtype) + ' array.')
+    if len(custom_coords_and_colors) == 0:
+        raise ValueError('--CUSTOM_COORDS_AND_COLORS_FILE ' + file_name + ' has no coordinates.')
+    minimums = custom_coords_and_colors.min(axis=0)
+    maximums = custom_coords_and_colors.max(axis=0)
+    if minimums[0] < 1 or minimums[1] < 1 or maximums[0] > full_width or maximums[1] > full_height:
+        raise ValueError('--CUSTOM_COORDS_AND_COLORS_FILE ' + file_name + ' has coordinates off the ' + str(full_width) + 'x' + str(full_height) + ' canvas (x and y count from 1).')
+    if minimums[2:5].min() < 0 or maximums[2:5].max() > 255:
+        raise ValueError('--CUSTOM_COORDS_AND_COLORS_FILE ' + file_name + ' has colors out of the range 0-255.')
+    return custom_coords_and_colors
+
+def load_seed_image():
+    """Returns the --SEED_IMAGE as a uint8 (HEIGHT, WIDTH, 3) RGB array, and a boolean (HEIGHT, WIDTH) array of its pixels which are start coordinates (from --SEED_MASK, or its transparency, and --SEED_STRATIFY). For a preview, the images are scaled down to it. Raises ValueError if the images can't be read or aren't the size of the (full size) canvas."""
+    try:
+        with Image.open(SEED_IMAGE) as image:
+            if image.size != (full_width, full_height):
+                raise ValueError('--SEED_IMAGE ' + SEED_IMAGE + ' is ' + str(image.width) + 'x' + str(image.height) + ', but the canvas is ' + str(full_width) + 'x' + str(full_height) + '; they must be the same size.')
+            has_transparency = 'A' in image.getbands() or 'transparency' in image.info
+            seed_image = image.convert('RGBA' if has_transparency else 'RGB')
+            seed_image_array = np.asarray(seed_image.resize((WIDTH, HEIGHT), Image.BOX) if PREVIEW_SCALE else seed_image)
+        if SEED_MASK:
+            with Image.open(SEED_MASK) as mask_image:
+                if mask_image.size != (full_width, full_height):
+                    raise ValueError('--SEED_MASK ' + SEED_MASK + ' is ' + str(mask_image.width) + 'x' + str(mask_image.height) + ', but --SEED_IMAGE is ' + str(full_width) + 'x' + str(full_height) + '; they must be the same size.')
+                mask_image = mask_image.convert('L')
+                seed_mask = np.asarray(mask_image.resize((WIDTH, HEIGHT), Image.BOX) if PREVIEW_SCALE else mask_image) > 127
+        elif has_transparency:
+            seed_mask = seed_image_array[..., 3] > 127
         else:
-            canvas[coord[0]][coord[1]] = COLOR_MUTATION_BASE
-# If ARGS.CUSTOM_COORDS_AND_COLORS was passed to script, init coords and their colors from it: 
-else:
-    print('--CUSTOM_COORDS_AND_COLORS argument passed to script, so initializing coords and colors from that. NOTE that this overrides --START_COORDS_N, --START_COORDS_RANGE, and --COLOR_MUTATION_BASE if those were provided.')
-    print('\n')
-    for element in CUSTOM_COORDS_AND_COLORS:
-        # SWAPPING those (on CLI they are x,y; here it wants y,x) ;
-        # ALSO, this program kindly allows hoomans to not bother with zero-based indexing, which means 1 for hoomans is 0 for program, so substracting 1 from both values:
-        coord = (element[0][1], element[0][0])
-        # print('without mod:', coord)
-        coord = (element[0][1]-1, element[0][0]-1)
-        # print('with mod:', coord)
-        coord_queue.append(coord)
-        color_values = np.asarray(element[1])       # np.asarray() gets it into same object type as elsewhere done and expected.
-        # print('adding color to canvas:', color_values) MINDING the x,y swap AND to modify the hooman 1-based index here, too! :
-        canvas[ element[0][1]-1 ][ element[0][0]-1 ] = color_values     # LORF! 
-
-report_stats_every_n = 5000
-report_stats_nth_counter = 0
-
-# Render target file name generation; differs in different scenarios:
-# If a preset was loaded, base the render target file name on it.
-if ARGS.LOAD_PRESET:
-    # take trailing .cgp off it:
-    render_target_file_base_name = LOAD_PRESET.rstrip('.cgp')
-else:
-# Otherwise, create render target file name based on time painting began.
-    now = datetime.datetime.now()
-    time_stamp = now.strftime('%Y_%m_%d__%H_%M_%S__')
-    # VESTIGAL CODE; most versions of this script here altered the pseudorandom sequence of --RANDOM_SEED with the following line of code (that makes an rndStr); this had been commented out around v2.3.6 - v2.5.5 (maybe?), which broke with psuedorandom continuity as originally developed in the script. For continuity (and because output seemed randomly better _with_ this code), it is left here;
-    # ALSO NOTE:
-    # in trying to track down this issue some versions of the script had the following line of code before the above if ARGS.LOAD_PRESET; but now I think it _would_ have been here (also git history isn't complete on versions, I think, so I'm speculating); if you can't duplicate the rnd state of a render, you may want to try copying it up there.
-    rndStr = ('%03x' % random.randrange(16**6))
-    render_target_file_base_name = time_stamp + '__' + rndStr + '_colorGrowthPy'
-# Check if render target file with same name (but .png) extension exists. This logic is very slightly risky: if render_target_file_base_name does not exist, I will assume that state image file name and anim frames folder names also do not exist; if I am wrong, those may get overwritten (by other logic in this script).
-target_render_file_exists = os.path.exists(render_target_file_base_name + '.png')
-# If it does not exist, set render target file name to that ( + '.png'). In that case, the following following "while" block will never execute. BUT if it does exist, the following "while" block _will_ execute, and do this: rename the render target file name by appending six rnd hex chars to it plus 'var', e.g. 'var_32ef5f' to file base name, and keep checking and doing that over again until there's no target name conflict:
-cgp_rename_count = 1
-while target_render_file_exists == True:
-    # Returns six random lowercase hex characters:
-    cgp_rename_count += 1; variantNameStr = str(cgp_rename_count)
-    variantNameStr = variantNameStr.zfill(4)
-    tst_str = render_target_file_base_name + '__variant_' + variantNameStr
-    target_render_file_exists = os.path.exists(tst_str + '.png')
-    if cgp_rename_count > 10000:
-        print(
+            seed_mask = np.ones((HEIGHT, WIDTH), dtype=bool)
+    except OSError as e:
+        raise ValueError('Could not read --SEED_IMAGE or --SEED_MASK: ' + str(e))
+    if SEED_STRATIFY:
+        # Give every start coordinate a random key, and keep the one with the lowest key in each SEED_STRATIFY square:
+        ys, xs = np.nonzero(seed_mask)
+        squares = ys // SEED_STRATIFY * ((WIDTH + SEED_STRATIFY - 1) // SEED_STRATIFY) + xs // SEED_STRATIFY
+        keys = np.random.default_rng([RANDOM_SEED, SEED_STRATIFY]).random(len(ys))
+        order = np.lexsort((keys, squares))
+        first_in_square = order[np.unique(squares[order], return_index=True)[1]]
+        seed_mask = np.zeros((HEIGHT, WIDTH), dtype=bool)
+        seed_mask[ys[first_in_square], xs[first_in_square]] = True
+    return np.ascontiguousarray(seed_image_array[..., :3]), seed_mask
+
+def to_preview_coords(ys, xs):
+    """Returns (0-based) y and x coordinates of the full size canvas as those of the same place on the canvas being rendered: the same, unless it is a preview (see --PREVIEW_SCALE). Works on ints or NumPy arrays of them."""
+    return ys * HEIGHT // full_height, xs * WIDTH // full_width
+
+def save_preview_seed():
+    """Saves the preview as painted so far, scaled up to full size, to preview_seed_file_name, as an RGBA PNG in which the allocated coordinates are opaque, and a preset which continues it at full size by growing from that (see --PREVIEW_SEED_AT_PERCENT)."""
+    full_size = (full_width, full_height)
+    # Colors are scaled up with their allocation as weights (premultiplied alpha), so that colors of unallocated coordinates don't bleed into allocated ones:
+    weights = canvas_allocd.astype(np.float32)
+    scaled_weights = np.maximum(np.asarray(Image.fromarray(weights).resize(full_size, Image.BILINEAR)), 1e-6)
+    rgba = np.empty((full_height, full_width, 4), dtype=np.uint8)
+    for channel in range(3):
+        scaled_channel = np.asarray(Image.fromarray(canvas[..., channel] * np.float32(1 / canvas_color_scale) * weights).resize(full_size, Image.BILINEAR)) / scaled_weights
+        rgba[..., channel] = np.clip(np.rint(scaled_channel), 0, 255)
+    rgba[..., 3] = np.asarray(Image.fromarray(canvas_allocd).resize(full_size, Image.NEAREST)) * 255
+    Image.fromarray(rgba, 'RGBA').save(preview_seed_file_name)
+    # The switches of the previewed render, but growing from that image:
+    upscale_config = dataclasses.replace(preview_full_size_config, CUSTOM_COORDS_AND_COLORS=None, CUSTOM_COORDS_AND_COLORS_FILE=None, SEED_IMAGE=preview_seed_file_name, SEED_MASK=None, SEED_STRATIFY=None, PREVIEW_SCALE=None, PREVIEW_SEED_AT_PERCENT=None)
+    save_preset(preview_upscale_preset_file_name, upscale_config.to_switches_str())
+    print('Saved preview seed', preview_seed_file_name, 'at', painted_coordinates, 'painted coordinates. To continue the preview at full size, run:')
+    print(shlex.join(['python', sys.argv[0] if sys.argv[0].endswith('color_growth.py') else 'color_growth.py', '--LOAD_PRESET', preview_upscale_preset_file_name]))
+
+def render(config, frame_callback=None):
+    """Renders an image with config (a ColorGrowthConfig), and returns it as a uint8 (HEIGHT, WIDTH, 3) RGB array (memory-mapped, with config.MEMMAP_FOLDER). Does everything running this script does: saves the image (and any preset, animation frames and checkpoints, as configured) to files in the current directory named config.RENDER_NAME, or after the preset (config.LOAD_PRESET) or the date and time. If frame_callback is given, it is called with every animation frame (a uint8 RGB array) and its frame number as it is rendered (see --SAVE_EVERY_N); with config.ANIM_OUTPUT 'none', frames only go to frame_callback. Renders may be done one after another in the same process; the functions of this script work on the render in module globals, so only one render at a time may be done."""
+    # The functions of this script get everything about the render from these globals:
+    global WIDTH, HEIGHT, RSHIFT, BG_COLOR, COLOR_MUTATION_BASE, BORDER_BLEND, TILEABLE, GROWTH_ENGINE, TILE_SIZE, TILED_WORKERS, STOP_AT_PERCENT, SAVE_EVERY_N, FRAME_WRITER_THREADS, ANIM_OUTPUT, ANIM_FRAME_RATE, FFMPEG_ARGS, RAMP_UP_SAVE_EVERY_N, SAVE_PAINT_LOG, RANDOM_SEED, RNG_STREAM_VERSION, START_COORDS_N, START_COORDS_RANGE, CUSTOM_COORDS_AND_COLORS, CUSTOM_COORDS_AND_COLORS_FILE, SEED_IMAGE, SEED_MASK, SEED_STRATIFY, GROWTH_CLIP, RECLAIM_ORPHANS, SAVE_PRESET, CHECKPOINT_EVERY_N, RESUME, PREVIEW_SCALE, PREVIEW_SEED_AT_PERCENT, MEMMAP_FOLDER, IMAGE_FORMAT, LOAD_PRESET, RENDER_NAME
+    global SCRIPT_ARGS_STR, profiler, allPixelsN, stopRenderAtPixelsN, saveFramesAtCoordsPaintedArray, saveFramesAtCoordsPaintedArrayIDX, saveFramesAtCoordsPaintedArrayMaxIDX, animationFrameCounter, renderedFrameCounter, saveNextFrameNumber, imageFrameFileName, padFileNameNumbersDigitsWidth, render_frame_callback
+    global canvas, canvas_allocd, canvas_color_scale, n_tile_rows, n_tile_cols, coord_queue, rng, report_stats_every_n, report_stats_nth_counter, checkpoint_folder_name, checkpoint_frames_written, anim_frames_folder_name, frame_writer
+    global painted_coordinates, potential_orphan_coords_two, potential_orphan_flat_coords, orphans_to_reclaim_n, coords_painted_since_reclaim, newly_painted_coords, next_checkpoint_at, tile_rngs
+    global full_width, full_height, preview_full_size_config, preview_seed_file_name, preview_upscale_preset_file_name, changed_coords, frame_changed_coords, paint_log_writer, image_buffer
+    print('Initializing render script..')
+    import_render_modules()
+    for field in dataclasses.fields(config):
+        globals()[field.name] = getattr(config, field.name)
+    render_frame_callback = frame_callback
+    profiler = RenderProfiler() if PROFILE else None
+
+    if RANDOM_SEED is None:
+        RANDOM_SEED = random.randint(0, 4294967296)
+    # Use that seed straightway:
+    random.seed(RANDOM_SEED)
+    np.random.seed(RANDOM_SEED)
+    # If there is no --START_COORDS_N, choose it at random *after* seeding, so the same seed always gives the same number of start coordinates:
+    if START_COORDS_N is None and not config.has_custom_coords():
+        START_COORDS_N = random.randint(START_COORDS_RANGE[0], START_COORDS_RANGE[1])
+        print('Using', START_COORDS_N, 'start coordinates, by random selection from range ' + str(START_COORDS_RANGE))
+    # NOTE: VESTIGAL CODE HERE that will alter pseudorandom determinism if commented vs. not commented out; if render from a preset doesn't produce the same result as it once did, try uncommenting the next line! :
+        # zax_blor = ('%03x' % random.randrange(16**6))
+    # The switches which make this render (saved to any preset, and to checkpoints to check that a render resumed from them is the same):
+    SCRIPT_ARGS_STR = dataclasses.replace(config, RANDOM_SEED=RANDOM_SEED, START_COORDS_N=START_COORDS_N).to_switches_str()
+    # The size of the render, which a preview is a smaller version of:
+    full_width, full_height = WIDTH, HEIGHT
+    # A preview renders the same switches on a smaller canvas, with mutation scaled so that it looks like the full size render (see --PREVIEW_SCALE):
+    if PREVIEW_SCALE:
+        preview_full_size_config = dataclasses.replace(config, RANDOM_SEED=RANDOM_SEED, START_COORDS_N=START_COORDS_N)
+        WIDTH = max(1, round(WIDTH * PREVIEW_SCALE))
+        HEIGHT = max(1, round(HEIGHT * PREVIEW_SCALE))
+        RSHIFT = round(RSHIFT / PREVIEW_SCALE ** 0.5)
+        if SEED_STRATIFY:
+            SEED_STRATIFY = max(1, round(SEED_STRATIFY * PREVIEW_SCALE))
+        if START_COORDS_N:
+            START_COORDS_N = min(START_COORDS_N, WIDTH * HEIGHT)
+        SAVE_EVERY_N = 0
+        SAVE_PAINT_LOG = False
+        RESUME = False
+        print('Rendering a ' + str(WIDTH) + 'x' + str(HEIGHT) + ' preview of the ' + str(full_width) + 'x' + str(full_height) + ' render, with --RSHIFT', RSHIFT)
+
+    allPixelsN = WIDTH * HEIGHT
+    stopRenderAtPixelsN = int(allPixelsN * STOP_AT_PERCENT)
+    # A preview saves no checkpoints; it saves its seed to continue from at full size at the point it would save a checkpoint (see save_checkpoint):
+    if PREVIEW_SCALE:
+        CHECKPOINT_EVERY_N = max(1, int(allPixelsN * PREVIEW_SEED_AT_PERCENT)) if PREVIEW_SEED_AT_PERCENT else 0
+    saveFramesAtCoordsPaintedArray = get_frame_schedule(SAVE_EVERY_N, RAMP_UP_SAVE_EVERY_N, WIDTH, HEIGHT, stopRenderAtPixelsN)
+    # Values of these used elsewhere:
+    saveFramesAtCoordsPaintedArrayIDX = 0
+    saveFramesAtCoordsPaintedArrayMaxIDX = (len(saveFramesAtCoordsPaintedArray) - 1)
+    animationFrameCounter = 0
+    renderedFrameCounter = 0
+    saveNextFrameNumber = 0
+    imageFrameFileName = ''
+    padFileNameNumbersDigitsWidth = 0
+
+    # The "canvas:" one contiguous array of RGB values (float32, as mutation works in half steps, or with --CANVAS_DTYPE int16, integers in half steps), indexed [y, x]:
+    canvas_color_scale = 2 if CANVAS_DTYPE == 'int16' else 1
+    canvas = np.zeros((HEIGHT, WIDTH, 3), dtype=CANVAS_DTYPE)
+    # Which coordinates have a color (are allocated); values in canvas where this is False are meaningless:
+    canvas_allocd = np.zeros((HEIGHT, WIDTH), dtype=bool)
+    # For canvases too big for memory, both are memory-mapped files instead; the tiled engine's worker processes share their mapping:
+    if MEMMAP_FOLDER:
+        canvas = make_memmap(canvas.shape, canvas.dtype)
+        canvas_allocd = make_memmap(canvas_allocd.shape, canvas_allocd.dtype)
+    # The tiled engine's worker processes paint the canvas in place, so for it both are in shared memory:
+    elif GROWTH_ENGINE == 'tiled':
+        canvas_shm = shared_memory.SharedMemory(create=True, size=canvas.nbytes)
+        canvas_allocd_shm = shared_memory.SharedMemory(create=True, size=canvas_allocd.nbytes)
+        # Workers are forked with the memory already mapped, so nothing needs to find it by name; unlinking it now means it is freed when the render ends, even if it is killed:
+        canvas_shm.unlink()
+        canvas_allocd_shm.unlink()
+        canvas = np.ndarray(canvas.shape, dtype=canvas.dtype, buffer=canvas_shm.buf)
+        canvas_allocd = np.ndarray(canvas_allocd.shape, dtype=canvas_allocd.dtype, buffer=canvas_allocd_shm.buf)
+        canvas[...] = 0
+        canvas_allocd[...] = False
+    if GROWTH_ENGINE == 'tiled':
+        n_tile_rows = get_tile_count(HEIGHT)
+        n_tile_cols = get_tile_count(WIDTH)
+
+    # The coordinates to grow from (see Frontier):
+    coord_queue = Frontier(HEIGHT * WIDTH)
+    # For animation frames and the paint log, collect the coordinates which change between frames (or steps):
+    changed_coords = ChangedCoords() if SAVE_PAINT_LOG or SAVE_EVERY_N != 0 else None
+    coord_queue.changed = changed_coords
+    frame_changed_coords = None
+    if SAVE_EVERY_N != 0:
+        frame_changed_coords = ChangedCoords() if SAVE_PAINT_LOG else changed_coords
+
+    # The random number stream for the rest of the render (see --RNG_STREAM_VERSION):
+    rng = RNGStream(RANDOM_SEED, RNG_STREAM_VERSION, RSHIFT, GROWTH_CLIP, canvas_color_scale == 2)
+
+    # If CUSTOM_COORDS_AND_COLORS_FILE was given, init coords and their colors from it:
+    if CUSTOM_COORDS_AND_COLORS_FILE:
+        print('--CUSTOM_COORDS_AND_COLORS_FILE argument passed to script, so initializing coords and colors from', CUSTOM_COORDS_AND_COLORS_FILE, '. NOTE that this overrides --START_COORDS_N, --START_COORDS_RANGE, and --COLOR_MUTATION_BASE if those were provided.')
+        custom_coords_and_colors = load_custom_coords_and_colors_file(CUSTOM_COORDS_AND_COLORS_FILE)
+        # As for --CUSTOM_COORDS_AND_COLORS, rows are 1-based x, y; pushed in order, so that (like pushing them one at a time) only the first of any repeated coordinate is grown from, and the last color of it is used:
+        ys, xs = to_preview_coords(custom_coords_and_colors[:, 1].astype(np.intp) - 1, custom_coords_and_colors[:, 0].astype(np.intp) - 1)
+        coord_queue.push_batch(ys * WIDTH + xs)
+        canvas[ys, xs] = to_canvas_colors(custom_coords_and_colors[:, 2:5])
+        canvas_allocd[ys, xs] = True
+    # If SEED_IMAGE was given, init coords and their colors from (pixels of) it:
+    elif SEED_IMAGE:
+        print('--SEED_IMAGE argument passed to script, so initializing coords and colors from', SEED_IMAGE, '. NOTE that this overrides --START_COORDS_N, --START_COORDS_RANGE, and --COLOR_MUTATION_BASE if those were provided.')
+        seed_image_array, seed_mask = load_seed_image()
+        # In row by row order:
+        flat_coords = np.flatnonzero(seed_mask)
+        coord_queue.push_batch(flat_coords)
+        canvas.reshape(-1, 3)[flat_coords] = to_canvas_colors(seed_image_array.reshape(-1, 3)[flat_coords])
+        canvas_allocd.reshape(-1)[flat_coords] = True
+        print('Seeded', len(flat_coords), 'start coordinates from', SEED_IMAGE)
+        if len(flat_coords) == allPixelsN:
+            print('NOTE: every coordinate of the canvas is a start coordinate, which leaves nothing to grow. Pass --SEED_MASK, or --SEED_STRATIFY, or use a --SEED_IMAGE with transparency.')
+    # If CUSTOM_COORDS_AND_COLORS was not given, initialize start coords by random selection; structure of coords is (y,x)
+    elif not CUSTOM_COORDS_AND_COLORS:
+        print('no --CUSTOM_COORDS_AND_COLORS argument passed to script, so initializing coordinate locations randomly . . .')
+        RNDcoord = rng.start_coords(START_COORDS_N)
+        for coord in RNDcoord:
+            coord_queue.push(coord[0] * WIDTH + coord[1])
+            canvas_allocd[coord[0], coord[1]] = True
+            if COLOR_MUTATION_BASE == "random":
+                canvas[coord[0], coord[1]] = to_canvas_colors(rng.color())
+            else:
+                canvas[coord[0], coord[1]] = to_canvas_colors(COLOR_MUTATION_BASE)
+    # If CUSTOM_COORDS_AND_COLORS was given, init coords and their colors from it:
+    else:
+        print('--CUSTOM_COORDS_AND_COLORS argument passed to script, so initializing coords and colors from that. NOTE that this overrides --START_COORDS_N, --START_COORDS_RANGE, and --COLOR_MUTATION_BASE if those were provided.')
+        print('\n')
+        for element in CUSTOM_COORDS_AND_COLORS:
+            # SWAPPING those (on CLI they are x,y; here it wants y,x) ;
+            # ALSO, this program kindly allows hoomans to not bother with zero-based indexing, which means 1 for hoomans is 0 for program, so substracting 1 from both values:
+            coord = (element[0][1], element[0][0])
+            # print('without mod:', coord)
+            # (and for a preview, scaled to its canvas:)
+            coord = to_preview_coords(element[0][1]-1, element[0][0]-1)
+            # print('with mod:', coord)
+            coord_queue.push(coord[0] * WIDTH + coord[1])
+            color_values = np.asarray(element[1])       # np.asarray() gets it into same object type as elsewhere done and expected.
+            # print('adding color to canvas:', color_values) MINDING the x,y swap AND to modify the hooman 1-based index here, too! :
+            canvas[ coord[0], coord[1] ] = to_canvas_colors(color_values)     # LORF! 
+            canvas_allocd[ coord[0], coord[1] ] = True
+
+    report_stats_every_n = 5000
+    report_stats_nth_counter = 0
+
+    # Render target file name generation; differs in different scenarios:
+    # If a preset was loaded, base the render target file name on it.
+    if LOAD_PRESET:
+        # take the .cgp extension off it (rstrip('.cgp') would also take any trailing ., c, g and p characters off the preset name, e.g. stamp.cgp to stam):
+        render_target_file_base_name = os.path.splitext(LOAD_PRESET)[0]
+    else:
+    # Otherwise, create render target file name based on time painting began.
+        now = datetime.datetime.now()
+        time_stamp = now.strftime('%Y_%m_%d__%H_%M_%S__')
+        # VESTIGAL CODE; most versions of this script here altered the pseudorandom sequence of --RANDOM_SEED with the following line of code (that makes an rndStr); this had been commented out around v2.3.6 - v2.5.5 (maybe?), which broke with psuedorandom continuity as originally developed in the script. For continuity (and because output seemed randomly better _with_ this code), it is left here;
+        # ALSO NOTE:
+        # in trying to track down this issue some versions of the script had the following line of code before the above if LOAD_PRESET; but now I think it _would_ have been here (also git history isn't complete on versions, I think, so I'm speculating); if you can't duplicate the rnd state of a render, you may want to try copying it up there.
+        rndStr = ('%03x' % random.randrange(16**6))
+        render_target_file_base_name = time_stamp + '__' + rndStr + '_colorGrowthPy'
+    # A name given with RENDER_NAME is used instead (after the above, so that it doesn't change the pseudorandom sequence):
+    if RENDER_NAME:
+        render_target_file_base_name = RENDER_NAME
+    if PREVIEW_SCALE:
+        render_target_file_base_name += '__preview'
+    # Check if render target file with same name (but .png) extension exists. This logic is very slightly risky: if render_target_file_base_name does not exist, I will assume that state image file name and anim frames folder names also do not exist; if I am wrong, those may get overwritten (by other logic in this script).
+    image_file_extension = '.tif' if IMAGE_FORMAT == 'tiff' else '.png'
+    target_render_file_exists = os.path.exists(render_target_file_base_name + image_file_extension)
+    # If it does not exist, set render target file name to that ( + '.png', or '.tif'). In that case, the following following "while" block will never execute. BUT if it does exist, the following "while" block _will_ execute, and do this: rename the render target file name by appending six rnd hex chars to it plus 'var', e.g. 'var_32ef5f' to file base name, and keep checking and doing that over again until there's no target name conflict:
+    cgp_rename_count = 1
+    while target_render_file_exists == True:
+        # Returns six random lowercase hex characters:
+        cgp_rename_count += 1; variantNameStr = str(cgp_rename_count)
+        variantNameStr = variantNameStr.zfill(4)
+        tst_str = render_target_file_base_name + '__variant_' + variantNameStr
+        target_render_file_exists = os.path.exists(tst_str + image_file_extension)
+        if cgp_rename_count > 10000:
+            raise FileExistsError(
 "Encountered 10,000 naming collisions making new render target file \
 names. Please make a copy of and rename the source .cgp file before \
-continuning, Sparkles McSparkly. Exiting."
-        )
-        sys.exit(1)
-    if target_render_file_exists == False:
-        render_target_file_base_name = tst_str
-render_target_file_name = render_target_file_base_name + '.png'
-anim_frames_folder_name = render_target_file_base_name + '_frames'
-print('\nrender_target_file_name: ', render_target_file_name)
-print('anim_frames_folder_name: ', anim_frames_folder_name)
-
-
-# If SAVE_EVERY_N has a value greater than zero, create a subfolder to write frames to; Also, initialize a variable which is how many zeros to pad animation save frame file (numbers) to, based on how many frames will be rendered:
-if SAVE_EVERY_N > 0:
-    padFileNameNumbersDigitsWidth = len(str(stopRenderAtPixelsN))
-    # Only create the anim frames folder if it does not exist:
-    if os.path.exists(anim_frames_folder_name) == False:
-        os.mkdir(anim_frames_folder_name)
-
-# If bool set saying so, save arguments to this script to a .cgp file with the target render base file name:
-if SAVE_PRESET:
-    # strip the --LOAD_PRESET parameter and value from SCRIPT_ARGS_STR before writing it to preset file (and save it in a new variable), as it would be redundant (and, if the parameters are based on loading another preset and overriding some parameters, it would moreover be wrong) :
-    SCRIPT_ARGS_WRITE_STR = re.sub('--LOAD_PRESET [^ ]*', r'', SCRIPT_ARGS_STR)
-    file = open(render_target_file_base_name + '.cgp', "w")
-    file.write(SCRIPT_ARGS_WRITE_STR + '\n\n')
-    if ARGS.LOAD_PRESET:
-        file.write('# Derived of preset: ' + LOAD_PRESET + '\n')
-    file.write('# Created with color_growth.py ' + ColorGrowthPyVersionString + '\n')
-    file.write('# Python version: ' + sys.version + '\n')
-    file.write('# Platform: ' + platform.platform() + '\n')
-    file.close()
-
-# ----
-# START IMAGE MAPPING
-painted_coordinates = 0
-# With higher VISCOSITY some coordinates can be painted around (by other coordinates on all sides) but coordinate mutation never actually moves into that coordinate. The result is that some coordinates may never be "born." this set and associated code revives orphan coordinates:
-potential_orphan_coords_two = set()
-# used to reclaim orphan coordinates every N iterations through the `while allocd_coords` loop:
-base_orphan_reclaim_multiplier = 0.015
-orphans_to_reclaim_n = 0
-coords_painted_since_reclaim = 0
-# These next two variables are used to ramp up orphan coordinate reclamation rate as the render proceeds:
-print('Generating image . . . ')
-newly_painted_coords = 0        # This is reset at every call of print_progress()
-
-continue_painting = True
-
-while coord_queue:
-    if continue_painting == False:
-        break
-    while coord_queue:
-        index = np.random.randint(0, len(coord_queue))
-        y, x = coord_queue[index]
-        if index == len(coord_queue) - 1:
-            coord_queue.pop()
+continuning, Sparkles McSparkly."
+            )
+        if target_render_file_exists == False:
+            render_target_file_base_name = tst_str
+    render_target_file_name = render_target_file_base_name + image_file_extension
+    checkpoint_folder_name = render_target_file_base_name + '_checkpoint'
+    preview_seed_file_name = render_target_file_base_name + '_upscale_seed.png'
+    preview_upscale_preset_file_name = render_target_file_base_name + '_upscale.cgp'
+    # Load the state to resume from, if any:
+    resume_state = None
+    # How many animation frames are known to be completely written (all of them, unless resuming):
+    checkpoint_frames_written = float('inf')
+    if RESUME:
+        if os.path.exists(checkpoint_folder_name):
+            print('Resuming render from checkpoint', checkpoint_folder_name, '. . .')
+            with open(checkpoint_folder_name + '/state.pickle', 'rb') as f:
+                resume_state = CheckpointUnpickler(f).load()
+            if resume_state['SCRIPT_ARGS_STR'] != SCRIPT_ARGS_STR:
+                raise ValueError('The checkpoint was made with different switches than these; to resume, use the same switches as the interrupted render. Switches of the checkpoint:\n' + resume_state['SCRIPT_ARGS_STR'])
+            checkpoint_frames_written = resume_state['renderedFrameCounter']
+        else:
+            print('--RESUME is True, but there is no checkpoint', checkpoint_folder_name, 'to resume from; starting render from the beginning.')
+    anim_frames_folder_name = render_target_file_base_name + '_frames'
+    anim_video_file_name = render_target_file_base_name + {'ffmpeg': '.mp4', 'delta': '.cgd'}.get(ANIM_OUTPUT, '.rgb')
+    if resume_state and ANIM_OUTPUT == 'ffmpeg':
+        # A finished video can't be appended to, so resumed video goes to a new file:
+        anim_video_file_name = render_target_file_base_name + '__from_frame_' + str(resume_state['renderedFrameCounter'] + 1) + '.mp4'
+    print('\nrender_target_file_name: ', render_target_file_name)
+    if ANIM_OUTPUT == 'png':
+        print('anim_frames_folder_name: ', anim_frames_folder_name)
+    elif ANIM_OUTPUT != 'none':
+        print('anim_video_file_name: ', anim_video_file_name)
+
+
+    # If SAVE_EVERY_N has a value greater than zero, create a subfolder to write frames to (or the video stream to write them to); Also, initialize a variable which is how many zeros to pad animation save frame file (numbers) to, based on how many frames will be rendered:
+    if SAVE_EVERY_N > 0 and ANIM_OUTPUT == 'ffmpeg':
+        frame_writer = FFmpegFrameWriter(anim_video_file_name, ANIM_FRAME_RATE, FFMPEG_ARGS)
+    elif SAVE_EVERY_N > 0 and ANIM_OUTPUT == 'raw':
+        frame_writer = RawFrameWriter(anim_video_file_name, resume_state['renderedFrameCounter'] if resume_state else 0)
+    elif SAVE_EVERY_N > 0 and ANIM_OUTPUT == 'delta':
+        frame_writer = DeltaFrameWriter(anim_video_file_name, resume_state['renderedFrameCounter'] if resume_state else 0)
+    else:
+        if SAVE_EVERY_N > 0 and ANIM_OUTPUT == 'png':
+            padFileNameNumbersDigitsWidth = get_frame_number_digits(stopRenderAtPixelsN)
+            # Only create the anim frames folder if it does not exist:
+            if os.path.exists(anim_frames_folder_name) == False:
+                os.mkdir(anim_frames_folder_name)
+        frame_writer = FrameWriter(FRAME_WRITER_THREADS if SAVE_EVERY_N > 0 and ANIM_OUTPUT == 'png' else 0)
+    # Animation frames are made from this, which only the coordinates that change between them are converted to (see update_image_buffer):
+    image_buffer = None
+    if SAVE_EVERY_N != 0:
+        image_buffer = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+        image_buffer[...] = np.asarray(BG_COLOR, dtype=canvas.dtype).astype(np.uint8)
+    paint_log_file_name = render_target_file_base_name + '.cgl'
+    paint_log_writer = PaintLogWriter(paint_log_file_name, resume_state.get('paint_log_steps_n', 0) if resume_state else 0) if SAVE_PAINT_LOG else None
+    if paint_log_writer:
+        print('paint_log_file_name: ', paint_log_file_name)
+
+    # If bool set saying so, save arguments to this script to a .cgp file with the target render base file name:
+    if SAVE_PRESET:
+        save_preset(render_target_file_base_name + '.cgp', SCRIPT_ARGS_STR)
+
+    # ----
+    # START IMAGE MAPPING
+    painted_coordinates = 0
+    # With higher VISCOSITY some coordinates can be painted around (by other coordinates on all sides) but coordinate mutation never actually moves into that coordinate. The result is that some coordinates may never be "born." this set (of flat canvas indices) and associated code revives orphan coordinates:
+    potential_orphan_coords_two = set()
+    # The batched engine's equivalent, a list of arrays of flat canvas indices:
+    potential_orphan_flat_coords = []
+    orphans_to_reclaim_n = 0
+    coords_painted_since_reclaim = 0
+    print('Generating image . . . ')
+    newly_painted_coords = 0        # This is reset at every call of print_progress()
+    next_checkpoint_at = CHECKPOINT_EVERY_N
+    # The tiled engine's random number streams, by tile ID (created by grow_tiled, unless resuming):
+    tile_rngs = None
+
+    # Restore everything from a checkpoint, if resuming:
+    if resume_state:
+        canvas[...] = np.load(checkpoint_folder_name + '/canvas.npy', mmap_mode='r')
+        canvas_allocd[...] = np.load(checkpoint_folder_name + '/canvas_allocd.npy', mmap_mode='r')
+        # Forget the start coordinates pushed above (the checkpoint's canvas replaces them):
+        if changed_coords:
+            changed_coords.take()
+        coord_queue = Frontier(HEIGHT * WIDTH)
+        # Coordinates in the queue changed when they were pushed, before the checkpoint, so pushing them again doesn't change them:
+        coord_queue.push_batch(np.load(checkpoint_folder_name + '/coord_queue.npy'))
+        coord_queue.changed = changed_coords
+        if changed_coords:
+            changed_coords.add_batch(np.load(checkpoint_folder_name + '/changed_coords.npy').astype(np.intp))
+        if frame_changed_coords and frame_changed_coords is not changed_coords:
+            frame_changed_coords.add_batch(np.load(checkpoint_folder_name + '/frame_changed_coords.npy').astype(np.intp))
+        if image_buffer is not None:
+            # The last animation frame is the canvas but for the coordinates changed since, which the next one converts (and the next delta frame records):
+            for rows in get_image_strips(HEIGHT, WIDTH):
+                image_buffer[rows] = canvas_to_image_array(rows)
+        painted_coordinates = resume_state['painted_coordinates']
+        newly_painted_coords = resume_state['newly_painted_coords']
+        coords_painted_since_reclaim = resume_state['coords_painted_since_reclaim']
+        orphans_to_reclaim_n = resume_state['orphans_to_reclaim_n']
+        report_stats_nth_counter = resume_state['report_stats_nth_counter']
+        animationFrameCounter = resume_state['animationFrameCounter']
+        renderedFrameCounter = resume_state['renderedFrameCounter']
+        saveNextFrameNumber = resume_state['saveNextFrameNumber']
+        saveFramesAtCoordsPaintedArrayIDX = resume_state['saveFramesAtCoordsPaintedArrayIDX']
+        tile_rngs = resume_state['tile_rngs']
+        orphan_candidates = np.load(checkpoint_folder_name + '/orphan_candidates.npy')
+        if GROWTH_ENGINE in ('batched', 'tiled'):
+            potential_orphan_flat_coords.append(orphan_candidates.astype(np.intp))
+        else:
+            potential_orphan_coords_two.update(orphan_candidates.tolist())
+        rng = resume_state['rng']
+        if rng.version == 0:
+            random.setstate(resume_state['random_state'])
+            np.random.set_state(resume_state['np_random_state'])
+        if CHECKPOINT_EVERY_N:
+            next_checkpoint_at = (painted_coordinates // CHECKPOINT_EVERY_N + 1) * CHECKPOINT_EVERY_N
+        print('Resumed at', painted_coordinates, 'painted coordinates.')
+
+    if GROWTH_ENGINE == 'classic':
+        init_neighbor_tables()
+    if profiler:
+        profiler.lap('setup')
+        profiler.sample(len(coord_queue))
+
+    if GROWTH_ENGINE == 'batched':
+        grow_batched()
+    elif GROWTH_ENGINE == 'tiled':
+        grow_tiled()
+    else:
+        continue_painting = True
+
+        while coord_queue:
+            if continue_painting == False:
+                break
+            while coord_queue:
+                flat_coord = coord_queue.pop_random()
+                y, x = divmod(flat_coord, WIDTH)
+
+                # Mutate color--! and write it back to the canvas:
+                mutate_color(canvas[y, x], rng.mutation())
+                # print('Colored coordinate (y, x)', coord)
+                new_allocd_coords_color = canvas[y, x]
+                painted_coordinates += 1
+                newly_painted_coords += 1
+                coords_painted_since_reclaim += 1
+                if profiler:
+                    profiler.lap('mutation')
+                # The first returned set is used straightway, the second optionally shuffles into the first after the first is depleted:
+                rnd_new_coords_set, potential_orphan_coords_one = get_rnd_unallocd_neighbors(flat_coord)
+                potential_orphan_coords_two.update(potential_orphan_coords_one)
+                for new_flat_coord in rnd_new_coords_set:
+                    coord_queue.push(new_flat_coord)
+                    allocate(new_flat_coord)
+                    new_y, new_x = divmod(new_flat_coord, WIDTH)
+                    if profiler:
+                        profiler.lap('neighbor selection')
+                    if BORDER_BLEND and is_coord_in_bounds(2*new_y-y, 2*new_x-x) and is_color_valid(2*new_y-y, 2*new_x-x):
+                        canvas[new_y, new_x] = blend_colors(new_allocd_coords_color, canvas[2*new_y-y, 2*new_x-x])
+                    else:
+                        canvas[new_y, new_x] = new_allocd_coords_color
+                    if profiler:
+                        profiler.lap('border blend')
+                if profiler:
+                    profiler.lap('neighbor selection')
+                if paint_log_writer:
+                    save_paint_log_step()
+                # Save an animation frame (function only does if SAVE_EVERY_N True):
+                save_animation_frame()
+                if profiler:
+                    profiler.lap('frame encode')
+            
+                # Print progress:
+                if report_stats_nth_counter == 0 or report_stats_nth_counter == report_stats_every_n:
+                    print_progress(newly_painted_coords)
+                    newly_painted_coords = 0
+                    report_stats_nth_counter = 0
+                    if profiler:
+                        profiler.sample(len(coord_queue))
+                report_stats_nth_counter += 1
+            
+                # Terminate all coordinate and color mutation at an arbitary number of mutations:
+                if painted_coordinates > stopRenderAtPixelsN:
+                    print('Painted coordinate termination count', painted_coordinates, 'exceeded. Ending paint algorithm.')
+                    continue_painting = False
+                    break
+                if profiler:
+                    profiler.lap('other')
+
+                if CHECKPOINT_EVERY_N and painted_coordinates >= next_checkpoint_at:
+                    save_checkpoint()
+                    if profiler:
+                        profiler.lap('checkpoint')
+            
+            if RECLAIM_ORPHANS:
+                reclaim_orphans()
+                if profiler:
+                    profiler.lap('orphan reclaim')
+    # END IMAGE MAPPING
+    # ----
+
+    # The last step, with any coordinates painted after the last check for animation frames (e.g. orphans reclaimed at the end):
+    if paint_log_writer:
+        save_paint_log_step()
+        paint_log_writer.close()
+    # Works around problem that this setup can (always does?) save everything _except_ for a last frame with every coordinate painted if painted_coordinates >= stopRenderAtPixelsN and STOP_AT_PERCENT == 1; is there a better-engineered way to fix this problem? But this works:
+    if SAVE_EVERY_N != 0:
+        set_img_frame_file_name()
+        flat_coords, colors = update_image_buffer()
+        if isinstance(frame_writer, DeltaFrameWriter):
+            frame_writer.write_changes(flat_coords, colors)
+        if ANIM_OUTPUT not in ('none', 'delta') or render_frame_callback:
+            image_array = image_buffer.copy()
+            if ANIM_OUTPUT not in ('none', 'delta'):
+                frame_writer.write(image_array, imageFrameFileName)
+            if render_frame_callback:
+                render_frame_callback(image_array, renderedFrameCounter)
+        print('Waiting for animation frames to finish writing . . .')
+    frame_writer.close()
+    if profiler:
+        profiler.lap('frame encode')
+    if SAVE_EVERY_N != 0 and ANIM_OUTPUT == 'raw':
+        print('Raw animation stream saved. To encode it to video, run:')
+        print(shlex.join(['ffmpeg', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', str(WIDTH) + 'x' + str(HEIGHT), '-framerate', str(ANIM_FRAME_RATE), '-i', anim_video_file_name] + shlex.split(FFMPEG_ARGS) + [render_target_file_base_name + '.mp4']))
+    if isinstance(frame_writer, DeltaFrameWriter):
+        print('Delta frames saved. To make png frames of them, run:')
+        # (--STOP_AT_PERCENT only sets how many digits frame numbers have, as here:)
+        print(shlex.join(['python', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'color_growth_delta_frames.py'), '--DELTA_FILE', anim_video_file_name] + (['--STOP_AT_PERCENT', str(STOP_AT_PERCENT)] if STOP_AT_PERCENT != 1 else [])))
+    if paint_log_writer:
+        # The frame schedule of this render, or if it has none, one of 300 frames:
+        frame_schedule_args = ['--SAVE_EVERY_N', str(SAVE_EVERY_N), '--RAMP_UP_SAVE_EVERY_N', str(RAMP_UP_SAVE_EVERY_N), '--STOP_AT_PERCENT', str(STOP_AT_PERCENT)] if SAVE_EVERY_N > 0 else ['--FRAMES_N', '300']
+        print('Paint log saved. To make animation frames of it, run (with any other frame schedule):')
+        print(shlex.join(['python', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'color_growth_paint_log_frames.py'), '--PAINT_LOG', paint_log_file_name] + frame_schedule_args))
+
+    # If the preview ended before painting PREVIEW_SEED_AT_PERCENT of the canvas, save its seed as it ended:
+    if PREVIEW_SEED_AT_PERCENT and next_checkpoint_at != float('inf'):
+        save_preview_seed()
+
+    # Save final image file:
+    print('Saving image ', render_target_file_name, ' . . .')
+    if MEMMAP_FOLDER:
+        # Never all in memory at once: the image is a memory-mapped file too, made and saved strip by strip:
+        image_array = make_memmap((HEIGHT, WIDTH, 3), np.uint8)
+        for rows in get_image_strips(HEIGHT, WIDTH):
+            image_array[rows] = canvas_to_image_array(rows)
+        save_image_in_strips(image_array, render_target_file_name)
+    else:
+        # The last animation frame is of the finished canvas:
+        image_array = image_buffer if image_buffer is not None else canvas_to_image_array()
+        if IMAGE_FORMAT == 'tiff':
+            save_image_in_strips(image_array, render_target_file_name)
         else:
-            coord_queue[index] = coord_queue.pop()
-
-        # Mutate color--! and assign it to the color variable (list) in the Coordinate object:
-        canvas[y][x] = canvas[y][x] + np.random.randint(-RSHIFT, RSHIFT + 1, size=3) / 2
-        # print('Colored coordinate (y, x)', coord)
-        new_allocd_coords_color = canvas[y][x] = np.clip(canvas[y][x], 0, 255)
-        painted_coordinates += 1
-        newly_painted_coords += 1
-        coords_painted_since_reclaim += 1
-        # The first returned set is used straightway, the second optionally shuffles into the first after the first is depleted:
-        rnd_new_coords_set, potential_orphan_coords_one = get_rnd_unallocd_neighbors(y, x, canvas)
-        for new_y, new_x in rnd_new_coords_set:
-            coord_queue.append((new_y, new_x))
-            if BORDER_BLEND and is_coord_in_bounds(2*new_y-y, 2*new_x-x) and is_color_valid(2*new_y-y, 2*new_x-x, canvas):
-                canvas[new_y][new_x] = (np.array(new_allocd_coords_color) + np.array(canvas[2*new_y-y][2*new_x-x])) / 2
+            Image.fromarray(image_array).save(render_target_file_name)
+    print('Render complete and image saved.')
+    if profiler:
+        profiler.lap('image save')
+        profiler.sample(len(coord_queue) if GROWTH_ENGINE != 'tiled' else 0)
+        print('Saved profile', profiler.write(render_target_file_base_name, PROFILE))
+    # The render is done, so its checkpoint is no longer needed:
+    if os.path.exists(checkpoint_folder_name):
+        shutil.rmtree(checkpoint_folder_name)
+    if MEMMAP_FOLDER:
+        # Free the disk space of the memory-mapped files (but the image's, which is returned):
+        canvas = canvas_allocd = coord_queue = None
+    elif GROWTH_ENGINE == 'tiled':
+        # Shared memory can only be closed with no arrays using it left:
+        canvas = canvas_allocd = None
+        canvas_shm.close()
+        canvas_allocd_shm.close()
+    return image_array
+# END RENDER FUNCTION
+
+
+# START VARIANTS
+def render_variant(config, log_file_name):
+    """Variant process: renders config (see render_variants), with its output to log_file_name, which is deleted if it renders."""
+    log_file = open(log_file_name, 'w')
+    os.dup2(log_file.fileno(), sys.stdout.fileno())
+    os.dup2(log_file.fileno(), sys.stderr.fileno())
+    render(config)
+    sys.stdout.flush()
+    log_file.close()
+    os.remove(log_file_name)
+
+def render_variants(config):
+    """Renders variants of config (a ColorGrowthConfig) with every seed of config.VARIANT_SEEDS, or config.VARIANTS new random seeds, as --RANDOM_SEED, config.VARIANT_JOBS at a time, each in a process of its own (see --VARIANTS). Returns a list of (seed, render target file base name, True if it rendered) of every variant, in the order they finished."""
+    if config.VARIANT_SEEDS:
+        seeds = list(dict.fromkeys(config.VARIANT_SEEDS))
+    else:
+        # Not from random, which a render in this process may have seeded:
+        system_random = random.SystemRandom()
+        seeds = []
+        while len(seeds) < config.VARIANTS:
+            seed = system_random.randint(0, 4294967295)
+            if seed not in seeds:
+                seeds.append(seed)
+    if config.VARIANT_JOBS:
+        jobs_n = config.VARIANT_JOBS
+    else:
+        jobs_n = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    jobs_n = min(jobs_n, len(seeds))
+    # Imported before variant processes are forked, so that they don't import them again:
+    import_render_modules()
+    # Forking means variant processes don't import NumPy etc. again; where the OS can't, they are spawned:
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    preset_base_name = os.path.splitext(config.LOAD_PRESET)[0]
+    print('Rendering', len(seeds), 'variants of', config.LOAD_PRESET, 'up to', jobs_n, 'at a time . . .')
+    start_time = time.time()
+    pending = list(seeds)
+    # Variant processes by their sentinels, with their seeds, names and start times:
+    running = {}
+    results = []
+    while pending or running:
+        while pending and len(running) < jobs_n:
+            seed = pending.pop(0)
+            variant_base_name = preset_base_name + '__variant_' + str(seed)
+            # The variant is named with its seed (as is the preset it saves, with --SAVE_PRESET, which notes it is derived of config.LOAD_PRESET); variants rendered at a time share the tiled engine's workers:
+            variant_config = dataclasses.replace(config, RANDOM_SEED=seed, RENDER_NAME=variant_base_name, VARIANTS=None, VARIANT_SEEDS=None, TILED_WORKERS=max(1, config.TILED_WORKERS // jobs_n))
+            # So that forked processes don't print what this one hasn't yet:
+            sys.stdout.flush()
+            # Not a multiprocessing.Pool, the daemonic processes of which can't start the tiled engine's workers:
+            process = context.Process(target=render_variant, args=(variant_config, variant_base_name + '.log'))
+            process.start()
+            running[process.sentinel] = (process, seed, variant_base_name, time.time())
+        for sentinel in multiprocessing.connection.wait(list(running)):
+            process, seed, variant_base_name, variant_start_time = running.pop(sentinel)
+            process.join()
+            rendered = process.exitcode == 0
+            results.append((seed, variant_base_name, rendered))
+            if rendered:
+                print('Rendered', variant_base_name, 'in', round(time.time() - variant_start_time, 2), 'seconds.')
             else:
-                canvas[new_y][new_x] = new_allocd_coords_color
-        # Save an animation frame (function only does if SAVE_EVERY_N True):
-        save_animation_frame()
-        
-        # Print progress:
-        if report_stats_nth_counter == 0 or report_stats_nth_counter == report_stats_every_n:
-            print_progress(newly_painted_coords)
-            newly_painted_coords = 0
-            report_stats_nth_counter = 0
-        report_stats_nth_counter += 1
-        
-        # Terminate all coordinate and color mutation at an arbitary number of mutations:
-        if painted_coordinates > stopRenderAtPixelsN:
-            print('Painted coordinate termination count', painted_coordinates, 'exceeded. Ending paint algorithm.')
-            continue_painting = False
-            break
-        
-    if RECLAIM_ORPHANS:
-        for y in range(0, HEIGHT):
-            for x in range(0, WIDTH):
-                if not is_color_valid(y, x, canvas):
-                    adj_color = find_adjacent_color(y, x, canvas)
-                    if adj_color is not None:
-                        coord_queue.append((y, x))
-                        canvas[y][x] = adj_color + np.random.randint(-RSHIFT, RSHIFT + 1, size=3) / 2
-                        canvas[y][x] = np.clip(canvas[y][x], 0, 255)
-                        orphans_to_reclaim_n += 1
-# END IMAGE MAPPING
-# ----
-
-# Works around problem that this setup can (always does?) save everything _except_ for a last frame with every coordinate painted if painted_coordinates >= stopRenderAtPixelsN and STOP_AT_PERCENT == 1; is there a better-engineered way to fix this problem? But this works:
-if SAVE_EVERY_N != 0:
-    set_img_frame_file_name()
-    coords_set_to_image(canvas, imageFrameFileName)
-
-# Save final image file:
-print('Saving image ', render_target_file_name, ' . . .')
-coords_set_to_image(canvas, render_target_file_name)
-print('Render complete and image saved.')
-# END MAIN FUNCTIONALITY.
\ No newline at end of file
+                print('FAILED (see ' + variant_base_name + '.log)', variant_base_name)
+    print('\nRendered', sum(1 for result in results if result[2]), 'variants (' + str(sum(1 for result in results if not result[2])), 'failed) in', round(time.time() - start_time, 2), 'seconds.')
+    return results
+# END VARIANTS
+
+
+"""START MAIN FUNCTIONALITY."""
+if __name__ == '__main__':
+    config = parse_args(sys.argv[1:])
+    if config.VARIANTS or config.VARIANT_SEEDS:
+        if not all(rendered for seed, variant_base_name, rendered in render_variants(config)):
+            sys.exit(1)
+    else:
+        render(config)
+# END MAIN FUNCTIONALITY.
@@ -0,0 +1,115 @@
+# DESCRIPTION
+# Replays a delta frame file (.cgd) saved by color_growth.py with --ANIM_OUTPUT delta, and saves any range of its animation frames as numbered PNG files or as one raw RGB (rgb24) video stream.
+
+# DEPENDENCIES
+# python 3 with numpy and PIL (Pillow), and color_growth.py in the same directory as this script.
+
+# USAGE
+# Run this script through a Python interpreter with the delta frame file, and optionally any of these switches (see --help for more):
+#    python /path/to/this/script/color_growth_delta_frames.py --DELTA_FILE render.cgd
+#    python /path/to/this/script/color_growth_delta_frames.py --DELTA_FILE render.cgd --FIRST_FRAME 200 --LAST_FRAME 400 --EVERY_N 2 --OUTPUT raw
+# NOTES
+# - PNG frames are saved to a subfolder named after the delta frame file with _frames, numbered with the frame numbers they have in the delta frame file (so that frames made from the same file with different ranges go together), zero-padded as color_growth.py pads png frame numbers (so that globs and ffmpeg %0Nd patterns written for its frames work on these). That depends on the --STOP_AT_PERCENT of the render, which the delta frame file doesn't record; pass it if it wasn't 1.
+# - Frames before --FIRST_FRAME still have to be replayed (there is no way to know what changed in them without), but that only takes as long as applying the changes in them, so it's quick.
+# - For raw output, the ffmpeg command to encode it to video is printed when it is done.
+
+
+# CODE
+import argparse
+import os
+import shlex
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import color_growth
+
+OUTPUT = 'png'
+EVERY_N = 1
+STOP_AT_PERCENT = 1
+FRAME_RATE = 30
+
+PARSER = argparse.ArgumentParser(description='Saves animation frames of a delta frame file (saved by color_growth.py with --ANIM_OUTPUT delta) as PNG files or a raw video stream.')
+PARSER.add_argument('--DELTA_FILE', type=str, required=True, help=
+'The delta frame file (.cgd) to replay.'
+)
+PARSER.add_argument('--FIRST_FRAME', type=int, help=
+'The number of the first frame to save (frames are numbered from 1). \
+Default 1.'
+)
+PARSER.add_argument('--LAST_FRAME', type=int, help=
+'The number of the last frame to save. Default the last frame of the \
+delta frame file.'
+)
+PARSER.add_argument('--EVERY_N', type=int, help=
+'Save only every Nth frame from --FIRST_FRAME (e.g. 2 to save every other \
+frame). Default ' + str(EVERY_N) + '.'
+)
+PARSER.add_argument('--STOP_AT_PERCENT', type=float, help=
+'The --STOP_AT_PERCENT of the render, which (as in color_growth.py) sets \
+how many digits PNG frame numbers are zero-padded to. Default ' + \
+str(STOP_AT_PERCENT) + '.'
+)
+PARSER.add_argument('--OUTPUT', type=str, choices=['png', 'raw'], help=
+'png: numbered PNG files in a subfolder. raw: frames one after another \
+in one uncompressed RGB (rgb24) video stream file. Default ' + OUTPUT + '.'
+)
+PARSER.add_argument('--OUTPUT_NAME', type=str, help=
+'The subfolder for PNG frames, or the raw video stream file. Default \
+named after the delta frame file, with _frames (png) or .rgb (raw).'
+)
+PARSER.add_argument('--FRAME_RATE', type=int, help=
+'The frame rate of the ffmpeg command printed for raw output. Default ' + \
+str(FRAME_RATE) + '.'
+)
+
+
+if __name__ == '__main__':
+    ARGS = PARSER.parse_args()
+    if ARGS.OUTPUT:
+        OUTPUT = ARGS.OUTPUT
+    if ARGS.EVERY_N:
+        EVERY_N = ARGS.EVERY_N
+    if ARGS.STOP_AT_PERCENT:
+        STOP_AT_PERCENT = ARGS.STOP_AT_PERCENT
+    if ARGS.FRAME_RATE:
+        FRAME_RATE = ARGS.FRAME_RATE
+    color_growth.import_render_modules()
+    np = color_growth.np
+    Image = color_growth.Image
+    reader = color_growth.DeltaFrameReader(ARGS.DELTA_FILE)
+    if reader.is_paint_log:
+        print(ARGS.DELTA_FILE, 'is a paint log, not a delta frame file; use color_growth_paint_log_frames.py for it. Exiting script.')
+        sys.exit(1)
+    frames_n = reader.get_frames_n()
+    first_frame = ARGS.FIRST_FRAME if ARGS.FIRST_FRAME else 1
+    last_frame = min(ARGS.LAST_FRAME, frames_n) if ARGS.LAST_FRAME else frames_n
+    if first_frame < 1 or first_frame > last_frame:
+        print('No frames to save: the delta frame file has frames 1 to', frames_n, 'and the range asked for is', first_frame, 'to', str(last_frame) + '. Exiting script.')
+        sys.exit(1)
+    delta_file_base_name = os.path.splitext(ARGS.DELTA_FILE)[0]
+    output_name = ARGS.OUTPUT_NAME if ARGS.OUTPUT_NAME else delta_file_base_name + ('_frames' if OUTPUT == 'png' else '.rgb')
+    if OUTPUT == 'png':
+        os.makedirs(output_name, exist_ok=True)
+        raw_file = None
+    else:
+        raw_file = open(output_name, 'wb')
+    pad_digits_width = color_growth.get_frame_number_digits(int(reader.width * reader.height * STOP_AT_PERCENT))
+
+    print('Replaying', ARGS.DELTA_FILE, '(' + str(reader.width), 'x', reader.height, 'with', frames_n, 'frames) and saving frames', first_frame, 'to', last_frame, 'to', output_name, '. . .')
+    image_array = np.empty((reader.height, reader.width, 3), dtype=np.uint8)
+    image_array[...] = reader.bg_color
+    image_flat = image_array.reshape(-1, 3)
+    saved_frames_n = 0
+    for frame_number, flat_coords, colors in reader.frames(last_frame):
+        image_flat[flat_coords] = colors
+        if frame_number >= first_frame and (frame_number - first_frame) % EVERY_N == 0:
+            if raw_file:
+                raw_file.write(image_array.tobytes())
+            else:
+                Image.fromarray(image_array).save(output_name + '/' + str(frame_number).zfill(pad_digits_width) + '.png')
+            saved_frames_n += 1
+    print('Saved', saved_frames_n, 'frames.')
+    if raw_file:
+        raw_file.close()
+        print('To encode the raw video stream to video, run:')
+        print(shlex.join(['ffmpeg', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', str(reader.width) + 'x' + str(reader.height), '-framerate', str(FRAME_RATE), '-i', output_name, delta_file_base_name + '.mp4']))
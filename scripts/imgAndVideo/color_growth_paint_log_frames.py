@@ -0,0 +1,160 @@
+# DESCRIPTION
+# Makes animation frames of a render with any frame schedule from its paint log (.cgl, saved by color_growth.py with --SAVE_PAINT_LOG True), as numbered PNG files or one raw RGB (rgb24) video stream, without rendering it again. For trying another pacing of an animation: frames every N painted coordinates, ramped up like --RAMP_UP_SAVE_EVERY_N, or a given number of frames.
+
+# DEPENDENCIES
+# python 3 with numpy and PIL (Pillow), and color_growth.py in the same directory as this script.
+
+# USAGE
+# Run this script through a Python interpreter with the paint log and a frame schedule (see --help for more):
+#    python /path/to/this/script/color_growth_paint_log_frames.py --PAINT_LOG render.cgl --SAVE_EVERY_N 2000 --RAMP_UP_SAVE_EVERY_N True
+#    python /path/to/this/script/color_growth_paint_log_frames.py --PAINT_LOG render.cgl --FRAMES_N 600 --OUTPUT raw
+# NOTES
+# - With the --SAVE_EVERY_N, --RAMP_UP_SAVE_EVERY_N and --STOP_AT_PERCENT of the render, frames are the same as the render's (color_growth.py prints the command for that at the end of the render).
+# - Like a render's, the last frame is always of the finished render.
+# - PNG frames are saved to a subfolder named after the paint log with _frames, so making frames with another schedule replaces them unless --OUTPUT_NAME is given. Frame numbers are zero-padded as color_growth.py pads png frame numbers (to the digits of the number of coordinates the render stops at, so with the --STOP_AT_PERCENT of the render), so that globs and ffmpeg %0Nd patterns written for its frames work on these.
+# - Frames are made by applying all the coordinates painted between them at once, so it takes about as long to make a few frames as many.
+
+
+# CODE
+import argparse
+import ast
+import os
+import shlex
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import color_growth
+
+RAMP_UP_SAVE_EVERY_N = False
+STOP_AT_PERCENT = 1
+OUTPUT = 'png'
+FRAME_RATE = 30
+
+PARSER = argparse.ArgumentParser(description='Makes animation frames with any frame schedule from a paint log (saved by color_growth.py with --SAVE_PAINT_LOG True), as PNG files or a raw video stream.')
+PARSER.add_argument('--PAINT_LOG', type=str, required=True, help=
+'The paint log (.cgl) to make frames from.'
+)
+PARSER.add_argument('--SAVE_EVERY_N', type=int, help=
+'Save a frame every N painted coordinates, as --SAVE_EVERY_N of \
+color_growth.py does. This or --FRAMES_N is required.'
+)
+PARSER.add_argument('--RAMP_UP_SAVE_EVERY_N', type=str, help=
+'With --SAVE_EVERY_N, increase the interval between frames over time, as \
+--RAMP_UP_SAVE_EVERY_N of color_growth.py does. Default ' + \
+str(RAMP_UP_SAVE_EVERY_N) + '.'
+)
+PARSER.add_argument('--STOP_AT_PERCENT', type=float, help=
+'The --STOP_AT_PERCENT of the render: with --SAVE_EVERY_N, the last frames \
+of the schedule of color_growth.py are at it, and (as in color_growth.py) \
+it sets how many digits PNG frame numbers are zero-padded to. Default ' + \
+str(STOP_AT_PERCENT) + '.'
+)
+PARSER.add_argument('--FRAMES_N', type=int, help=
+'Instead of --SAVE_EVERY_N, save this many frames, at even intervals of \
+painted coordinates (or as many as there are steps in the paint log, if \
+fewer).'
+)
+PARSER.add_argument('--OUTPUT', type=str, choices=['png', 'raw'], help=
+'png: numbered PNG files in a subfolder. raw: frames one after another \
+in one uncompressed RGB (rgb24) video stream file. Default ' + OUTPUT + '.'
+)
+PARSER.add_argument('--OUTPUT_NAME', type=str, help=
+'The subfolder for PNG frames, or the raw video stream file. Default \
+named after the paint log, with _frames (png) or .rgb (raw).'
+)
+PARSER.add_argument('--FRAME_RATE', type=int, help=
+'The frame rate of the ffmpeg command printed for raw output. Default ' + \
+str(FRAME_RATE) + '.'
+)
+
+
+def get_last_step(reader):
+    """Returns the number of painted coordinates at the end of the last step of the paint log of reader (a color_growth.DeltaFrameReader)."""
+    last_step = 0
+    for first_frame_number, counts, steps, flat_coords, colors in reader.chunk_arrays():
+        if len(steps):
+            last_step = int(steps[-1])
+    return last_step
+
+def get_frame_steps(frame_schedule, last_step):
+    """Returns the painted coordinate counts of frame_schedule (as made by color_growth.get_frame_schedule()) that a render which painted last_step coordinates saves frames at, in order; as in color_growth.py, the schedule stops at the first count the render doesn't get past or which isn't more than the one before it, and the last count is never used (the frame of the finished render is saved after growth instead)."""
+    frame_steps = []
+    for frame_step in frame_schedule[:-1]:
+        if frame_step >= last_step or (frame_steps and frame_step <= frame_steps[-1]):
+            break
+        frame_steps.append(frame_step)
+    return frame_steps
+
+def apply_changes(image_flat, flat_coords, colors):
+    """Writes colors to the coordinates flat_coords (flat indices) of image_flat in one go; where a coordinate is in flat_coords more than once, its last color is written, as writing them in order would."""
+    last_indices = len(flat_coords) - 1 - np.unique(flat_coords[::-1], return_index=True)[1]
+    image_flat[flat_coords[last_indices]] = colors[last_indices]
+
+
+if __name__ == '__main__':
+    ARGS = PARSER.parse_args()
+    if ARGS.RAMP_UP_SAVE_EVERY_N:
+        RAMP_UP_SAVE_EVERY_N = ast.literal_eval(ARGS.RAMP_UP_SAVE_EVERY_N)
+    if ARGS.STOP_AT_PERCENT:
+        STOP_AT_PERCENT = ARGS.STOP_AT_PERCENT
+    if ARGS.OUTPUT:
+        OUTPUT = ARGS.OUTPUT
+    if ARGS.FRAME_RATE:
+        FRAME_RATE = ARGS.FRAME_RATE
+    if not ARGS.SAVE_EVERY_N and not ARGS.FRAMES_N:
+        print('No frame schedule: pass --SAVE_EVERY_N or --FRAMES_N. Exiting script.')
+        sys.exit(1)
+    color_growth.import_render_modules()
+    np = color_growth.np
+    Image = color_growth.Image
+    reader = color_growth.DeltaFrameReader(ARGS.PAINT_LOG)
+    if not reader.is_paint_log:
+        print(ARGS.PAINT_LOG, 'is a delta frame file, not a paint log; use color_growth_delta_frames.py for it. Exiting script.')
+        sys.exit(1)
+    last_step = get_last_step(reader)
+    if ARGS.FRAMES_N:
+        # Evenly spaced, and the last frame is of the finished render:
+        frame_steps = sorted(set(np.linspace(0, last_step - 1, max(1, ARGS.FRAMES_N - 1)).astype(int).tolist())) if ARGS.FRAMES_N > 1 else []
+    else:
+        frame_schedule = color_growth.get_frame_schedule(ARGS.SAVE_EVERY_N, RAMP_UP_SAVE_EVERY_N, reader.width, reader.height, int(reader.width * reader.height * STOP_AT_PERCENT))
+        frame_steps = get_frame_steps(frame_schedule, last_step)
+    frames_n = len(frame_steps) + 1
+    paint_log_base_name = os.path.splitext(ARGS.PAINT_LOG)[0]
+    output_name = ARGS.OUTPUT_NAME if ARGS.OUTPUT_NAME else paint_log_base_name + ('_frames' if OUTPUT == 'png' else '.rgb')
+    if OUTPUT == 'png':
+        os.makedirs(output_name, exist_ok=True)
+        raw_file = None
+    else:
+        raw_file = open(output_name, 'wb')
+    pad_digits_width = color_growth.get_frame_number_digits(int(reader.width * reader.height * STOP_AT_PERCENT))
+
+    print('Making', frames_n, 'frames of', ARGS.PAINT_LOG, '(' + str(reader.width), 'x', reader.height, 'with', last_step, 'painted coordinates) and saving them to', output_name, '. . .')
+    image_array = np.empty((reader.height, reader.width, 3), dtype=np.uint8)
+    image_array[...] = reader.bg_color
+    image_flat = image_array.reshape(-1, 3)
+    frame_number = 0
+    def save_frame():
+        global frame_number
+        frame_number += 1
+        if raw_file:
+            raw_file.write(image_array.tobytes())
+        else:
+            Image.fromarray(image_array).save(output_name + '/' + str(frame_number).zfill(pad_digits_width) + '.png')
+    for first_frame_number, counts, steps, flat_coords, colors in reader.chunk_arrays():
+        step_ends = np.cumsum(counts)
+        applied_n = 0
+        # A frame at a painted coordinate count has every step up to the first which ends past it (see save_paint_log_step() of color_growth.py):
+        while frame_number < len(frame_steps):
+            step_index = np.searchsorted(steps, frame_steps[frame_number], side='right')
+            if step_index == len(steps):
+                break
+            apply_changes(image_flat, flat_coords[applied_n:step_ends[step_index]], colors[applied_n:step_ends[step_index]])
+            applied_n = step_ends[step_index]
+            save_frame()
+        apply_changes(image_flat, flat_coords[applied_n:], colors[applied_n:])
+    save_frame()
+    print('Saved', frame_number, 'frames.')
+    if raw_file:
+        raw_file.close()
+        print('To encode the raw video stream to video, run:')
+        print(shlex.join(['ffmpeg', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', str(reader.width) + 'x' + str(reader.height), '-framerate', str(FRAME_RATE), '-i', output_name, paint_log_base_name + '.mp4']))
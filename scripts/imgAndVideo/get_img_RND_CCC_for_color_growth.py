@@ -1,10 +1,11 @@
 # DESCRIPTION
-# Loads an arbitrary image file (sys.argv[1]) and gets random pixel coordinates with pixel colors, and constructs a parameter switch name and string of them (and other needed switches and their values) to pass to color_growth.py. (using --CUSTOM_COORDS_AND_COLORS) Prints this to stdout. May be captured by other scripts to be further used (e.g. to actually pass to color_growth.py).
+# Loads an arbitrary image file (sys.argv[1]) and gets random pixel coordinates with pixel colors, and constructs a parameter switch name and string of them (and other needed switches and their values) to pass to color_growth.py. (using --CUSTOM_COORDS_AND_COLORS) Prints this to stdout. May be captured by other scripts to be further used (e.g. to actually pass to color_growth.py). Optionally saves the coordinates and colors to a NumPy .npy file for color_growth.py's --CUSTOM_COORDS_AND_COLORS_FILE instead, which is much faster for thousands of them, and does not run into command line length limits.
 
 # USAGE
 # I recommend that you call this from the script `call_get_rnd_CCC_for_color_growth-py.sh` (SEE). Run this script through a Python interpreter, with these positional parameters:
 # - argv[1] the path to an image to load (python sees this parameter at sys.argv[1])
 # - argv[2] how many random coordinates with their colors to grab from it (sys.argv[2])
+# - argv[3] OPTIONAL. A .npy file name to save the coordinates and colors to (see --CUSTOM_COORDS_AND_COLORS_FILE in color_growth.py), in which case the switches printed are --CUSTOM_COORDS_AND_COLORS_FILE with that file name, instead of --CUSTOM_COORDS_AND_COLORS with all the coordinates and colors.
 # Example run:
 #    python /path/to_this_script/get_rnd_CCC_for_color_growth.py inputImageFileName.png
 # Results are printed to stdout, and may be captured e.g. by bash and passed to color_growth.py this way; the following assumes that this script and getFullPathToFile.sh are both in your PATH:
@@ -12,6 +13,10 @@
 #    pathToScript=$(getFullPathToFile.sh get_img_RND_CCC_for_color_growth.py | sed 's/get_img_RND_CCC_for_color_growth: \(.*\)/\1/g')
 #
 #    var_CUSTOM_COORDS_AND_COLORS=$(python $pathToScript inputImageFileName.png)
+#
+# Or to save them to a .npy file:
+#
+#    var_CUSTOM_COORDS_AND_COLORS=$(python $pathToScript inputImageFileName.png 5000 inputImageFileName_CCC.npy)
 
 
 # CODE
@@ -42,6 +47,11 @@ try:
 except:
     print('No positional parameter 2 (how many random coordinates/colors to get) passed. Exit.')
     sys.exit(1)
+# ~ for optional argument 3.
+if len(sys.argv) > 3:
+    npyOutputFile = sys.argv[3]
+else:
+    npyOutputFile = None
 
 # To figure out the following additional "format=None, pilmode='RGB'" parameter changes, to prevent it from returning RGBA values (which include alpha values I don't use or expect--they caused an error) (and where mysteriously previous runs of this script with the same code had not), I dug around here: https://imageio.readthedocs.io/en/stable/userapi.html#imageio.imread, and somehow I figured out how to print help for an image format. It _seems_ that it can transform anything on the fly (on read) to RGB? Printing help like this: imageio.help(name='BMP') helped figure it out; this next line of code previously was just image = imageio.imread(inputFile) :
 image = imageio.imread(inputFile, format=None, pilmode='RGB')
@@ -56,6 +66,15 @@ for i in range(0, numRNDcoordsToGet):
     yVal = random.randint(0,imageHeight -1)
     # tuple structure needs to be the ever-throws-me y,x! :
     rnd_coordinates.add((yVal,xVal))
+
+# If a .npy file name was given, save a (coordinates, 5) array of rows of x, y, r, g, b to it, in the form color_growth.py --CUSTOM_COORDS_AND_COLORS_FILE expects, and print the switches to use it; it is memory-mapped by color_growth.py, so this skips all the string building and parsing:
+if npyOutputFile:
+    yxCoords = np.array(list(rnd_coordinates), dtype=np.int32).reshape(-1, 2)
+    # That expects x and y counting from 1 (as --CUSTOM_COORDS_AND_COLORS does):
+    CCCarray = np.column_stack([yxCoords[:, 1] + 1, yxCoords[:, 0] + 1, image[yxCoords[:, 0], yxCoords[:, 1]]]).astype(np.int32)
+    np.save(npyOutputFile, CCCarray)
+    print('--WIDTH ' + str(imageWidth) + ' --HEIGHT ' + str(imageHeight) + ' --CUSTOM_COORDS_AND_COLORS_FILE ' + npyOutputFile)
+    sys.exit(0)
 # format to string in form of parameter expected by color_growth.py
 # --CUSTOM_COORDS_AND_COLORS, e.g. [[(50,40),[255,0,255]],[(88,84),[0,255,255]]] :
 paramString=''
@@ -1,5 +1,5 @@
 # DESCRIPTION
-# Produces varieties of a color growth. Calls color_growth.py N times (per $1) for preset $2, randomly varying the seed with each run, resulting in so many renders that all have the same setting but a different seed.
+# Produces varieties of a color growth. Calls color_growth.py with --VARIANTS $1 for preset $2, which renders so many variants of the preset, each with a new randomly chosen seed, several at a time, resulting in so many renders that all have the same setting but a different seed.
 
 # USAGE
 # From a directory with a .cgp preset for color_growth.py, run with these parameters:
@@ -7,13 +7,11 @@
 # - $2 the file name of the preset from which to make so many renders.
 # Example that would produce 10 renders of the given preset:
 #    color_growth_1cgp_many_variants.sh 10 colorGrowth-Py-scarlet-orange.cgp
+# NOTES
+# Variants are named after the preset with __variant_<seed>, and each saves a preset of that name with its seed. See --VARIANTS, --VARIANT_SEEDS and --VARIANT_JOBS in the help of color_growth.py.
 
 
 # CODE
 pathToScript=$(getFullPathToFile.sh color_growth.py)
 
-for i in $(seq 1 $1)
-do
-	rndSeedValForParam=$(shuf -i 0-4294967296 -n 1)
-	python $pathToScript --LOAD_PRESET $2 --RANDOM_SEED $rndSeedValForParam
-done
\ No newline at end of file
+python $pathToScript --LOAD_PRESET $2 --VARIANTS $1
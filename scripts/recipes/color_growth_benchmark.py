@@ -0,0 +1,235 @@
+# DESCRIPTION
+# Benchmarks color_growth.py: renders a fixed matrix of canvas sizes and settings (--GROWTH_CLIP tuples, --TILEABLE and --BORDER_BLEND on and off, and animation frame saving modes) with a fixed --RANDOM_SEED, and reports the wall time, pixels per second and peak memory use (RSS) of every render, compared to a stored baseline from an earlier run. Also reports when a render's output differs from the baseline's (renders with the same seed and settings are identical, unless color_growth.py changed how it renders them).
+
+# USAGE
+# Run this script through a Python interpreter, optionally with any of these switches (see --help for more):
+#    python /path/to/this/script/color_growth_benchmark.py
+#    python /path/to/this/script/color_growth_benchmark.py --SIZES 400x200,1024x1024 --VARIANTS base,border_blend,frames_png --SAVE_BASELINE True
+#    python /path/to/this/script/color_growth_benchmark.py --EXTRA_ARGS='--GROWTH_ENGINE batched'
+# NOTES
+# - It finds color_growth.py relative to itself (in this repository), not by searching the PATH; pass --COLOR_GROWTH_PY to benchmark another copy.
+# - Every render runs in a process of its own (forked from this one where the OS can, so that importing color_growth.py, NumPy etc. isn't timed; see color_growth_recipe_tools.py), in a temporary folder which is deleted after it (unless --KEEP_RENDERS True). Wall time is measured from the start to the end of that process; pixels per second are painted coordinates per wall second. Peak RSS is from the --PROFILE json sidecar color_growth.py saves, so it includes the memory of the imported modules, and of any --GROWTH_ENGINE tiled workers.
+# - Results are saved to color_growth_benchmark_<time stamp>.json in the current directory. With --SAVE_BASELINE True, they are also saved to the --BASELINE file (replacing the results of the same cases in it), which later runs compare with. Results only compare with baseline results of the same case (size, variant and --EXTRA_ARGS), and mean little if the baseline is from another computer (which is reported).
+# - The default matrix of sizes takes a long time (the 4096x4096 renders take minutes each); pass --SIZES for quicker runs.
+
+
+# CODE
+import argparse
+import ast
+import datetime
+import glob
+import hashlib
+import json
+import os
+import platform
+import shlex
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+
+import color_growth_recipe_tools
+
+PATH_TO_COLOR_GROWTH_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'imgAndVideo', 'color_growth.py')
+SIZES = '400x200,1024x1024,2048x2048,4096x4096'
+BASELINE = 'color_growth_benchmark_baseline.json'
+SAVE_BASELINE = False
+KEEP_RENDERS = False
+# Settings every benchmark render uses, so that it renders the same thing every time (with --BORDER_BLEND off, which is on by default, so that variants without it benchmark it off):
+BASE_ARGS = ['--RANDOM_SEED', '1', '-b', '[157,140,157]', '-c', '[157,140,157]', '-q', '1', '--BORDER_BLEND', 'False', '--SAVE_EVERY_N', '0', '--SAVE_PRESET', 'False']
+# From the same permutations color_growth_clip_tests.py renders all of:
+CLIP_TUPLES = [(0, 1), (1, 3), (2, 5), (0, 11)]
+# Benchmark variants: name, then a function which returns the arguments they add to BASE_ARGS for a canvas of width and height:
+VARIANTS = [('base', lambda width, height: [])]
+VARIANTS += [('clip_' + str(clip[0]) + '_' + str(clip[1]), lambda width, height, clip=clip: ['--GROWTH_CLIP', str(clip)]) for clip in CLIP_TUPLES]
+VARIANTS += [
+    ('tileable', lambda width, height: ['--TILEABLE', 'True']),
+    ('border_blend', lambda width, height: ['--BORDER_BLEND', 'True']),
+    ('tileable_border_blend', lambda width, height: ['--TILEABLE', 'True', '--BORDER_BLEND', 'True']),
+]
+# Animation frame saving modes, at 100 evenly spaced frames:
+VARIANTS += [('frames_' + anim_output, lambda width, height, anim_output=anim_output: ['--SAVE_EVERY_N', str(max(1, width * height // 100)), '--RAMP_UP', 'False', '--ANIM_OUTPUT', anim_output]) for anim_output in ('png', 'raw', 'none')]
+
+PARSER = argparse.ArgumentParser(description='Benchmarks color_growth.py renders of a matrix of canvas sizes and settings, comparing wall time, pixels per second and peak memory use with a stored baseline.')
+PARSER.add_argument('--SIZES', type=str, help=
+'Comma-separated canvas sizes to render, as WIDTHxHEIGHT. Default ' + \
+SIZES + '.'
+)
+PARSER.add_argument('--VARIANTS', type=str, help=
+'Comma-separated names of the variants to render at each size. Default \
+all of them: ' + ','.join(variant[0] for variant in VARIANTS) + '.'
+)
+PARSER.add_argument('--EXTRA_ARGS', type=str, help=
+'Any extra arguments as usable by color_growth.py, in one string, which \
+every render gets (for example --GROWTH_ENGINE batched). Pass it in the \
+form --EXTRA_ARGS=\'--GROWTH_ENGINE batched\' (with an equals sign), so \
+that its value isn\'t mistaken for a switch of this script. Default none.'
+)
+PARSER.add_argument('--BASELINE', type=str, help=
+'File of baseline results to compare with (and save to, with \
+--SAVE_BASELINE True). Default ' + BASELINE + '.'
+)
+PARSER.add_argument('--SAVE_BASELINE', type=str, help=
+'If True (or 1), save the results of this run to the --BASELINE file, \
+replacing the results of the same cases in it. Default ' + \
+str(SAVE_BASELINE) + '.'
+)
+PARSER.add_argument('--KEEP_RENDERS', type=str, help=
+'If True (or 1), keep the renders (and their logs and profiles) in \
+color_growth_benchmark_renders/ in the current directory, instead of \
+deleting them. Default ' + str(KEEP_RENDERS) + '.'
+)
+PARSER.add_argument('--COLOR_GROWTH_PY', type=str, help=
+'Path to color_growth.py. Default the one in this repository (' + \
+PATH_TO_COLOR_GROWTH_PY + ').'
+)
+
+
+def render_case(path_to_color_growth_py, folder, color_growth_args):
+    """Render process: renders with color_growth.py (at path_to_color_growth_py) and color_growth_args in folder, with output to render.log there, and saves a digest of the rendered image to digest.txt there."""
+    os.chdir(folder)
+    log_file = open('render.log', 'w')
+    os.dup2(log_file.fileno(), sys.stdout.fileno())
+    os.dup2(log_file.fileno(), sys.stderr.fileno())
+    color_growth = color_growth_recipe_tools.import_color_growth(path_to_color_growth_py)
+    image_array = color_growth.render(color_growth.parse_args(color_growth_args))
+    with open('digest.txt', 'w') as f:
+        f.write(hashlib.sha1(np.ascontiguousarray(image_array).tobytes()).hexdigest())
+    sys.stdout.flush()
+
+def run_case(context, folder, color_growth_args):
+    """Renders a benchmark case in a new process, in folder. Returns a dict of its results, or None if the render failed."""
+    os.makedirs(folder, exist_ok=True)
+    start_time = time.perf_counter()
+    process = context.Process(target=render_case, args=(PATH_TO_COLOR_GROWTH_PY, folder, color_growth_args + ['--PROFILE', 'json']))
+    process.start()
+    process.join()
+    wall_seconds = time.perf_counter() - start_time
+    profiles = glob.glob(os.path.join(folder, '*_profile.json'))
+    if process.exitcode != 0 or not profiles:
+        return None
+    with open(profiles[0]) as f:
+        profile = json.load(f)
+    with open(os.path.join(folder, 'digest.txt')) as f:
+        digest = f.read()
+    return {
+        'wall_seconds': wall_seconds,
+        'painted_coordinates': profile['painted_coordinates'],
+        'pixels_per_second': profile['painted_coordinates'] / wall_seconds,
+        'peak_rss_bytes': profile['peak_rss_bytes'],
+        'phase_seconds': profile['phase_seconds'],
+        'color_growth_version': profile['color_growth_version'],
+        'digest': digest
+    }
+
+def get_machine():
+    """Returns a description of this computer and Python, to tell results from different ones apart."""
+    return {
+        'node': platform.node(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__
+    }
+
+def format_change(value, baseline_value):
+    """Returns the change from baseline_value to value as a signed percent string, or '' if either is missing."""
+    if not value or not baseline_value:
+        return ''
+    return '{:+.1f}%'.format((value - baseline_value) / baseline_value * 100)
+
+
+if __name__ == '__main__':
+    ARGS = PARSER.parse_args()
+    EXTRA_ARGS = shlex.split(ARGS.EXTRA_ARGS) if ARGS.EXTRA_ARGS else []
+    if ARGS.SIZES:
+        SIZES = ARGS.SIZES
+    if ARGS.BASELINE:
+        BASELINE = ARGS.BASELINE
+    if ARGS.SAVE_BASELINE:
+        SAVE_BASELINE = ast.literal_eval(ARGS.SAVE_BASELINE)
+    if ARGS.KEEP_RENDERS:
+        KEEP_RENDERS = ast.literal_eval(ARGS.KEEP_RENDERS)
+    if ARGS.COLOR_GROWTH_PY:
+        PATH_TO_COLOR_GROWTH_PY = ARGS.COLOR_GROWTH_PY
+    PATH_TO_COLOR_GROWTH_PY = os.path.abspath(PATH_TO_COLOR_GROWTH_PY)
+    if not os.path.exists(PATH_TO_COLOR_GROWTH_PY):
+        print('color_growth.py not found at', PATH_TO_COLOR_GROWTH_PY, '; pass its path with --COLOR_GROWTH_PY. Exiting script.')
+        sys.exit(1)
+    try:
+        sizes = [tuple(int(dimension) for dimension in size.split('x')) for size in SIZES.split(',')]
+    except ValueError:
+        print('--SIZES must be comma-separated WIDTHxHEIGHT sizes, like 400x200,1024x1024. Exiting script.')
+        sys.exit(2)
+    variants = VARIANTS
+    if ARGS.VARIANTS:
+        variant_names = ARGS.VARIANTS.split(',')
+        unknown_variant_names = [name for name in variant_names if name not in [variant[0] for variant in VARIANTS]]
+        if unknown_variant_names:
+            print('Unknown --VARIANTS', unknown_variant_names, '; known variants are', ','.join(variant[0] for variant in VARIANTS), '. Exiting script.')
+            sys.exit(2)
+        variants = [variant for variant in VARIANTS if variant[0] in variant_names]
+    color_growth_recipe_tools.import_color_growth(PATH_TO_COLOR_GROWTH_PY)
+    context = color_growth_recipe_tools.get_render_context()
+
+    baseline = {'machine': None, 'cases': {}}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        print('Comparing with baseline', BASELINE)
+        if baseline['machine'] != get_machine():
+            print('WARNING: the baseline is from another computer or Python environment (' + str(baseline['machine']) + '); comparisons with it may mean little.')
+    else:
+        print('No baseline', BASELINE, 'found; pass --SAVE_BASELINE True to save this run as one.')
+    if KEEP_RENDERS:
+        renders_folder = os.path.abspath('color_growth_benchmark_renders')
+    else:
+        renders_folder = tempfile.mkdtemp(prefix='color_growth_benchmark_')
+
+    results = {}
+    failed_n = 0
+    print('{:<38} {:>10} {:>9} {:>12} {:>9} {:>10} {:>9}  {}'.format('case', 'wall s', 'change', 'pixels/s', 'change', 'peak MB', 'change', 'output'))
+    for width, height in sizes:
+        for variant_name, variant_args in variants:
+            case = str(width) + 'x' + str(height) + ' ' + variant_name
+            color_growth_args = ['--WIDTH', str(width), '--HEIGHT', str(height)] + BASE_ARGS + variant_args(width, height) + EXTRA_ARGS
+            # Cases are told apart by their extra arguments too:
+            case_key = ' '.join([case] + EXTRA_ARGS)
+            result = run_case(context, os.path.join(renders_folder, case.replace(' ', '_')), color_growth_args)
+            if result is None:
+                failed_n += 1
+                print('{:<38} FAILED (run with --KEEP_RENDERS True and see its render.log)'.format(case))
+                continue
+            result['args'] = color_growth_args
+            results[case_key] = result
+            baseline_result = baseline['cases'].get(case_key)
+            if baseline_result is None:
+                output_comparison = 'no baseline'
+                baseline_result = {}
+            elif baseline_result['digest'] == result['digest']:
+                output_comparison = 'same'
+            else:
+                output_comparison = 'DIFFERENT (baseline ' + baseline_result['color_growth_version'] + ')'
+            peak_mb = result['peak_rss_bytes'] / 2 ** 20 if result['peak_rss_bytes'] else 0
+            print('{:<38} {:>10.2f} {:>9} {:>12.0f} {:>9} {:>10.1f} {:>9}  {}'.format(case, result['wall_seconds'], format_change(result['wall_seconds'], baseline_result.get('wall_seconds')), result['pixels_per_second'], format_change(result['pixels_per_second'], baseline_result.get('pixels_per_second')), peak_mb, format_change(result['peak_rss_bytes'], baseline_result.get('peak_rss_bytes')), output_comparison))
+            sys.stdout.flush()
+    if not KEEP_RENDERS:
+        shutil.rmtree(renders_folder)
+
+    run = {'date': datetime.datetime.now().isoformat(), 'machine': get_machine(), 'cases': results}
+    results_file_name = 'color_growth_benchmark_' + datetime.datetime.now().strftime('%Y_%m_%d__%H_%M_%S') + '.json'
+    with open(results_file_name, 'w') as f:
+        json.dump(run, f, indent=1)
+    print('\nBenchmarked', len(results), 'cases (' + str(failed_n), 'failed); results saved to', results_file_name)
+    if SAVE_BASELINE:
+        if baseline['machine'] != run['machine']:
+            # Results from different computers don't compare; start over:
+            baseline = {'machine': run['machine'], 'cases': {}}
+        baseline['date'] = run['date']
+        baseline['cases'].update(results)
+        with open(BASELINE, 'w') as f:
+            json.dump(baseline, f, indent=1)
+        print('Saved results to baseline', BASELINE)
+    if failed_n:
+        sys.exit(1)
@@ -0,0 +1,243 @@
+# DESCRIPTION
+# Renders every `.cgp` preset in the current directory with color_growth.py, several at a time: a pool of render slots (as many as there are CPU cores divided by --CORES_PER_JOB) each runs one render, pinned to its own cores. Like color_growth_cgps.sh it can run as many simultaneous batch jobs (for example from several computers reading and writing to a network drive), but it coordinates them with lease files that are kept alive with heartbeats, so that the renders of a crashed batch job are taken over by another one. Prints a throughput report at the end.
+
+# USAGE
+# From a directory with .cgp presets, run this script through a Python interpreter, optionally with any of these switches (see --help for more):
+#    python /path/to/this/script/color_growth_cgps.py
+#    python /path/to/this/script/color_growth_cgps.py --CORES_PER_JOB 4 --EXTRA_ARGS='--WIDTH 850 --HEIGHT 180 --SAVE_PRESET False --CHECKPOINT_EVERY_N 500000'
+# NOTES
+# - Every render runs in a process of its own (forked from this one where the OS can, so that color_growth.py, NumPy and the rest are imported only once; see color_growth_recipe_tools.py), which calls the render() function of color_growth.py imported as a module, with --LOAD_PRESET <preset> and --EXTRA_ARGS. Its output goes to a log file named after the preset, with the extension .log.
+# - To claim a preset, a batch job atomically creates a file named after the preset with the extension .lease (containing the host name and process ID of the job), and touches it every --HEARTBEAT_SECONDS while the render runs. A lease that has not been touched for --LEASE_TIMEOUT_SECONDS belongs to a batch job which crashed or was killed, and another batch job will take it over and render the preset again (with --RESUME True, so that if --EXTRA_ARGS include --CHECKPOINT_EVERY_N, the render continues from its last checkpoint).
+# - When a render finishes, its lease is renamed to the extension .rendered (or .failed, if color_growth.py failed), with timing information. Presets with any of those files, or with a .rendering file from color_growth_cgps.sh, are skipped. Delete those files to render presets again.
+# - With --WAIT_FOR_LEASES True (the default), a batch job that has no more presets to claim waits until the presets leased by other batch jobs are rendered, in case it must take any of them over.
+
+
+# CODE
+import argparse
+import ast
+import glob
+import multiprocessing
+import multiprocessing.connection
+import os
+import shlex
+import socket
+import sys
+import time
+
+import color_growth_recipe_tools
+
+PATH_TO_COLOR_GROWTH_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'imgAndVideo', 'color_growth.py')
+CORES_PER_JOB = 1
+HEARTBEAT_SECONDS = 30
+LEASE_TIMEOUT_SECONDS = 300
+WAIT_FOR_LEASES = True
+# Identifies this batch job in lease files:
+LEASE_HOLDER = socket.gethostname() + ' ' + str(os.getpid())
+
+PARSER = argparse.ArgumentParser(description='Renders every .cgp preset in the current directory with color_growth.py, several at a time, coordinating with other simultaneous runs of this script through lease files.')
+PARSER.add_argument('--EXTRA_ARGS', type=str, help=
+'Any extra arguments as usable by color_growth.py, in one string. These \
+override any arguments that use the same switch or switches which are in \
+the .cgp file(s). Pass it in the form --EXTRA_ARGS=\'--WIDTH 850\' (with \
+an equals sign), so that its value isn\'t mistaken for a switch of this \
+script. Default none.'
+)
+PARSER.add_argument('--CORES_PER_JOB', type=int, help=
+'How many CPU cores each render may use. Renders are pinned to their own \
+cores where the OS allows it, and are passed --TILED_WORKERS with this \
+value (unless --EXTRA_ARGS has it), so that --GROWTH_ENGINE tiled presets \
+use all of them. Default ' + str(CORES_PER_JOB) + '.'
+)
+PARSER.add_argument('--JOBS', type=int, help=
+'How many renders to run at a time. Default the number of CPU cores this \
+script may use divided by --CORES_PER_JOB (at least 1).'
+)
+PARSER.add_argument('--HEARTBEAT_SECONDS', type=float, help=
+'How often to touch the lease files of running renders. Default ' + \
+str(HEARTBEAT_SECONDS) + '.'
+)
+PARSER.add_argument('--LEASE_TIMEOUT_SECONDS', type=float, help=
+'How long after its last heartbeat a lease is taken to belong to a crashed \
+batch job, and may be taken over. Must be at least three times \
+--HEARTBEAT_SECONDS. If batch jobs run on several computers, their clocks \
+must agree to within a good deal less than this. Default ' + \
+str(LEASE_TIMEOUT_SECONDS) + '.'
+)
+PARSER.add_argument('--WAIT_FOR_LEASES', type=str, help=
+'If True (or 1), when there are no more presets to claim, wait until \
+presets leased by other batch jobs are rendered, and take over any whose \
+leases time out. If False (or 0), exit. Default ' + str(WAIT_FOR_LEASES) + '.'
+)
+PARSER.add_argument('--COLOR_GROWTH_PY', type=str, help=
+'Path to color_growth.py. Default the one in this repository (' + \
+PATH_TO_COLOR_GROWTH_PY + ').'
+)
+
+
+def get_preset_file_path(preset, extension):
+    """Returns the path of the file named after a preset, with another extension."""
+    return os.path.splitext(preset)[0] + extension
+
+def is_preset_finished(preset):
+    return any(os.path.exists(get_preset_file_path(preset, extension)) for extension in ('.rendered', '.failed', '.rendering'))
+
+def is_lease_stale(lease_file_path):
+    """Returns True if the lease has not had a heartbeat for LEASE_TIMEOUT_SECONDS (and False if it does not exist)."""
+    try:
+        return time.time() - os.stat(lease_file_path).st_mtime > LEASE_TIMEOUT_SECONDS
+    except FileNotFoundError:
+        return False
+
+def take_lease(preset):
+    """Tries to claim a preset for rendering. Returns 'new' if it was not leased, 'reclaimed' if its lease timed out and was taken over, or None if another batch job holds it (or it was just finished)."""
+    lease_file_path = get_preset_file_path(preset, '.lease')
+    status = 'new'
+    if is_lease_stale(lease_file_path):
+        # Renaming is atomic, so only one batch job can move the stale lease out of the way:
+        stale_lease_file_path = lease_file_path + '.' + LEASE_HOLDER.replace(' ', '_') + '.stale'
+        try:
+            os.rename(lease_file_path, stale_lease_file_path)
+        except FileNotFoundError:
+            return None
+        # If another batch job replaced the stale lease with a new one between those two steps, give it back:
+        if not is_lease_stale(stale_lease_file_path):
+            os.rename(stale_lease_file_path, lease_file_path)
+            return None
+        os.remove(stale_lease_file_path)
+        status = 'reclaimed'
+    if is_preset_finished(preset):
+        return None
+    try:
+        # O_EXCL makes creating the lease atomic; it fails if the file exists:
+        lease_file = os.open(lease_file_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return None
+    os.write(lease_file, (LEASE_HOLDER + '\n').encode())
+    os.close(lease_file)
+    return status
+
+def finish_lease(preset, extension, report):
+    """Renames a preset's lease to extension (.rendered or .failed), and writes report to it."""
+    lease_file_path = get_preset_file_path(preset, '.lease')
+    with open(lease_file_path, 'a') as f:
+        f.write(report + '\n')
+    os.replace(lease_file_path, get_preset_file_path(preset, extension))
+
+def render_preset(path_to_color_growth_py, preset, color_growth_args, cores, sender):
+    """Render process: renders preset with color_growth.py (at path_to_color_growth_py) and color_growth_args, on the given cores, with output to the preset's .log file, and sends how many coordinates it painted through sender (a Connection), for the throughput report."""
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    log_file = open(get_preset_file_path(preset, '.log'), 'a')
+    os.dup2(log_file.fileno(), sys.stdout.fileno())
+    os.dup2(log_file.fileno(), sys.stderr.fileno())
+    color_growth = color_growth_recipe_tools.import_color_growth(path_to_color_growth_py)
+    color_growth.render(color_growth.parse_args(['--LOAD_PRESET', preset] + color_growth_args))
+    sys.stdout.flush()
+    sender.send(color_growth.painted_coordinates)
+
+
+if __name__ == '__main__':
+    ARGS = PARSER.parse_args()
+    EXTRA_ARGS = shlex.split(ARGS.EXTRA_ARGS) if ARGS.EXTRA_ARGS else []
+    if ARGS.CORES_PER_JOB:
+        CORES_PER_JOB = ARGS.CORES_PER_JOB
+    if ARGS.HEARTBEAT_SECONDS:
+        HEARTBEAT_SECONDS = ARGS.HEARTBEAT_SECONDS
+    if ARGS.LEASE_TIMEOUT_SECONDS:
+        LEASE_TIMEOUT_SECONDS = ARGS.LEASE_TIMEOUT_SECONDS
+    if ARGS.WAIT_FOR_LEASES:
+        WAIT_FOR_LEASES = ast.literal_eval(ARGS.WAIT_FOR_LEASES)
+    if ARGS.COLOR_GROWTH_PY:
+        PATH_TO_COLOR_GROWTH_PY = ARGS.COLOR_GROWTH_PY
+    PATH_TO_COLOR_GROWTH_PY = os.path.abspath(PATH_TO_COLOR_GROWTH_PY)
+    if LEASE_TIMEOUT_SECONDS < 3 * HEARTBEAT_SECONDS:
+        print('--LEASE_TIMEOUT_SECONDS must be at least three times --HEARTBEAT_SECONDS. Exiting script.')
+        sys.exit(2)
+    if not os.path.exists(PATH_TO_COLOR_GROWTH_PY):
+        print('color_growth.py not found at', PATH_TO_COLOR_GROWTH_PY, '; pass its path with --COLOR_GROWTH_PY. Exiting script.')
+        sys.exit(1)
+    color_growth = color_growth_recipe_tools.import_color_growth(PATH_TO_COLOR_GROWTH_PY)
+    if not color_growth_recipe_tools.is_switch_given(color_growth, EXTRA_ARGS, 'TILED_WORKERS'):
+        EXTRA_ARGS += ['--TILED_WORKERS', str(CORES_PER_JOB)]
+
+    # Split the cores this script may use into one set per render slot:
+    if hasattr(os, 'sched_getaffinity'):
+        available_cores = sorted(os.sched_getaffinity(0))
+    else:
+        available_cores = list(range(os.cpu_count()))
+    jobs_n = ARGS.JOBS if ARGS.JOBS else max(1, len(available_cores) // CORES_PER_JOB)
+    slot_cores = [set(available_cores[i * CORES_PER_JOB:(i + 1) * CORES_PER_JOB]) or None for i in range(jobs_n)]
+    context = color_growth_recipe_tools.get_render_context()
+
+    presets = sorted(glob.glob('*.cgp'))
+    print('Found', len(presets), '.cgp presets; rendering up to', jobs_n, 'at a time, with', CORES_PER_JOB, 'core(s) each.')
+    # Render slot: (process, preset, start time, receiving end of its pipe) of the render running in it:
+    running = {}
+    results = []
+    last_heartbeat = time.time()
+    start_time = time.time()
+    while True:
+        # Fill free render slots with presets that are not finished or leased by another batch job:
+        waiting_for_leases = False
+        for preset in presets:
+            if len(running) == jobs_n:
+                break
+            if is_preset_finished(preset) or preset in [job[1] for job in running.values()]:
+                continue
+            lease_status = take_lease(preset)
+            if lease_status is None:
+                waiting_for_leases = waiting_for_leases or os.path.exists(get_preset_file_path(preset, '.lease'))
+                continue
+            color_growth_args = EXTRA_ARGS + (['--RESUME', 'True'] if lease_status == 'reclaimed' else [])
+            slot = next(slot for slot in range(jobs_n) if slot not in running)
+            print('Rendering', preset, '(taken over from a timed out lease) . . .' if lease_status == 'reclaimed' else '. . .')
+            # (Flushed before forking, so that the render process doesn't write it to its log again:)
+            sys.stdout.flush()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=render_preset, args=(PATH_TO_COLOR_GROWTH_PY, preset, color_growth_args, slot_cores[slot], sender))
+            process.start()
+            sender.close()
+            running[slot] = (process, preset, time.time(), receiver)
+        if not running and not (WAIT_FOR_LEASES and waiting_for_leases):
+            break
+        # Wait for a render to finish, or until the next heartbeat is due:
+        timeout = max(0, HEARTBEAT_SECONDS - (time.time() - last_heartbeat))
+        if running:
+            multiprocessing.connection.wait([job[0].sentinel for job in running.values()], timeout=timeout)
+        else:
+            time.sleep(timeout)
+        if time.time() - last_heartbeat >= HEARTBEAT_SECONDS:
+            for process, preset, job_start_time, receiver in running.values():
+                try:
+                    os.utime(get_preset_file_path(preset, '.lease'))
+                except FileNotFoundError:
+                    print('WARNING: the lease of', preset, 'is gone (was it deleted, or taken over after missed heartbeats?); another batch job may render it too.')
+            last_heartbeat = time.time()
+        for slot, (process, preset, job_start_time, receiver) in list(running.items()):
+            if process.exitcode is None:
+                continue
+            process.join()
+            del running[slot]
+            seconds = time.time() - job_start_time
+            # (A render that exited with code 0 sent how many coordinates it painted before it exited:)
+            pixels_n = receiver.recv() if process.exitcode == 0 else 0
+            receiver.close()
+            results.append((preset, process.exitcode, seconds, pixels_n))
+            report = 'Rendered by ' + LEASE_HOLDER + ' in ' + str(round(seconds, 2)) + ' seconds; exit code ' + str(process.exitcode)
+            try:
+                finish_lease(preset, '.rendered' if process.exitcode == 0 else '.failed', report)
+            except FileNotFoundError:
+                print('WARNING: the lease of', preset, 'is gone; not marking it', 'rendered.' if process.exitcode == 0 else 'failed.')
+            print(('Finished ' if process.exitcode == 0 else 'FAILED (see ' + get_preset_file_path(preset, '.log') + ') ') + preset + ' in', round(seconds, 2), 'seconds.')
+
+    # Throughput report:
+    wall_seconds = time.time() - start_time
+    rendered = [result for result in results if result[1] == 0]
+    render_seconds = sum(result[2] for result in results)
+    pixels_n = sum(result[3] for result in rendered)
+    print('\nRendered', len(rendered), 'presets (' + str(len(results) - len(rendered)), 'failed) in', round(wall_seconds, 2), 'seconds.')
+    if results and wall_seconds > 0:
+        print('Throughput:', round(len(rendered) / wall_seconds * 3600, 2), 'renders/hour,', round(pixels_n / wall_seconds / 1e6, 3), 'megapixels painted/second.')
+        print('Render slot use:', str(round(render_seconds / (wall_seconds * jobs_n) * 100, 1)) + '% of', jobs_n, 'slots.')
+    if len(rendered) < len(results):
+        sys.exit(1)
@@ -1,5 +1,5 @@
 # DESCRIPTION
-# runs `color_growth.py` once for every `.cgp` preset in the current directory and all subdirectories. creates .rendering temp files of the same name as a render target file name so that you can interrupt / resume or run multiple simultaneous renders.
+# runs `color_growth.py` once for every `.cgp` preset in the current directory and all subdirectories. creates .rendering temp files of the same name as a render target file name so that you can interrupt / resume or run multiple simultaneous renders. SEE ALSO color_growth_cgps.py, which renders several presets at a time (on all CPU cores), and takes over the renders of crashed runs.
 
 # USAGE
 # Run with or without these optional parameters:
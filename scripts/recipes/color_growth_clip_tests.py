@@ -1,5 +1,5 @@
 # DESCRIPTION
-# Tests all possible `--GROWTH_CLIP` rates of color_growth.py, by running it repeatedly, saving .cgp presets for each of the same.
+# Tests all possible `--GROWTH_CLIP` rates of color_growth.py, by rendering with it repeatedly (in this process, with color_growth.py imported as a module, so that Python, NumPy etc. don't start again for every render), saving .cgp presets for each of the same.
 
 # USAGE
 # Run this script through a Python interpreter, without any parameters:
@@ -13,13 +13,14 @@
 # - use platform.system() to identify the shell we should call to find the script path, as in a comment below
 import itertools
 import subprocess
-import shlex
 import numpy as np
 import re
 import datetime
 import os
 import sys
 
+import color_growth_recipe_tools
+
 # FIND color_growth.py, assuming it is anywhere in the system or user PATH:
 print ('Searching for color_growth.py in PATH . . .')
     # FOR A HORROR SHOW DETOUR:
@@ -41,6 +42,9 @@ if pathToColorGrowthPy == '':
 else:
     print('Path to color_growth.py found: ', pathToColorGrowthPy)
 
+# Import it as a module, to render with its render() function:
+color_growth = color_growth_recipe_tools.import_color_growth(pathToColorGrowthPy)
+
 # build set of tuples we want to pass to the --GROWTH_CLIP switch of color_growth.py; ALAS that at this writing it no longer accepts negative values, so a prior used set is commented out on the next line, and the actual usable one is uncommented:
 # original_set = {-11,-10,-9,-8,-7,-6,-5,-4,-3,-2,-1,0,1,2,3,4,5,6,7,8,9,10,11}
 original_set = {0,1,2,3,4,5,6,7,8,9,10,11}
@@ -53,11 +57,11 @@ for element in original_tuples:
 # Run color_growth.py so many times with those tuples, and random colors, saving datetime and tuple-named .cgp presets and loading for each run:
 for element in clip_tuples:
     rgb_color_triplet = np.random.randint(0, 255 + 1, size=3)
-    foreground_color = list(rgb_color_triplet)
+    foreground_color = rgb_color_triplet.tolist()
     # Inverts the color;
     #  subtracts all the elements of the numpy array from 255,
     #  returns that as a numpy array and converts it to a list:
-    background_color = list(255 - rgb_color_triplet)
+    background_color = (255 - rgb_color_triplet).tolist()
     background_color = re.sub(' ', '', str(background_color))
     foreground_color = re.sub(' ', '', str(foreground_color))
     now = datetime.datetime.now()
@@ -67,7 +71,6 @@ for element in clip_tuples:
     file = open(growth_clip_file_name_str, "w")
     file.write(preset_string + '\n\n')
     file.close()
-    command_string = 'python "' + pathToColorGrowthPy + '" --LOAD_PRESET ' + growth_clip_file_name_str
-    print('Will run command via subprocess: ', command_string)
-    subprocess.call(shlex.split(command_string))
-    print('Subprocess completed.')
\ No newline at end of file
+    print('Will render with color_growth.py --LOAD_PRESET', growth_clip_file_name_str)
+    color_growth.render(color_growth.parse_args(['--LOAD_PRESET', growth_clip_file_name_str]))
+    print('Render completed.')
\ No newline at end of file
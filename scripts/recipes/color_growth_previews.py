@@ -0,0 +1,196 @@
+# DESCRIPTION
+# Renders a quick preview (see --PREVIEW_SCALE of color_growth.py) of every .cgp preset in a folder, several at a time, and puts them together on contact sheets labeled with the preset names, to pick out the presets worth rendering at full size without rendering them all at full size first.
+
+# USAGE
+# From a directory with .cgp presets, run this script through a Python interpreter, optionally with any of these switches (see --help for more):
+#    python /path/to/this/script/color_growth_previews.py
+#    python /path/to/this/script/color_growth_previews.py --PREVIEW_SCALE 0.25 --COLUMNS 4 --ROWS 3 --EXTRA_ARGS='--STOP_AT_PERCENT 0.5'
+# NOTES
+# - Contact sheets are saved to the current directory, named after --SHEET_NAME and numbered, e.g. color_growth_previews_01.png. Preview images are saved next to their presets by color_growth.py, named after them with __preview.png.
+# - Previews render in processes of their own (not a multiprocessing.Pool, so that --GROWTH_ENGINE tiled presets can start their worker processes), forked from this one where the OS can (so that color_growth.py, NumPy and the rest are imported only once; see color_growth_recipe_tools.py), which call the render() function of color_growth.py imported as a module. Their output is only saved (to a file named after the preset with __preview.log) if a preview fails.
+# - To render a preset you picked at full size with the look of its preview, render its preview again with --PREVIEW_SEED_AT_PERCENT (for example, python color_growth.py --LOAD_PRESET <preset> --PREVIEW_SCALE <the same scale> --PREVIEW_SEED_AT_PERCENT 0.3) and render the _upscale.cgp preset it saves. Or pass --PREVIEW_SEED_AT_PERCENT to this script to save them for every preset (which takes longer, as they are full size images).
+
+
+# CODE
+import argparse
+import contextlib
+import glob
+import io
+import multiprocessing.connection
+import os
+import shlex
+import sys
+import time
+from PIL import Image, ImageDraw
+
+import color_growth_recipe_tools
+
+PATH_TO_COLOR_GROWTH_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'imgAndVideo', 'color_growth.py')
+PRESETS_FOLDER = '.'
+PREVIEW_SCALE = 0.125
+THUMBNAIL_SIZE = 256
+COLUMNS = 6
+ROWS = 4
+SHEET_NAME = 'color_growth_previews'
+# Pixels of space for preset names under the previews on contact sheets:
+LABEL_HEIGHT = 16
+SHEET_BG_COLOR = (40, 40, 40)
+
+PARSER = argparse.ArgumentParser(description='Renders previews of every .cgp preset in a folder with color_growth.py, several at a time, and puts them on contact sheets.')
+PARSER.add_argument('--PRESETS_FOLDER', type=str, help=
+'The folder with the .cgp presets to preview. Default ' + PRESETS_FOLDER + \
+' (the current directory).'
+)
+PARSER.add_argument('--PREVIEW_SCALE', type=float, help=
+'The fraction of their size to render previews at (see --PREVIEW_SCALE of \
+color_growth.py). Default ' + str(PREVIEW_SCALE) + '.'
+)
+PARSER.add_argument('--PREVIEW_SEED_AT_PERCENT', type=float, help=
+'Pass this --PREVIEW_SEED_AT_PERCENT to color_growth.py for every \
+preview, so that each saves a preset to continue it at full size with. \
+Default none.'
+)
+PARSER.add_argument('--EXTRA_ARGS', type=str, help=
+'Any extra arguments as usable by color_growth.py, in one string. These \
+override any arguments that use the same switch or switches which are in \
+the .cgp file(s). Pass it in the form --EXTRA_ARGS=\'--STOP_AT_PERCENT \
+0.5\' (with an equals sign), so that its value isn\'t mistaken for a switch \
+of this script. Default none.'
+)
+PARSER.add_argument('--THUMBNAIL_SIZE', type=int, help=
+'The width and height on contact sheets of the space for every preview, \
+which is scaled to fit it. Default ' + \
+str(THUMBNAIL_SIZE) + '.'
+)
+PARSER.add_argument('--COLUMNS', type=int, help=
+'How many previews across every contact sheet is. Default ' + \
+str(COLUMNS) + '.'
+)
+PARSER.add_argument('--ROWS', type=int, help=
+'How many previews down every contact sheet is; there are as many contact \
+sheets as it takes for all of them. Default ' + str(ROWS) + '.'
+)
+PARSER.add_argument('--SHEET_NAME', type=str, help=
+'The file name of contact sheets, before their number and .png. Default ' + \
+SHEET_NAME + '.'
+)
+PARSER.add_argument('--JOBS', type=int, help=
+'How many previews to render at a time. Default the number of CPU cores \
+this script may use.'
+)
+PARSER.add_argument('--COLOR_GROWTH_PY', type=str, help=
+'Path to color_growth.py. Default the one in this repository (' + \
+PATH_TO_COLOR_GROWTH_PY + ').'
+)
+
+
+def render_preview(path_to_color_growth_py, preset, color_growth_args, connection):
+    """Render process: renders a preview of preset with color_growth.py (at path_to_color_growth_py) and color_growth_args, and sends (the preview as a uint8 RGB array, None) through connection (the sending end of a pipe), or if it fails, (None, the error as a string), and saves the output of color_growth.py to the preset's __preview.log file."""
+    color_growth = color_growth_recipe_tools.import_color_growth(path_to_color_growth_py)
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            image_array = color_growth.render(color_growth.parse_args(['--LOAD_PRESET', preset] + color_growth_args, exit_on_error=False))
+        connection.send((image_array, None))
+    except Exception as e:
+        with open(os.path.splitext(preset)[0] + '__preview.log', 'w') as f:
+            f.write(output.getvalue() + '\n' + repr(e) + '\n')
+        connection.send((None, str(e) or repr(e)))
+
+def make_contact_sheet(previews):
+    """Returns a contact sheet (a PIL Image) of previews, a list of (preset, uint8 RGB array) of at most COLUMNS * ROWS, in rows from the top left, each labeled with the preset file name."""
+    rows_n = (len(previews) + COLUMNS - 1) // COLUMNS
+    sheet = Image.new('RGB', (COLUMNS * THUMBNAIL_SIZE, rows_n * (THUMBNAIL_SIZE + LABEL_HEIGHT)), SHEET_BG_COLOR)
+    draw = ImageDraw.Draw(sheet)
+    for i, (preset, image_array) in enumerate(previews):
+        left = i % COLUMNS * THUMBNAIL_SIZE
+        top = i // COLUMNS * (THUMBNAIL_SIZE + LABEL_HEIGHT)
+        # Scaled to fit; previews smaller than that are scaled up pixel for pixel, so that they aren't blurred:
+        scale = min(THUMBNAIL_SIZE / image_array.shape[1], THUMBNAIL_SIZE / image_array.shape[0])
+        thumbnail = Image.fromarray(image_array).resize((max(1, round(image_array.shape[1] * scale)), max(1, round(image_array.shape[0] * scale))), Image.NEAREST if scale > 1 else Image.LANCZOS)
+        sheet.paste(thumbnail, (left + (THUMBNAIL_SIZE - thumbnail.width) // 2, top + (THUMBNAIL_SIZE - thumbnail.height) // 2))
+        # Shorten the label from the start (presets often differ only at the end of their names) until it fits:
+        name = os.path.basename(preset)
+        label = name
+        for start in range(1, len(name)):
+            if draw.textlength(label) <= THUMBNAIL_SIZE - 4:
+                break
+            label = '...' + name[start:]
+        draw.text((left + 2, top + THUMBNAIL_SIZE + 2), label, fill=(255, 255, 255))
+    return sheet
+
+
+if __name__ == '__main__':
+    ARGS = PARSER.parse_args()
+    EXTRA_ARGS = shlex.split(ARGS.EXTRA_ARGS) if ARGS.EXTRA_ARGS else []
+    if ARGS.PRESETS_FOLDER:
+        PRESETS_FOLDER = ARGS.PRESETS_FOLDER
+    if ARGS.PREVIEW_SCALE:
+        PREVIEW_SCALE = ARGS.PREVIEW_SCALE
+    if ARGS.THUMBNAIL_SIZE:
+        THUMBNAIL_SIZE = ARGS.THUMBNAIL_SIZE
+    if ARGS.COLUMNS:
+        COLUMNS = ARGS.COLUMNS
+    if ARGS.ROWS:
+        ROWS = ARGS.ROWS
+    if ARGS.SHEET_NAME:
+        SHEET_NAME = ARGS.SHEET_NAME
+    if ARGS.COLOR_GROWTH_PY:
+        PATH_TO_COLOR_GROWTH_PY = ARGS.COLOR_GROWTH_PY
+    PATH_TO_COLOR_GROWTH_PY = os.path.abspath(PATH_TO_COLOR_GROWTH_PY)
+    if not os.path.exists(PATH_TO_COLOR_GROWTH_PY):
+        print('color_growth.py not found at', PATH_TO_COLOR_GROWTH_PY, '; pass its path with --COLOR_GROWTH_PY. Exiting script.')
+        sys.exit(1)
+    color_growth_args = ['--PREVIEW_SCALE', str(PREVIEW_SCALE), '--SAVE_PRESET', 'False'] + EXTRA_ARGS
+    if ARGS.PREVIEW_SEED_AT_PERCENT:
+        color_growth_args += ['--PREVIEW_SEED_AT_PERCENT', str(ARGS.PREVIEW_SEED_AT_PERCENT)]
+    # Previews render several at a time, so each of them only needs one core:
+    color_growth = color_growth_recipe_tools.import_color_growth(PATH_TO_COLOR_GROWTH_PY)
+    if not color_growth_recipe_tools.is_switch_given(color_growth, EXTRA_ARGS, 'TILED_WORKERS'):
+        color_growth_args += ['--TILED_WORKERS', '1']
+    jobs_n = ARGS.JOBS if ARGS.JOBS else len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    context = color_growth_recipe_tools.get_render_context()
+
+    presets = sorted(glob.glob(os.path.join(glob.escape(PRESETS_FOLDER), '*.cgp')))
+    # Presets saved by previews (e.g. to continue them at full size) aren't previewed:
+    presets = [preset for preset in presets if '__preview' not in os.path.basename(preset)]
+    print('Found', len(presets), '.cgp presets; rendering previews at', PREVIEW_SCALE, 'of their size, up to', jobs_n, 'at a time . . .')
+    start_time = time.time()
+    # Render processes aren't a multiprocessing.Pool, as its processes are daemonic, and daemonic processes can't start the worker processes of --GROWTH_ENGINE tiled. Receiving ends of the pipes of running render processes: (process, preset):
+    running = {}
+    presets_to_render = list(presets)
+    image_arrays = {}
+    failed = []
+    while presets_to_render or running:
+        while presets_to_render and len(running) < jobs_n:
+            preset = presets_to_render.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=render_preview, args=(PATH_TO_COLOR_GROWTH_PY, preset, color_growth_args, sender))
+            process.start()
+            # (So that the receiving end sees the end of the pipe if the render process dies without sending anything:)
+            sender.close()
+            running[receiver] = (process, preset)
+        for receiver in multiprocessing.connection.wait(list(running)):
+            process, preset = running.pop(receiver)
+            try:
+                image_array, error = receiver.recv()
+            except EOFError:
+                image_array, error = None, None
+            receiver.close()
+            process.join()
+            if error is None and image_array is None:
+                error = 'the render process exited with code ' + str(process.exitcode)
+            if error is None:
+                image_arrays[preset] = image_array
+            else:
+                failed.append(preset)
+                print('FAILED (see ' + os.path.splitext(preset)[0] + '__preview.log) ' + preset + ':', error)
+    # In preset order, whichever order they finished in:
+    previews = [(preset, image_arrays[preset]) for preset in presets if preset in image_arrays]
+
+    per_sheet_n = COLUMNS * ROWS
+    for sheet_number, first in enumerate(range(0, len(previews), per_sheet_n), start=1):
+        sheet_file_name = SHEET_NAME + '_' + str(sheet_number).zfill(2) + '.png'
+        make_contact_sheet(previews[first:first + per_sheet_n]).save(sheet_file_name)
+        print('Saved contact sheet', sheet_file_name)
+    print('\nRendered', len(previews), 'previews (' + str(len(failed)), 'failed) in', round(time.time() - start_time, 2), 'seconds.')
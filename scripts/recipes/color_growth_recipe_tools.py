@@ -0,0 +1,32 @@
+# DESCRIPTION
+# Functions the Python color_growth recipes in this folder (color_growth_cgps.py, color_growth_benchmark.py, color_growth_clip_tests.py and color_growth_previews.py) share, to render with color_growth.py in processes of their own.
+
+# USAGE
+# Import it from a script in this folder (Python finds it, as it is in the folder of the script it runs):
+#    import color_growth_recipe_tools
+#    color_growth = color_growth_recipe_tools.import_color_growth(path_to_color_growth_py)
+#    context = color_growth_recipe_tools.get_render_context()
+
+
+# CODE
+import importlib.util
+import multiprocessing
+import sys
+
+
+def import_color_growth(path_to_color_growth_py):
+    """Returns color_growth.py (at path_to_color_growth_py) imported as module color_growth, with the modules it renders with (see its import_render_modules()), importing them only if they aren't yet. Recipes call this before they start render processes, so that processes forked from them (see get_render_context()) don't import color_growth.py, NumPy and the rest again."""
+    if 'color_growth' not in sys.modules:
+        spec = importlib.util.spec_from_file_location('color_growth', path_to_color_growth_py)
+        sys.modules['color_growth'] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules['color_growth'])
+        sys.modules['color_growth'].import_render_modules()
+    return sys.modules['color_growth']
+
+def get_render_context():
+    """Returns the multiprocessing context to start render processes with: fork where the OS can, so that they start with everything import_color_growth() imported; where it can't, spawn."""
+    return multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+
+def is_switch_given(color_growth, args, switch):
+    """Returns True if args (a list of arguments to color_growth.py, the module color_growth) give switch (e.g. 'TILED_WORKERS'), in any form its argument parser takes (--TILED_WORKERS 4, --TILED_WORKERS=4, or an abbreviation)."""
+    return getattr(color_growth.PARSER.parse_args(args), switch) is not None